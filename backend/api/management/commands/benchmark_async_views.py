@@ -0,0 +1,210 @@
+import asyncio
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import path
+from django.utils import timezone
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework_simplejwt.tokens import AccessToken
+
+from chat.models import ChatRoom, ChatRoomUser, Message
+from chat.serializers import MESSAGE_VALUES, serialize_message_rows
+from chat.views import ChatRoomMessageListCreateView
+from event.models import Event
+from event.serializers import EVENT_VALUES, serialize_event_rows
+from event.views import ProjectEventListCreateView
+from projects.models import Project
+from projects.serializers import ProjectListSerializer
+from projects.views import ProjectListCreateView
+from tasks.models import Task
+from tasks.serializers import TASK_VALUES, serialize_task_rows
+from tasks.views import TaskListCreateView
+
+
+# Sync versions of the list GETs, as they were before the views became async.
+# They share the permission checks and querysets with the async handlers.
+
+
+class SyncTaskListView(TaskListCreateView):
+    view_is_async = False
+    dispatch = APIView.dispatch
+
+    def get(self, request, project_id):
+        project = self._get_project(project_id)
+        queryset = Task.objects.filter(project=project).order_by("deadline")
+        rows = list(queryset.values(*TASK_VALUES))
+        return Response({"tasks": serialize_task_rows(rows)})
+
+
+class SyncMessageListView(ChatRoomMessageListCreateView):
+    view_is_async = False
+    dispatch = APIView.dispatch
+
+    def get(self, request, project_id, chatroom_id):
+        chatroom = self._get_chatroom(project_id, chatroom_id)
+        queryset = chatroom.messages.values(*MESSAGE_VALUES)
+        messages = list(queryset.order_by("timestamp", "message_id")[:20])
+        return Response({"messages": serialize_message_rows(messages)})
+
+
+class SyncProjectListView(ProjectListCreateView):
+    view_is_async = False
+    dispatch = APIView.dispatch
+
+    def get(self, request):
+        projects = list(self._get_queryset_for_user()[:20])
+        return Response({"projects": ProjectListSerializer(projects, many=True).data})
+
+
+class SyncEventListView(ProjectEventListCreateView):
+    view_is_async = False
+    dispatch = APIView.dispatch
+
+    def get(self, request, project_id):
+        project = self._get_project(project_id)
+        events_qs = project.events.all().order_by("start_date")
+        events = list(events_qs.values(*EVENT_VALUES)[:20])
+        return Response({"events": serialize_event_rows(events)})
+
+
+urlpatterns = [
+    path("sync/tasks/<uuid:project_id>/", SyncTaskListView.as_view()),
+    path("sync/messages/<uuid:project_id>/<uuid:chatroom_id>/", SyncMessageListView.as_view()),
+    path("sync/projects/", SyncProjectListView.as_view()),
+    path("sync/events/<uuid:project_id>/", SyncEventListView.as_view()),
+    path("async/tasks/<uuid:project_id>/", TaskListCreateView.as_view()),
+    path("async/messages/<uuid:project_id>/<uuid:chatroom_id>/", ChatRoomMessageListCreateView.as_view()),
+    path("async/projects/", ProjectListCreateView.as_view()),
+    path("async/events/<uuid:project_id>/", ProjectEventListCreateView.as_view()),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent requests at the task/message/project/event list "
+        "endpoints through the ASGI handler of this process, once with the "
+        "previous sync views and once with the async views. Benchmark data is "
+        "written to the configured database and deleted afterwards. Against "
+        "PostgreSQL run it with DB_CONN_MAX_AGE=0: under ASGI each request "
+        "runs its sync code in a thread of its own, so persistent connections "
+        "pile up."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--tasks", type=int, default=50)
+
+    def handle(self, *args, **options):
+        user, project, chatroom = self._populate(options["tasks"])
+        try:
+            with override_settings(ROOT_URLCONF=__name__):
+                asyncio.run(self._run(user, project, chatroom, options))
+        finally:
+            project.delete()
+            user.delete()
+
+    def _populate(self, task_count):
+        now = timezone.now()
+        user = get_user_model().objects.create_user(
+            username="async-view-benchmark", password="unused"
+        )
+        [project] = Project.objects.bulk_create(
+            [Project(title="Async benchmark", start_date=now, deadline=now)]
+        )
+        project.members.add(user)
+        Task.objects.bulk_create(
+            Task(project=project, name=f"Task {i}", deadline=now)
+            for i in range(task_count)
+        )
+        Event.objects.bulk_create(
+            Event(project=project, title=f"Event {i}", start_date=now, end_date=now)
+            for i in range(20)
+        )
+        chatroom = ChatRoom.objects.create(project=project, name="benchmark")
+        ChatRoomUser.objects.create(chatroom=chatroom, user=user)
+        Message.objects.bulk_create(
+            Message(chatroom=chatroom, user=user, content=f"message {i}")
+            for i in range(20)
+        )
+        return user, project, chatroom
+
+    async def _run(self, user, project, chatroom, options):
+        app = get_asgi_application()
+        token = str(AccessToken.for_user(user))
+        endpoints = {
+            "tasks": f"tasks/{project.pk}/",
+            "messages": f"messages/{project.pk}/{chatroom.pk}/",
+            "projects": "projects/",
+            "events": f"events/{project.pk}/",
+        }
+
+        self.stdout.write(
+            f"{options['requests']} requests per run, concurrency {options['concurrency']}"
+        )
+        for name, suffix in endpoints.items():
+            for mode in ("sync", "async"):
+                elapsed, latencies = await self._load(
+                    app, f"/{mode}/{suffix}", token, options
+                )
+                latencies.sort()
+                self.stdout.write(
+                    f"{name:>9} {mode:>5}: {options['requests'] / elapsed:7.1f} req/s, "
+                    f"p50 {statistics.median(latencies):6.1f} ms, "
+                    f"p95 {latencies[int(len(latencies) * 0.95) - 1]:6.1f} ms"
+                )
+
+    async def _load(self, app, url, token, options):
+        semaphore = asyncio.Semaphore(options["concurrency"])
+        latencies = []
+
+        async def one():
+            async with semaphore:
+                began = time.perf_counter()
+                status = await self._request(app, url, token)
+                latencies.append((time.perf_counter() - began) * 1000)
+                assert status == 200, f"{url} returned {status}"
+
+        began = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(options["requests"])))
+        return time.perf_counter() - began, latencies
+
+    async def _request(self, app, url, token):
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": url,
+            "raw_path": url.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", f"Bearer {token}".encode()),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+        sent = []
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if body_sent:
+                # Nothing more to send; the client stays connected
+                await asyncio.Event().wait()
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+        return sent[0]["status"]
@@ -0,0 +1,166 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from chat.models import ChatRoom, Message
+from projects.models import Project
+from tasks.models import Task, TaskStatus
+
+# SQLite profiles compared by --compare: the previous settings (rollback
+# journal, deferred transactions, sqlite3's default 5 s timeout) and the tuned
+# single-node profile from settings.py.
+SQLITE_PROFILES = {
+    "sqlite-legacy": {
+        "DB_SQLITE_JOURNAL_MODE": "DELETE",
+        "DB_SQLITE_TRANSACTION_MODE": "DEFERRED",
+        "DB_SQLITE_TIMEOUT": "5",
+    },
+    "sqlite-wal": {
+        "DB_SQLITE_JOURNAL_MODE": "WAL",
+        "DB_SQLITE_TRANSACTION_MODE": "IMMEDIATE",
+        "DB_SQLITE_TIMEOUT": "20",
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run concurrent chat/task writers and readers against the configured "
+        "database and report throughput and lock errors. --compare runs the "
+        "same workload on fresh SQLite files for each SQLite profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument("--compare", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["compare"]:
+            self._compare(options)
+            return
+
+        user, project, chatroom, task_ids = self._populate(options["writers"])
+        try:
+            results = self._run(user, chatroom, task_ids, options)
+        finally:
+            project.delete()
+            user.delete()
+
+        elapsed = options["seconds"]
+        db = settings.DATABASES["default"]
+        self.stdout.write(
+            f"{db['ENGINE'].rsplit('.', 1)[-1]} {db.get('OPTIONS', {})}\n"
+            f"  writes {results['writes'] / elapsed:8.1f} tx/s, "
+            f"reads {results['reads'] / elapsed:8.1f} q/s, "
+            f"lock errors {results['errors']}"
+        )
+
+    def _compare(self, options):
+        manage = Path(settings.BASE_DIR) / "manage.py"
+        forwarded = [
+            f"--writers={options['writers']}",
+            f"--readers={options['readers']}",
+            f"--seconds={options['seconds']}",
+        ]
+        for name, overrides in SQLITE_PROFILES.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                env = {
+                    **os.environ,
+                    **overrides,
+                    "DB_ENGINE": "sqlite",
+                    "DB_NAME": str(Path(tmp) / "bench.sqlite3"),
+                }
+                subprocess.run(
+                    [sys.executable, manage, "migrate", "-v0"], env=env, check=True
+                )
+                self.stdout.write(f"[{name}]")
+                self.stdout.flush()
+                subprocess.run(
+                    [sys.executable, manage, "benchmark_db_writes", *forwarded],
+                    env=env,
+                    check=True,
+                )
+
+    def _populate(self, writer_count):
+        now = timezone.now()
+        user = get_user_model().objects.create_user(
+            username="db-write-benchmark", password="unused"
+        )
+        [project] = Project.objects.bulk_create(
+            [Project(title="Write benchmark", start_date=now, deadline=now)]
+        )
+        tasks = Task.objects.bulk_create(
+            Task(project=project, name=f"Task {i}", deadline=now)
+            for i in range(writer_count)
+        )
+        chatroom = ChatRoom.objects.create(project=project, name="benchmark")
+        return user, project, chatroom, [task.pk for task in tasks]
+
+    def _run(self, user, chatroom, task_ids, options):
+        deadline = time.monotonic() + options["seconds"]
+        results = {"writes": 0, "reads": 0, "errors": 0}
+        lock = threading.Lock()
+
+        def count(key):
+            with lock:
+                results[key] += 1
+
+        def writer(task_id):
+            # Read-then-write in one transaction, like a task update followed
+            # by a chat message; the pattern that deadlocks DEFERRED SQLite
+            # transactions under contention.
+            while time.monotonic() < deadline:
+                try:
+                    with transaction.atomic():
+                        status = Task.objects.values_list("status", flat=True).get(
+                            pk=task_id
+                        )
+                        Task.objects.filter(pk=task_id).update(
+                            status=TaskStatus.DONE
+                            if status != TaskStatus.DONE
+                            else TaskStatus.TODO
+                        )
+                        Message.objects.create(
+                            chatroom=chatroom, user=user, content="benchmark"
+                        )
+                    count("writes")
+                except OperationalError:
+                    count("errors")
+
+        def reader():
+            while time.monotonic() < deadline:
+                try:
+                    list(chatroom.messages.order_by("-timestamp")[:50])
+                    count("reads")
+                except OperationalError:
+                    count("errors")
+
+        def run(target, *args):
+            try:
+                target(*args)
+            finally:
+                close_old_connections()
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(writer, pk)) for pk in task_ids]
+        threads += [
+            threading.Thread(target=run, args=(reader,))
+            for _ in range(options["readers"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
@@ -0,0 +1,108 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from backend import json_codec
+from chat.consumers import HISTORY_PAGE_SIZE
+from chat.models import ChatRoom, Message
+from chat.serializers import MESSAGE_VALUES, serialize_message_rows
+from projects.models import Project
+from tasks.models import Task, TaskAssignedUser, TaskComment
+from tasks.serializers import TASK_VALUES, serialize_task_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Encode and decode a chat history frame and a task list response with "
+        "every JSON codec and report frames/s and MB/s. Data is rolled back "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=500)
+        parser.add_argument("--seconds", type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            payloads = self._populate(options["tasks"])
+            transaction.set_rollback(True)
+
+        for label, payload in payloads.items():
+            size = len(json_codec.CODECS["json"].dumps(payload).encode())
+            self.stdout.write(f"{label} ({size / 1024:.1f} KiB)")
+            for codec in json_codec.CODECS.values():
+                text = codec.dumps(payload)
+                encode = self._rate(lambda: codec.dumps(payload), options["seconds"])
+                decode = self._rate(lambda: codec.loads(text), options["seconds"])
+                self.stdout.write(
+                    f"  {codec.name:<6} encode {encode:8.0f}/s "
+                    f"{encode * size / 2**20:7.1f} MB/s, "
+                    f"decode {decode:8.0f}/s {decode * size / 2**20:7.1f} MB/s"
+                )
+
+    def _populate(self, task_count):
+        now = timezone.now()
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(
+                username=f"json-benchmark-{i}",
+                email=f"json-benchmark-{i}@example.com",
+                profile_picture=f"profile_pics/{i}.png",
+            )
+            for i in range(5)
+        )
+        project = Project.objects.create(
+            title="JSON benchmark", start_date=now, deadline=now
+        )
+        tasks = Task.objects.bulk_create(
+            Task(
+                project=project,
+                name=f"タスク {i}",
+                description="Prepare the release notes and review the Gantt chart.",
+                deadline=now,
+            )
+            for i in range(task_count)
+        )
+        TaskAssignedUser.objects.bulk_create(
+            TaskAssignedUser(task=task, user=users[i % len(users)])
+            for i, task in enumerate(tasks)
+        )
+        TaskComment.objects.bulk_create(
+            TaskComment(task=task, user=users[i % len(users)], content="了解です")
+            for i, task in enumerate(tasks[::5])
+        )
+        chatroom = ChatRoom.objects.create(project=project, name="benchmark")
+        Message.objects.bulk_create(
+            Message(
+                chatroom=chatroom,
+                user=users[i % len(users)],
+                content=f"メッセージ {i}: see https://example.com/tasks/{i}",
+            )
+            for i in range(HISTORY_PAGE_SIZE)
+        )
+
+        messages = serialize_message_rows(
+            list(chatroom.messages.values(*MESSAGE_VALUES))
+        )
+        task_rows = serialize_task_rows(list(project.tasks.values(*TASK_VALUES)))
+        return {
+            "chat history frame": {
+                "type": "history",
+                "messages": messages,
+                "before_cursor": "WyIyMDI2LTA0LTAxVDA5OjMwOjE1KzAwOjAwIiwgIjAiXQ",
+                "has_more": True,
+            },
+            "chat message frame": {"type": "message", "message": messages[0]},
+            f"task list ({task_count} tasks)": {"tasks": task_rows},
+        }
+
+    def _rate(self, func, seconds):
+        count = 0
+        deadline = time.perf_counter() + seconds
+        started = time.perf_counter()
+        while time.perf_counter() < deadline:
+            func()
+            count += 1
+        return count / (time.perf_counter() - started)
@@ -0,0 +1,147 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from chat.models import ChatRoom, Message
+from chat.serializers import MESSAGE_VALUES, MessageSerializer, serialize_message_rows
+from event.models import Event, EventColor
+from event.serializers import EVENT_VALUES, EventResponseSerializer, serialize_event_rows
+from notifications.models import Notification
+from notifications.serializers import (
+    NOTIFICATION_VALUES,
+    NotificationSerializer,
+    serialize_notification_rows,
+)
+from projects.models import Project
+from tasks.models import Task, TaskAssignedUser, TaskComment
+from tasks.serializers import TASK_VALUES, TaskResponseSerializer, serialize_task_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Serialize --rows tasks, messages, notifications and events with the "
+        "DRF serializers and with the .values() fast paths, and report rows/s "
+        "for each (query + serialization). Data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10_000)
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            data = self._populate(options["rows"], options["users"])
+            cases = self._cases(*data)
+            self.stdout.write(
+                f"{options['rows']} rows, {options['users']} users, "
+                f"best of {options['repeat']}"
+            )
+            for name, drf, fast in cases:
+                drf_rate = self._rate(drf, options["rows"], options["repeat"])
+                fast_rate = self._rate(fast, options["rows"], options["repeat"])
+                self.stdout.write(
+                    f"  {name:<13} drf {drf_rate:9.0f} rows/s, "
+                    f"fast {fast_rate:9.0f} rows/s ({fast_rate / drf_rate:4.1f}x)"
+                )
+            transaction.set_rollback(True)
+
+    def _populate(self, rows, user_count):
+        now = timezone.now()
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(
+                username=f"serializer-benchmark-{i}",
+                email=f"serializer-benchmark-{i}@example.com",
+                profile_picture=f"profile_pics/{i}.png" if i % 2 else "",
+            )
+            for i in range(user_count)
+        )
+        project = Project.objects.create(
+            title="Serializer benchmark", start_date=now, deadline=now
+        )
+        tasks = Task.objects.bulk_create(
+            Task(project=project, name=f"Task {i}", deadline=now) for i in range(rows)
+        )
+        TaskAssignedUser.objects.bulk_create(
+            TaskAssignedUser(task=task, user=users[i % user_count])
+            for i, task in enumerate(tasks)
+        )
+        TaskComment.objects.bulk_create(
+            TaskComment(task=task, user=users[i % user_count], content="comment")
+            for i, task in enumerate(tasks[::10])
+        )
+        chatroom = ChatRoom.objects.create(project=project, name="benchmark")
+        Message.objects.bulk_create(
+            Message(chatroom=chatroom, user=users[i % user_count], content=f"m{i}")
+            for i in range(rows)
+        )
+        Notification.objects.bulk_create(
+            Notification(
+                recipient=users[0],
+                title="Task",
+                message=f"n{i}",
+                notification_type="task",
+                related_object_id=str(i) if i % 2 else None,
+            )
+            for i in range(rows)
+        )
+        Event.objects.bulk_create(
+            Event(
+                project=project,
+                title=f"Event {i}",
+                start_date=now,
+                end_date=now,
+                color=EventColor.BLUE,
+            )
+            for i in range(rows)
+        )
+        return project, chatroom, users[0]
+
+    def _cases(self, project, chatroom, recipient):
+        tasks = project.tasks.all()
+        messages = chatroom.messages.all()
+        notifications = Notification.objects.filter(recipient=recipient)
+        events = project.events.order_by("start_date")
+        return [
+            (
+                "tasks",
+                lambda: TaskResponseSerializer(
+                    TaskResponseSerializer.setup_eager_loading(tasks), many=True
+                ).data,
+                lambda: serialize_task_rows(list(tasks.values(*TASK_VALUES))),
+            ),
+            (
+                "messages",
+                lambda: MessageSerializer(
+                    messages.select_related("user"), many=True
+                ).data,
+                lambda: serialize_message_rows(list(messages.values(*MESSAGE_VALUES))),
+            ),
+            (
+                "notifications",
+                lambda: NotificationSerializer(notifications, many=True).data,
+                lambda: serialize_notification_rows(
+                    notifications.values(*NOTIFICATION_VALUES)
+                ),
+            ),
+            (
+                "events",
+                lambda: EventResponseSerializer(events, many=True).data,
+                lambda: serialize_event_rows(events.values(*EVENT_VALUES)),
+            ),
+        ]
+
+    def _rate(self, serialize, rows, repeat):
+        renderer = JSONRenderer()
+        best = float("inf")
+        for _ in range(repeat):
+            cache.clear()
+            started = time.perf_counter()
+            renderer.render(serialize())
+            best = min(best, time.perf_counter() - started)
+        return rows / best
@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model, authenticate, password_validation
 from rest_framework import serializers
 
+from .summaries import context_summaries
+
 User = get_user_model()
 
 class UserSerializer(serializers.ModelSerializer):
@@ -47,6 +49,35 @@ class UserReadSerializer(serializers.ModelSerializer):
             "date_joined",
         ]
     
+class UserSummarySerializer(serializers.ModelSerializer):
+    """
+    Read-only user_id, name, email and profile_picture of a user, taken from
+    the user summary cache (api.summaries)
+    """
+
+    user_id = serializers.IntegerField(source="pk", read_only=True)
+    name = serializers.CharField(source="username", read_only=True)
+    email = serializers.EmailField(read_only=True)
+    profile_picture = serializers.CharField(read_only=True, allow_null=True)
+
+    # Return profile_picture as an absolute URL when a request is available,
+    # like an ImageField would
+    absolute_urls = False
+
+    class Meta:
+        model = User
+        fields = ["user_id", "name", "email", "profile_picture"]
+
+    def to_representation(self, instance):
+        summary = context_summaries(self.context).get(instance)
+        request = self.context.get("request")
+        if self.absolute_urls and request is not None and summary["profile_picture"]:
+            summary["profile_picture"] = request.build_absolute_uri(
+                summary["profile_picture"]
+            )
+        return summary
+
+
 class UserUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -0,0 +1,11 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .summaries import invalidate_user_summaries
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def drop_user_summary(sender, instance, **kwargs):
+    invalidate_user_summaries([instance.pk])
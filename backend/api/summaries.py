@@ -0,0 +1,107 @@
+"""
+Summaries of users as embedded in task, project, memo, file and chat payloads:
+
+    {"user_id": 1, "name": "...", "email": "...", "profile_picture": url | None}
+
+Building one resolves the profile picture URL through the storage backend.
+Summaries are kept in the default cache for USER_SUMMARY_CACHE_TTL seconds
+and, within one serializer pass or history frame, in a UserSummaries dict,
+so a list of thousands of rows builds each distinct user once. api.signals
+drops a user's entry when the user is saved or deleted; changes made with
+QuerySet.update() are only picked up when the entry expires.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+_CONTEXT_KEY = "user_summaries"
+
+
+def _cache_key(user_id):
+    return f"user-summary:{user_id}"
+
+
+def build_user_summary(user):
+    picture = user.profile_picture
+    return {
+        "user_id": user.pk,
+        "name": user.username,
+        "email": user.email,
+        "profile_picture": picture.url if picture else None,
+    }
+
+
+class UserSummaries:
+    """
+    Summaries looked up so far, by user ID
+
+    get() and get_many() return fresh dicts each time, so callers may
+    modify them.
+    """
+
+    def __init__(self):
+        self._summaries = {}
+
+    def get_many(self, user_ids):
+        """
+        {user_id: summary} for the given IDs, for callers that only have IDs
+        (.values() rows); users found neither here nor in the cache are
+        loaded with one query. Unknown IDs are left out.
+        """
+        user_ids = set(user_ids)
+        missing = user_ids - self._summaries.keys()
+        ttl = getattr(settings, "USER_SUMMARY_CACHE_TTL", 0)
+        if missing and ttl > 0:
+            cached = cache.get_many([_cache_key(user_id) for user_id in missing])
+            for user_id in list(missing):
+                summary = cached.get(_cache_key(user_id))
+                if summary is not None:
+                    self._summaries[user_id] = summary
+                    missing.discard(user_id)
+        if missing:
+            built = {
+                user.pk: build_user_summary(user)
+                for user in get_user_model().objects.filter(pk__in=missing).only(
+                    "pk", "username", "email", "profile_picture"
+                )
+            }
+            self._summaries.update(built)
+            if ttl > 0:
+                cache.set_many(
+                    {_cache_key(pk): summary for pk, summary in built.items()}, ttl
+                )
+        return {
+            user_id: dict(self._summaries[user_id])
+            for user_id in user_ids
+            if user_id in self._summaries
+        }
+
+    def get(self, user):
+        summary = self._summaries.get(user.pk)
+        if summary is None:
+            ttl = getattr(settings, "USER_SUMMARY_CACHE_TTL", 0)
+            summary = cache.get(_cache_key(user.pk)) if ttl > 0 else None
+            if summary is None:
+                summary = build_user_summary(user)
+                if ttl > 0:
+                    cache.set(_cache_key(user.pk), summary, ttl)
+            self._summaries[user.pk] = summary
+        return dict(summary)
+
+
+def context_summaries(context):
+    """
+    UserSummaries shared by every serializer using the given context
+    """
+    summaries = context.get(_CONTEXT_KEY)
+    if summaries is None:
+        summaries = context[_CONTEXT_KEY] = UserSummaries()
+    return summaries
+
+
+def invalidate_user_summaries(user_ids):
+    """
+    Drop the cached summaries of the given users
+    """
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
@@ -1,3 +1,68 @@
-from django.test import TestCase
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from projects.models import Project
+from tasks.models import Task, TaskComment
+from tasks.serializers import TaskCommentListSerializer
+
+from .summaries import UserSummaries, build_user_summary
+
+User = get_user_model()
+
+
+@override_settings(USER_SUMMARY_CACHE_TTL=300)
+class UserSummaryCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="author", email="author@example.com", password="testpass123"
+        )
+
+    def test_summary_is_built_once_per_user(self):
+        """一覧の行数に関係なくユーザーごとに1回だけ組み立てられること"""
+        project = Project.objects.create(
+            title="Summaries",
+            start_date=timezone.now(),
+            deadline=timezone.now() + timezone.timedelta(days=1),
+        )
+        task = Task.objects.create(project=project, name="T", deadline=timezone.now())
+        for i in range(20):
+            TaskComment.objects.create(task=task, user=self.user, content=f"c{i}")
+        comments = list(task.comments.select_related("user"))
+
+        with patch(
+            "api.summaries.build_user_summary", wraps=build_user_summary
+        ) as build:
+            data = TaskCommentListSerializer(comments, many=True).data
+            self.assertEqual(build.call_count, 1)
+            TaskCommentListSerializer(comments, many=True).data
+            self.assertEqual(build.call_count, 1)  # served from the cache
+
+        self.assertEqual(
+            data[0]["user"],
+            {
+                "user_id": self.user.pk,
+                "name": "author",
+                "email": "author@example.com",
+                "profile_picture": None,
+            },
+        )
+
+    def test_saving_user_invalidates_summary(self):
+        """ユーザーの更新でキャッシュが無効化されること"""
+        self.assertEqual(UserSummaries().get(self.user)["name"], "author")
+
+        self.user.username = "renamed"
+        self.user.save()
+
+        self.assertEqual(UserSummaries().get(self.user)["name"], "renamed")
+
+    def test_returned_summaries_are_copies(self):
+        """返された辞書を変更しても他の行に影響しないこと"""
+        summaries = UserSummaries()
+        summaries.get(self.user)["name"] = "changed"
+        self.assertEqual(summaries.get(self.user)["name"], "author")
@@ -1,12 +1,13 @@
-from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
 from django.contrib.auth.models import AnonymousUser
 
+from .authentication import SharedJWTAuthentication
+
 
 class JWTAuthMiddleware:
     def __init__(self, app):
         self.app = app
-        self.jwt_auth = JWTAuthentication()
+        self.jwt_auth = SharedJWTAuthentication()
 
     async def __call__(self, scope, receive, send):
         query_string = scope.get("query_string", b"").decode()
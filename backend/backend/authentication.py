@@ -0,0 +1,124 @@
+"""
+JWT authentication shared by NotificationMiddleware, DRF and the WebSocket
+middleware.
+
+The bearer token of an HTTP request is validated once; the outcome (user and
+token, or the authentication error) is stored on the Django request so the
+DRF authenticator reuses it instead of decoding the token and loading the
+user a second time. With JWT_USER_CACHE_TTL > 0 resolved users are also kept
+in a small in-process cache keyed by (user_id, jti) for that many seconds.
+"""
+
+import copy
+import threading
+import time
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework import exceptions
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+_REQUEST_ATTR = "_shared_jwt_auth"
+
+USER_CACHE_MAX_ENTRIES = 1024
+
+
+class _UserCache:
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+        # Hand out a copy so one request cannot mutate another's user
+        return copy.copy(user)
+
+    def set(self, key, user, ttl):
+        with self._lock:
+            if len(self._entries) >= USER_CACHE_MAX_ENTRIES:
+                now = time.monotonic()
+                for stale in [k for k, (_, exp) in self._entries.items() if exp <= now]:
+                    del self._entries[stale]
+                while len(self._entries) >= USER_CACHE_MAX_ENTRIES:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[key] = (copy.copy(user), time.monotonic() + ttl)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = _UserCache()
+
+
+class SharedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that reuses a result already computed for the request
+    and optionally caches users between requests.
+    """
+
+    def authenticate(self, request):
+        result = authenticate_request(getattr(request, "_request", request))
+        if isinstance(result, exceptions.APIException):
+            raise result
+        return result
+
+    def get_user(self, validated_token):
+        ttl = getattr(settings, "JWT_USER_CACHE_TTL", 0)
+        if ttl <= 0:
+            return super().get_user(validated_token)
+
+        key = (
+            str(validated_token.get(api_settings.USER_ID_CLAIM)),
+            validated_token.get(api_settings.JTI_CLAIM),
+        )
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, user, ttl)
+        return user
+
+
+_authenticator = SharedJWTAuthentication()
+
+
+def authenticate_request(request):
+    """
+    Validate the bearer token of a Django HttpRequest at most once
+
+    Returns:
+        (user, validated_token), None when the request carries no bearer
+        token, or the AuthenticationFailed/InvalidToken error raised while
+        validating it
+    """
+    try:
+        return getattr(request, _REQUEST_ATTR)
+    except AttributeError:
+        pass
+
+    try:
+        result = JWTAuthentication.authenticate(_authenticator, request)
+    except exceptions.APIException as exc:
+        result = exc
+    setattr(request, _REQUEST_ATTR, result)
+    return result
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate_user(str(instance.pk))
@@ -0,0 +1,36 @@
+class LoadedValuesMixin:
+    """
+    Model mixin remembering the field values an instance was loaded or last
+    saved with, so post_save receivers can tell which fields a save() changed.
+
+    Values are captured in from_db() and refreshed after save(); nothing is
+    tracked for QuerySet.update().
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+        }
+
+    def changed_fields(self, names):
+        """
+        Names among ``names`` whose value differs from the loaded/saved one;
+        all of them for an instance that was never loaded or saved
+        """
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None:
+            return list(names)
+        return [
+            name
+            for name in names
+            if name not in loaded or loaded[name] != getattr(self, name)
+        ]
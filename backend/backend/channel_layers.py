@@ -0,0 +1,342 @@
+"""
+Redis-protocol channel layer with consistent-hash sharding.
+
+Every group (``chat_<id>``, ``notifications_<id>``, ...) and every channel
+list is owned by exactly one shard, picked by hashing its name onto a ring of
+the configured hosts. Process-specific channels (``specific.<client>!<id>``)
+share one list per process, which a single reader task drains into per-channel
+buffers, so a daphne worker holds one blocking connection per shard it reads
+from rather than one per WebSocket. A group send pushes one message per such
+list, naming all of the process's channels in the group, and the reader fans
+it out; capacity thus limits the messages waiting for a process, not the
+number of its listeners a broadcast can reach.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import random
+import string
+import time
+import uuid
+from collections import defaultdict
+
+import msgpack
+import redis.asyncio as redis
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+
+
+class ConsistentHashRing:
+    """Maps keys onto nodes so that adding a node only moves about 1/N of the keys."""
+
+    def __init__(self, nodes, replicas=64):
+        if not nodes:
+            raise ValueError("ConsistentHashRing needs at least one node.")
+        ring = sorted(
+            (self._hash(f"{node}#{index}"), node)
+            for node in nodes
+            for index in range(replicas)
+        )
+        self._hashes = [point for point, _ in ring]
+        self._nodes = [node for _, node in ring]
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def get_node(self, key):
+        index = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+class _LoopState:
+    """Connections and receive buffers belonging to one event loop."""
+
+    def __init__(self):
+        self.clients = {}
+        self.buffers = {}
+        self.readers = {}
+        self.waiters = defaultdict(int)
+
+
+class ShardedRedisChannelLayer(BaseChannelLayer):
+    """
+    Channel layer storing channels and groups on a set of Redis-compatible
+    servers, sharded by consistent hashing of the channel or group name.
+    """
+
+    extensions = ["groups", "flush"]
+
+    blpop_timeout = 1
+
+    def __init__(
+        self,
+        hosts=None,
+        prefix="flowmatic",
+        expiry=60,
+        group_expiry=86400,
+        capacity=100,
+        channel_capacity=None,
+        ring_replicas=64,
+    ):
+        super().__init__(
+            expiry=expiry, capacity=capacity, channel_capacity=channel_capacity
+        )
+        self.channel_capacity = self.compile_capacities(self.channel_capacity)
+        self.hosts = list(hosts or ["redis://localhost:6379/0"])
+        self.prefix = prefix
+        self.group_expiry = group_expiry
+        self.ring = ConsistentHashRing(self.hosts, replicas=ring_replicas)
+        self.client_prefix = uuid.uuid4().hex
+        # Group messages not delivered to a member whose channel was full
+        self.dropped_messages = 0
+        self._loops = {}
+
+    # Connection handling
+
+    def _state(self):
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            for closed in [other for other in self._loops if other.is_closed()]:
+                del self._loops[closed]
+            state = self._loops[loop] = _LoopState()
+        return state
+
+    def _client(self, host):
+        state = self._state()
+        client = state.clients.get(host)
+        if client is None:
+            client = state.clients[host] = redis.Redis.from_url(host)
+        return client
+
+    def _key(self, kind, name):
+        return f"{self.prefix}:{kind}:{name}"
+
+    def shard_for(self, name):
+        """Return the host that owns a group or (non-local) channel name."""
+        return self.ring.get_node(self.non_local_name(name))
+
+    # Message envelope: the message is packed once and prefixed with a small
+    # header naming the channels it is for, so group_send does not re-encode
+    # it for every member.
+
+    def _pack_message(self, message):
+        return msgpack.packb(message)
+
+    def _envelope(self, channels, packed_message):
+        return msgpack.packb([channels, time.time() + self.expiry]) + packed_message
+
+    @staticmethod
+    def _open_envelope(data):
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(data)
+        channels, expires = next(unpacker)
+        return channels, expires, next(unpacker)
+
+    async def _push(self, host, items):
+        async with self._client(host).pipeline(transaction=False) as pipe:
+            for key, payload in items:
+                pipe.rpush(key, payload)
+                pipe.expire(key, self.expiry)
+            await pipe.execute()
+
+    # Channel layer API
+
+    async def send(self, channel, message):
+        """
+        Send a message onto a (general or specific) channel.
+        """
+        assert isinstance(message, dict), "message is not a dict"
+        self.require_valid_channel_name(channel)
+        assert "__asgi_channel__" not in message
+
+        real_channel = self.non_local_name(channel)
+        host = self.ring.get_node(real_channel)
+        key = self._key("channel", real_channel)
+
+        if await self._client(host).llen(key) >= self.get_capacity(channel):
+            raise ChannelFull(channel)
+
+        await self._push(
+            host, [(key, self._envelope([channel], self._pack_message(message)))]
+        )
+
+    async def receive(self, channel):
+        """
+        Receive the first message that arrives on the channel.
+        """
+        self.require_valid_channel_name(channel)
+        state = self._state()
+        real_channel = self.non_local_name(channel)
+
+        if "!" not in channel:
+            client = self._client(self.ring.get_node(real_channel))
+            key = self._key("channel", real_channel)
+            while True:
+                result = await client.blpop([key], timeout=self.blpop_timeout)
+                if result is None:
+                    continue
+                _, expires, message = self._open_envelope(result[1])
+                if expires >= time.time():
+                    return message
+
+        queue = state.buffers.setdefault(channel, asyncio.Queue())
+        state.waiters[real_channel] += 1
+        try:
+            reader = state.readers.get(real_channel)
+            if reader is None or reader.done():
+                state.readers[real_channel] = asyncio.ensure_future(
+                    self._read(state, real_channel)
+                )
+            while True:
+                expires, message = await queue.get()
+                if expires >= time.time():
+                    return message
+        finally:
+            state.waiters[real_channel] -= 1
+            if queue.empty():
+                state.buffers.pop(channel, None)
+
+    async def _read(self, state, real_channel):
+        """Drain a process-level list into the per-channel buffers."""
+        client = self._client(self.ring.get_node(real_channel))
+        key = self._key("channel", real_channel)
+        try:
+            while state.waiters[real_channel] > 0:
+                result = await client.blpop([key], timeout=self.blpop_timeout)
+                if result is None:
+                    self._prune_buffers(state)
+                    continue
+                channels, expires, message = self._open_envelope(result[1])
+                for channel in channels:
+                    state.buffers.setdefault(channel, asyncio.Queue()).put_nowait(
+                        (expires, message)
+                    )
+        finally:
+            if state.readers.get(real_channel) is asyncio.current_task():
+                del state.readers[real_channel]
+
+    def _prune_buffers(self, state):
+        now = time.time()
+        for channel, queue in list(state.buffers.items()):
+            while not queue.empty() and queue._queue[0][0] < now:
+                queue.get_nowait()
+            if queue.empty() and not queue._getters:
+                state.buffers.pop(channel, None)
+
+    async def new_channel(self, prefix="specific"):
+        """
+        Returns a new channel name that can be used by something in our
+        process as a specific channel.
+        """
+        suffix = "".join(random.choice(string.ascii_letters) for _ in range(12))
+        return f"{prefix}.{self.client_prefix}!{suffix}"
+
+    # Groups extension
+
+    async def group_add(self, group, channel):
+        """
+        Adds the channel name to a group.
+        """
+        self.require_valid_group_name(group)
+        self.require_valid_channel_name(channel)
+        key = self._key("group", group)
+        async with self._client(self.ring.get_node(group)).pipeline(
+            transaction=False
+        ) as pipe:
+            pipe.zadd(key, {channel: time.time()})
+            pipe.expire(key, self.group_expiry)
+            await pipe.execute()
+
+    async def group_discard(self, group, channel):
+        self.require_valid_channel_name(channel)
+        self.require_valid_group_name(group)
+        await self._client(self.ring.get_node(group)).zrem(
+            self._key("group", group), channel
+        )
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        self.require_valid_group_name(group)
+        key = self._key("group", group)
+
+        async with self._client(self.ring.get_node(group)).pipeline(
+            transaction=False
+        ) as pipe:
+            pipe.zremrangebyscore(key, 0, time.time() - self.group_expiry)
+            pipe.zrange(key, 0, -1)
+            _, members = await pipe.execute()
+
+        if not members:
+            return
+
+        # Channels of one process share its list and get a single message
+        by_list = defaultdict(list)
+        for member in members:
+            channel = member.decode()
+            by_list[self.non_local_name(channel)].append(channel)
+
+        packed_message = self._pack_message(message)
+        by_host = defaultdict(list)
+        for real_channel, channels in by_list.items():
+            by_host[self.ring.get_node(real_channel)].append(
+                (
+                    channels,
+                    self._key("channel", real_channel),
+                    self._envelope(channels, packed_message),
+                )
+            )
+
+        dropped = await asyncio.gather(
+            *(
+                self._push_within_capacity(host, items)
+                for host, items in by_host.items()
+            )
+        )
+        self.dropped_messages += sum(dropped)
+
+    async def _push_within_capacity(self, host, items):
+        """
+        Push the (channels, key, payload) items of a group send, one per
+        channel list, skipping lists at capacity as send() refuses them;
+        unlike send(), a full list does not fail the whole group send.
+
+        Returns:
+            Number of members skipped
+        """
+        async with self._client(host).pipeline(transaction=False) as pipe:
+            for _, key, _ in items:
+                pipe.llen(key)
+            lengths = await pipe.execute()
+
+        accepted = []
+        skipped = 0
+        for (channels, key, payload), length in zip(items, lengths):
+            # Channels sharing a list share its name, and so its capacity
+            if length >= self.get_capacity(channels[0]):
+                skipped += len(channels)
+            else:
+                accepted.append((key, payload))
+        if accepted:
+            await self._push(host, accepted)
+        return skipped
+
+    # Flush extension
+
+    async def flush(self):
+        for host in self.hosts:
+            client = self._client(host)
+            keys = await client.keys(f"{self.prefix}:*")
+            if keys:
+                await client.delete(*keys)
+        self._state().buffers.clear()
+
+    async def close(self):
+        state = self._state()
+        for reader in list(state.readers.values()):
+            reader.cancel()
+        for client in state.clients.values():
+            await client.aclose()
+        state.clients.clear()
@@ -0,0 +1,99 @@
+"""
+JSON encoding for REST bodies (backend.renderers) and WebSocket frames.
+
+settings.JSON_CODEC selects the implementation: "ujson" (default) or "json",
+the standard library as DRF uses it. Both write compact UTF-8 JSON, hand
+values JSON has no type for (datetimes, UUIDs, Decimals, lazy strings, ...)
+to DRF's JSONEncoder so they come out as in any DRF response, refuse to
+encode NaN and Infinity, and reject them on decode like DRF's strict parser.
+"""
+
+import json
+
+import ujson
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.utils import encoders
+
+_encode_default = encoders.JSONEncoder().default
+
+
+def _reject_constant(name):
+    raise ValueError(f"Out of range float values are not JSON compliant: {name}")
+
+
+class StdlibCodec:
+    name = "json"
+
+    def dumps(self, obj):
+        return json.dumps(
+            obj,
+            cls=encoders.JSONEncoder,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        )
+
+    def loads(self, data):
+        return json.loads(data, parse_constant=_reject_constant)
+
+
+class UJSONCodec:
+    name = "ujson"
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    def dumps(self, obj):
+        try:
+            return ujson.dumps(
+                obj,
+                ensure_ascii=False,
+                escape_forward_slashes=False,
+                allow_nan=False,
+                default=_encode_default,
+            )
+        except OverflowError:
+            # NaN/Infinity and integers past 64 bits; the standard library
+            # encodes the latter and raises DRF's ValueError for the former
+            return self.fallback.dumps(obj)
+
+    def loads(self, data):
+        # ujson accepts NaN and Infinity without a hook to refuse them; the
+        # rare document spelling either, even inside a string, is left to
+        # the standard library
+        nan, infinity = (
+            (b"NaN", b"Infinity") if isinstance(data, bytes) else ("NaN", "Infinity")
+        )
+        if nan in data or infinity in data:
+            return self.fallback.loads(data)
+        return ujson.loads(data)
+
+
+_stdlib = StdlibCodec()
+CODECS = {codec.name: codec for codec in (_stdlib, UJSONCodec(_stdlib))}
+
+
+def get_codec():
+    name = getattr(settings, "JSON_CODEC", "ujson")
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"JSON_CODEC must be one of {sorted(CODECS)}, not {name!r}."
+        ) from None
+
+
+def dumps(obj):
+    """
+    Encode obj as a compact JSON str with the configured codec
+    """
+    return get_codec().dumps(obj)
+
+
+def loads(data):
+    """
+    Decode a JSON str or UTF-8 bytes with the configured codec; malformed
+    input raises ValueError
+    """
+    return get_codec().loads(data)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from . import json_codec
+from .renderers import JSONRenderer
+
+
+class JSONParser(parsers.JSONParser):
+    """
+    DRF's JSONParser decoding through backend.json_codec
+    """
+
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if not self.strict:
+            return super().parse(stream, media_type, parser_context)
+
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        try:
+            return json_codec.loads(stream.read().decode(encoding))
+        except ValueError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,29 @@
+from rest_framework import renderers
+
+from . import json_codec
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """
+    DRF's JSONRenderer encoding through backend.json_codec
+
+    Only the output DRF's default settings produce (compact, strict, UTF-8)
+    comes from the codec; indented output, e.g. for the browsable API, and
+    other REST_FRAMEWORK JSON settings are rendered by DRF itself.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        if (
+            self.get_indent(accepted_media_type, renderer_context or {}) is not None
+            or self.ensure_ascii
+            or not (self.compact and self.strict)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = json_codec.dumps(data)
+        # Same JavaScript-safe escaping as DRF
+        ret = ret.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029")
+        return ret.encode()
@@ -0,0 +1,54 @@
+"""
+Field formatting for the read-only list fast paths.
+
+Large lists are serialized from .values() rows by plain functions next to
+the ModelSerializers they replace (serialize_task_rows, serialize_message_rows,
+serialize_notification_rows, serialize_event_rows) instead of binding and
+running a DRF field per attribute per row. The helpers here return exactly
+what the matching DRF field's to_representation() would, so the rendered JSON
+is byte-identical; backend/test_fast_serializers.py checks each fast path
+against its serializer.
+"""
+
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+# DateTimeField formatting depends on settings and the active time zone;
+# delegate to DRF so the two paths cannot drift apart
+_datetime_field = serializers.DateTimeField()
+_ZERO = datetime.timedelta(0)
+
+
+def datetime_repr(value):
+    return _datetime_field.to_representation(value)
+
+
+def datetime_formatter():
+    """
+    datetime_repr for formatting many values at once
+
+    Looking up the active time zone is most of the cost of datetime_repr, so
+    it is done once here. In the common case, UTC values shown in UTC with the
+    default format, the returned function builds DRF's output directly.
+    """
+    if (
+        api_settings.DATETIME_FORMAT == ISO_8601
+        and settings.USE_TZ
+        and timezone.get_current_timezone_name() == "UTC"
+    ):
+        return _utc_datetime_repr
+    return datetime_repr
+
+
+def _utc_datetime_repr(value):
+    if isinstance(value, datetime.datetime) and value.utcoffset() == _ZERO:
+        return value.replace(tzinfo=None).isoformat() + "Z"
+    return _datetime_field.to_representation(value)
+
+
+def uuid_repr(value):
+    return None if value is None else str(value)
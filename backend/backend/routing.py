@@ -1,4 +1,5 @@
 from chat.routing import websocket_urlpatterns as chat_urlpatterns
 from notifications.routing import websocket_urlpatterns as notification_urlpatterns
+from projects.routing import websocket_urlpatterns as project_urlpatterns
 
-websocket_urlpatterns = chat_urlpatterns + notification_urlpatterns
+websocket_urlpatterns = chat_urlpatterns + notification_urlpatterns + project_urlpatterns
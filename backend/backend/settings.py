@@ -11,10 +11,13 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import sys
 from datetime import timedelta
 from pathlib import Path
 from dotenv import load_dotenv
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -30,24 +33,77 @@ SECRET_KEY = os.getenv("SECRET_KEY", "fallback-secret")
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = os.getenv("DEBUG", "False") == "True"
 
+TESTING = len(sys.argv) > 1 and sys.argv[1] == "test"
+
 ALLOWED_HOSTS = ["*"]
 
 AUTH_USER_MODEL = "api.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "backend.authentication.SharedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "backend.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "backend.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
+# JSON implementation for REST bodies and WebSocket frames (backend.json_codec):
+# "ujson" or "json" (the standard library)
+JSON_CODEC = os.getenv("JSON_CODEC", "ujson")
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),
 }
 
+# Seconds an authenticated user is cached in-process per (user_id, token jti).
+# 0 disables the cache; changes to a user invalidate its entries.
+JWT_USER_CACHE_TTL = int(os.getenv("JWT_USER_CACHE_TTL", "0"))
+
+# CACHE_REDIS_URL (a redis:// URL) shares the default cache between worker
+# processes. Without it each process has its own LocMemCache, which cache
+# invalidations made by other processes never reach. The test suite always
+# uses LocMemCache.
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "")
+SHARED_CACHE = bool(CACHE_REDIS_URL) and not TESTING
+
+if SHARED_CACHE:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+        }
+    }
+
+# Seconds a user's project memberships are cached (projects.membership).
+# Member changes invalidate the entry once committed; 0 keeps only the
+# per-request lookup, the default unless the cache is shared.
+MEMBERSHIP_CACHE_TTL = int(
+    os.getenv("MEMBERSHIP_CACHE_TTL", "300" if SHARED_CACHE else "0")
+)
+
+# Seconds the task schedule and dependency graph of a project are cached
+# (tasks.schedule). Task and relation changes invalidate them once committed;
+# without a shared cache other processes only notice when their copy expires,
+# hence the short default.
+SCHEDULE_CACHE_TIMEOUT = int(
+    os.getenv("SCHEDULE_CACHE_TIMEOUT", "3600" if SHARED_CACHE else "30")
+)
+
+# Seconds the user dicts embedded in API and WebSocket payloads are cached
+# (api.summaries). Saving a user invalidates its entry; 0 disables the cache.
+USER_SUMMARY_CACHE_TTL = int(os.getenv("USER_SUMMARY_CACHE_TTL", "300"))
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -104,22 +160,96 @@ WSGI_APPLICATION = "backend.wsgi.application"
 ASGI_APPLICATION = "backend.asgi.application"
 
 # Channels settings
-CHANNEL_LAYERS = {
-    "default": {
-        "BACKEND": "channels.layers.InMemoryChannelLayer",
-    },
-}
+# CHANNEL_LAYER_BACKEND=redis shards groups and channels over CHANNEL_REDIS_HOSTS
+# (comma separated redis:// URLs) so several daphne workers can share groups.
+# The in-memory layer only works inside a single process and is always used
+# by the test suite.
+CHANNEL_LAYER_BACKEND = os.getenv("CHANNEL_LAYER_BACKEND", "memory")
+
+if CHANNEL_LAYER_BACKEND == "redis" and not TESTING:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "backend.channel_layers.ShardedRedisChannelLayer",
+            "CONFIG": {
+                "hosts": os.getenv(
+                    "CHANNEL_REDIS_HOSTS", "redis://localhost:6379/0"
+                ).split(","),
+                "prefix": os.getenv("CHANNEL_REDIS_PREFIX", "flowmatic"),
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels.layers.InMemoryChannelLayer",
+        },
+    }
+
+# Notification dispatch
+# "background": fan-out runs on a worker pool after the transaction commits
+# "eager": fan-out runs inline inside the request (used by the test suite)
+NOTIFICATION_DISPATCH_MODE = os.getenv(
+    "NOTIFICATION_DISPATCH_MODE", "eager" if TESTING else "background"
+)
+NOTIFICATION_DISPATCH_WORKERS = int(os.getenv("NOTIFICATION_DISPATCH_WORKERS", "4"))
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# DB_ENGINE=postgres is the production profile: connections are kept open for
+# DB_CONN_MAX_AGE seconds and checked before reuse. DB_POOL_MAX_SIZE > 0 uses
+# Django's native connection pool instead (psycopg 3 with the "pool" extra,
+# pinned in requirements.txt; persistent connections are then disabled, the
+# pool owns them).
+# DB_ENGINE=sqlite is meant for single-node installs. WAL lets readers run
+# next to the writer, writers wait up to DB_SQLITE_TIMEOUT seconds for the
+# lock instead of failing, and IMMEDIATE transactions take the write lock up
+# front so two read-then-write transactions cannot deadlock each other.
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "postgres":
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "0"))
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("DB_NAME") or "flowmatic",
+            "USER": os.getenv("DB_USER", "flowmatic"),
+            "PASSWORD": os.getenv("DB_PASSWORD", ""),
+            "HOST": os.getenv("DB_HOST", "localhost"),
+            "PORT": os.getenv("DB_PORT", "5432"),
+            "CONN_MAX_AGE": (
+                0 if DB_POOL_MAX_SIZE else int(os.getenv("DB_CONN_MAX_AGE", "60"))
+            ),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {},
+        }
     }
-}
+    if DB_POOL_MAX_SIZE:
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": DB_POOL_MAX_SIZE,
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        }
+elif DB_ENGINE == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("DB_NAME") or BASE_DIR / "db.sqlite3",
+            "OPTIONS": {
+                "timeout": float(os.getenv("DB_SQLITE_TIMEOUT", "20")),
+                "transaction_mode": os.getenv("DB_SQLITE_TRANSACTION_MODE", "IMMEDIATE"),
+                "init_command": (
+                    f"PRAGMA journal_mode={os.getenv('DB_SQLITE_JOURNAL_MODE', 'WAL')};"
+                    "PRAGMA synchronous=NORMAL;"
+                ),
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(
+        f"DB_ENGINE must be 'postgres' or 'sqlite', not {DB_ENGINE!r}"
+    )
 
 
 # Password validation
@@ -0,0 +1,93 @@
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, TestCase
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from chat.models import ChatRoom, ChatRoomUser, Message
+from event.models import Event
+from projects.models import Project
+from tasks.models import Task
+
+User = get_user_model()
+
+
+class AsyncAPIViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="asyncuser", email="async@example.com", password="password"
+        )
+        self.stranger = User.objects.create_user(
+            username="stranger", email="stranger@example.com", password="password"
+        )
+        self.project = Project.objects.create(
+            title="Async Project",
+            start_date=timezone.now(),
+            deadline=timezone.now() + timezone.timedelta(days=1),
+        )
+        self.project.members.add(self.user)
+        Task.objects.create(
+            project=self.project, name="Task", deadline=timezone.now()
+        )
+        Event.objects.create(
+            project=self.project,
+            title="Event",
+            start_date=timezone.now(),
+            end_date=timezone.now(),
+            color="blue",
+        )
+        self.chatroom = ChatRoom.objects.create(project=self.project, name="Room")
+        ChatRoomUser.objects.create(chatroom=self.chatroom, user=self.user)
+        Message.objects.create(chatroom=self.chatroom, user=self.user, content="hi")
+
+        base = f"/api/projects/{self.project.project_id}"
+        self.urls = {
+            "tasks": f"{base}/tasks/",
+            "events": f"{base}/events/",
+            "messages": f"{base}/chatrooms/{self.chatroom.chatroom_id}/messages/",
+            "projects": "/api/projects/",
+        }
+
+    def auth(self, user):
+        return {"authorization": f"Bearer {AccessToken.for_user(user)}"}
+
+    def test_list_views_are_served_natively_async(self):
+        """一覧エンドポイントが非同期ビューとして登録されていること"""
+        for url in self.urls.values():
+            with self.subTest(url=url):
+                self.assertTrue(iscoroutinefunction(resolve(url).func))
+
+    async def test_async_get_returns_data_and_enforces_permissions(self):
+        """非同期GETでデータが返り、認証・権限チェックが行われること"""
+        client = AsyncClient()
+        for key, url in self.urls.items():
+            with self.subTest(url=url):
+                response = await client.get(url, headers=self.auth(self.user))
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()[key]), 1)
+
+                response = await client.get(url)
+                self.assertEqual(response.status_code, 401)
+
+        for key in ("tasks", "events", "messages"):
+            response = await client.get(self.urls[key], headers=self.auth(self.stranger))
+            self.assertEqual(response.status_code, 403)
+
+        missing = f"/api/projects/{self.chatroom.chatroom_id}/tasks/"
+        response = await client.get(missing, headers=self.auth(self.user))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_sync_handlers_of_async_view_still_work(self):
+        """同じビューの同期ハンドラ（POST）も動作すること"""
+        client = AsyncClient()
+        response = await client.post(
+            self.urls["messages"],
+            {"content": "from async client"},
+            content_type="application/json",
+            headers=self.auth(self.user),
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(
+            await Message.objects.filter(content="from async client").aexists()
+        )
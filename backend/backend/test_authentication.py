@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.authentication import user_cache
+
+User = get_user_model()
+
+
+class SharedJWTAuthenticationTest(APITestCase):
+    url = "/api/projects/"
+
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(
+            username="authuser", email="auth@example.com", password="password"
+        )
+        self.token = str(AccessToken.for_user(self.user))
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def tearDown(self):
+        user_cache.clear()
+
+    def test_token_is_validated_once_per_request(self):
+        """ミドルウェアとDRFでトークン検証とユーザー取得が1回ずつで済むこと"""
+        with mock.patch.object(
+            JWTAuthentication,
+            "get_validated_token",
+            autospec=True,
+            side_effect=JWTAuthentication.get_validated_token,
+        ) as validate, mock.patch.object(
+            JWTAuthentication,
+            "get_user",
+            autospec=True,
+            side_effect=JWTAuthentication.get_user,
+        ) as get_user:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(validate.call_count, 1)
+        self.assertEqual(get_user.call_count, 1)
+
+    def test_invalid_token_is_rejected(self):
+        """不正なトークンは401になること"""
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer not-a-token")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(JWT_USER_CACHE_TTL=60)
+    def test_user_cache_skips_user_query_until_user_changes(self):
+        """TTLキャッシュ有効時は同じトークンでユーザーを再取得しないこと"""
+        with mock.patch.object(
+            JWTAuthentication,
+            "get_user",
+            autospec=True,
+            side_effect=JWTAuthentication.get_user,
+        ) as get_user:
+            self.client.get(self.url)
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(get_user.call_count, 1)
+
+            self.user.is_active = False
+            self.user.save()
+            response = self.client.get(self.url)
+
+        self.assertEqual(get_user.call_count, 2)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,152 @@
+import asyncio
+from collections import Counter
+
+from channels.exceptions import ChannelFull
+from channels.layers import InMemoryChannelLayer, get_channel_layer
+from django.test import SimpleTestCase
+
+from backend.channel_layers import ConsistentHashRing, ShardedRedisChannelLayer
+from chat.management.redis_standin import StandInThread
+
+
+class ConsistentHashRingTest(SimpleTestCase):
+    def test_keys_are_spread_over_all_nodes(self):
+        """グループ名が全シャードに分散されること"""
+        ring = ConsistentHashRing(["a", "b", "c"])
+        counts = Counter(ring.get_node(f"chat_{i}") for i in range(3000))
+        self.assertEqual(set(counts), {"a", "b", "c"})
+        self.assertTrue(all(count > 600 for count in counts.values()))
+
+    def test_adding_a_node_moves_few_keys(self):
+        """シャード追加時に移動するキーが一部に留まること"""
+        before = ConsistentHashRing(["a", "b", "c"])
+        after = ConsistentHashRing(["a", "b", "c", "d"])
+        keys = [f"notifications_{i}" for i in range(3000)]
+        moved = sum(before.get_node(key) != after.get_node(key) for key in keys)
+        self.assertLess(moved, len(keys) * 0.4)
+
+
+class ShardedRedisChannelLayerTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.standins = [StandInThread().start(), StandInThread().start()]
+        cls.hosts = [standin.url for standin in cls.standins]
+
+    @classmethod
+    def tearDownClass(cls):
+        for standin in cls.standins:
+            standin.stop()
+        super().tearDownClass()
+
+    def make_layer(self, **kwargs):
+        return ShardedRedisChannelLayer(hosts=self.hosts, **kwargs)
+
+    async def test_group_send_reaches_channels_of_other_processes(self):
+        """別プロセス相当のレイヤー間でグループ配信が届くこと"""
+        worker1, worker2, sender = self.make_layer(), self.make_layer(), self.make_layer()
+        channel1 = await worker1.new_channel()
+        channel2 = await worker2.new_channel()
+        await worker1.group_add("chat_room", channel1)
+        await worker2.group_add("chat_room", channel2)
+
+        await sender.group_send("chat_room", {"type": "chat.message", "text": "hi"})
+
+        self.assertEqual(
+            await asyncio.wait_for(worker1.receive(channel1), 5),
+            {"type": "chat.message", "text": "hi"},
+        )
+        self.assertEqual(
+            await asyncio.wait_for(worker2.receive(channel2), 5),
+            {"type": "chat.message", "text": "hi"},
+        )
+
+        await worker2.group_discard("chat_room", channel2)
+        await sender.group_send("chat_room", {"type": "chat.message", "text": "again"})
+        self.assertEqual(
+            (await asyncio.wait_for(worker1.receive(channel1), 5))["text"], "again"
+        )
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(worker2.receive(channel2), 1.5)
+
+        for layer in (worker1, worker2, sender):
+            await layer.flush()
+            await layer.close()
+
+    async def test_messages_for_one_process_are_routed_to_each_channel(self):
+        """同一プロセス内の複数チャネルへ正しく振り分けられること"""
+        layer = self.make_layer()
+        channels = [await layer.new_channel() for _ in range(3)]
+        for index, channel in enumerate(channels):
+            await layer.send(channel, {"type": "test", "index": index})
+
+        received = await asyncio.wait_for(
+            asyncio.gather(*(layer.receive(channel) for channel in channels)), 5
+        )
+        self.assertEqual([message["index"] for message in received], [0, 1, 2])
+
+        await layer.flush()
+        await layer.close()
+
+    async def test_channel_capacity(self):
+        """容量を超えるとChannelFullが送出されること"""
+        layer = self.make_layer(capacity=2)
+        await layer.send("plain.channel", {"type": "test"})
+        await layer.send("plain.channel", {"type": "test"})
+        with self.assertRaises(ChannelFull):
+            await layer.send("plain.channel", {"type": "test"})
+
+        await layer.flush()
+        await layer.close()
+
+    async def test_group_send_respects_channel_capacity(self):
+        """グループ配信でも容量を超えたチャネルには送らず、破棄数を数えること"""
+        layer = self.make_layer(capacity=1)
+        await layer.group_add("chat_full", "full.channel")
+        await layer.group_add("chat_full", "free.channel")
+        await layer.send("full.channel", {"type": "test", "text": "queued"})
+
+        await layer.group_send("chat_full", {"type": "test", "text": "group"})
+
+        self.assertEqual(layer.dropped_messages, 1)
+        self.assertEqual(
+            (await asyncio.wait_for(layer.receive("full.channel"), 5))["text"], "queued"
+        )
+        self.assertEqual(
+            (await asyncio.wait_for(layer.receive("free.channel"), 5))["text"], "group"
+        )
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(layer.receive("full.channel"), 1.5)
+
+        await layer.flush()
+        await layer.close()
+
+    async def test_group_send_reaches_more_process_channels_than_capacity(self):
+        """容量を超える数の同一プロセスのチャネルにもグループ配信が届くこと"""
+        layer = self.make_layer(capacity=10)
+        channels = [await layer.new_channel() for _ in range(25)]
+        for channel in channels:
+            await layer.group_add("chat_large", channel)
+
+        await layer.group_send("chat_large", {"type": "test", "text": "all"})
+
+        self.assertEqual(layer.dropped_messages, 0)
+        received = await asyncio.wait_for(
+            asyncio.gather(*(layer.receive(channel) for channel in channels)), 5
+        )
+        self.assertEqual({message["text"] for message in received}, {"all"})
+
+        await layer.flush()
+        await layer.close()
+
+    def test_groups_are_sharded_over_hosts(self):
+        """グループがシャードに分散配置されること"""
+        layer = self.make_layer()
+        shards = {layer.shard_for(f"chat_{i}") for i in range(50)}
+        self.assertEqual(shards, set(self.hosts))
+
+
+class ChannelLayerSettingsTest(SimpleTestCase):
+    def test_tests_use_in_memory_layer(self):
+        """テスト実行時はインメモリレイヤーが使われること"""
+        self.assertIsInstance(get_channel_layer(), InMemoryChannelLayer)
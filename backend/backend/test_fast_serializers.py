@@ -0,0 +1,168 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from backend.representation import datetime_formatter, datetime_repr
+from chat.models import ChatRoom, Message
+from chat.serializers import MESSAGE_VALUES, MessageSerializer, serialize_message_rows
+from event.models import Event, EventColor
+from event.serializers import EVENT_VALUES, EventResponseSerializer, serialize_event_rows
+from notifications.models import Notification
+from notifications.serializers import (
+    NOTIFICATION_VALUES,
+    NotificationSerializer,
+    serialize_notification_rows,
+)
+from projects.models import Project
+from tasks.models import (
+    Task,
+    TaskAssignedUser,
+    TaskComment,
+    TaskRelation,
+    TaskRelationType,
+)
+from tasks.serializers import TASK_VALUES, TaskResponseSerializer, serialize_task_rows
+
+User = get_user_model()
+
+
+class FastSerializerParityTest(TestCase):
+    """
+    The .values() fast paths must render the same bytes as the serializers
+    they stand in for.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.alice = User.objects.create_user(
+            username="alice", email="alice@example.com", password="pass"
+        )
+        cls.alice.profile_picture = "profile_pics/alice.png"
+        cls.alice.save()
+        cls.nameless = User.objects.create(username=None, email="nameless@example.com")
+        cls.project = Project.objects.create(
+            title="Parity", start_date=now, deadline=now + timezone.timedelta(days=3)
+        )
+
+        parent = Task.objects.create(
+            project=cls.project, name="parent", deadline=now, priority="high"
+        )
+        child = Task.objects.create(
+            project=cls.project,
+            name="child",
+            description="説明",
+            deadline=now + timezone.timedelta(hours=5, microseconds=123),
+        )
+        Task.objects.create(project=cls.project, name="empty", deadline=now)
+        for task in (parent, child):
+            for user in (cls.nameless, cls.alice):
+                TaskAssignedUser.objects.create(task=task, user=user)
+        TaskRelation.objects.create(
+            parent_task=parent,
+            child_task=child,
+            relation_type=TaskRelationType.START_TO_START,
+        )
+        for user in (cls.alice, cls.nameless, cls.alice):
+            TaskComment.objects.create(task=child, user=user, content="コメント")
+
+        chatroom = ChatRoom.objects.create(project=cls.project, name="room")
+        for user in (cls.alice, cls.nameless):
+            Message.objects.create(chatroom=chatroom, user=user, content="hi")
+        cls.chatroom = chatroom
+
+        Notification.objects.create(
+            recipient=cls.alice,
+            title="Task",
+            message="assigned",
+            notification_type="task",
+            related_object_id=str(child.pk),
+        )
+        Notification.objects.create(
+            recipient=cls.alice,
+            title="System",
+            message="maintenance",
+            notification_type="system",
+            is_read=True,
+        )
+
+        for all_day in (False, True):
+            Event.objects.create(
+                project=cls.project,
+                title="event",
+                is_all_day=all_day,
+                start_date=now,
+                end_date=now + timezone.timedelta(days=1),
+                color=EventColor.GREEN,
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def assertSameJSON(self, fast, serializer_data):
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(fast), renderer.render(serializer_data))
+
+    def check_all(self):
+        tasks = Task.objects.filter(project=self.project).order_by("deadline", "pk")
+        self.assertSameJSON(
+            serialize_task_rows(list(tasks.values(*TASK_VALUES))),
+            TaskResponseSerializer(
+                TaskResponseSerializer.setup_eager_loading(tasks), many=True
+            ).data,
+        )
+
+        messages = self.chatroom.messages.order_by("timestamp", "message_id")
+        self.assertSameJSON(
+            serialize_message_rows(list(messages.values(*MESSAGE_VALUES))),
+            MessageSerializer(messages.select_related("user"), many=True).data,
+        )
+
+        notifications = Notification.objects.filter(recipient=self.alice)
+        self.assertSameJSON(
+            serialize_notification_rows(notifications.values(*NOTIFICATION_VALUES)),
+            NotificationSerializer(notifications, many=True).data,
+        )
+
+        events = self.project.events.order_by("start_date", "is_all_day")
+        self.assertSameJSON(
+            serialize_event_rows(events.values(*EVENT_VALUES)),
+            EventResponseSerializer(events, many=True).data,
+        )
+
+    def test_fast_paths_match_serializers(self):
+        """高速パスの出力がシリアライザーのJSONとバイト単位で一致すること"""
+        self.check_all()
+        # Second pass is served from the user summary cache
+        self.check_all()
+
+    def test_fast_paths_match_in_other_time_zone(self):
+        """有効なタイムゾーンが異なっても日時の表現が一致すること"""
+        with timezone.override("Asia/Tokyo"):
+            self.check_all()
+
+    def test_datetime_formatter_matches_datetime_repr(self):
+        """一括用の日時フォーマッタがdatetime_reprと同じ表現を返すこと"""
+        values = [
+            None,
+            datetime.datetime(2026, 3, 1, 9, 30, tzinfo=datetime.timezone.utc),
+            datetime.datetime(2026, 3, 1, 9, 30, 0, 5, tzinfo=datetime.timezone.utc),
+            datetime.datetime(
+                2026, 3, 1, 9, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=2))
+            ),
+        ]
+        for zone in ("UTC", "Asia/Tokyo"):
+            with timezone.override(zone):
+                formatter = datetime_formatter()
+                for value in values:
+                    with self.subTest(zone=zone, value=value):
+                        self.assertEqual(formatter(value), datetime_repr(value))
+
+    def test_empty_rows(self):
+        """行がない場合は空のリストになること"""
+        self.assertEqual(serialize_task_rows([]), [])
+        self.assertEqual(serialize_message_rows([]), [])
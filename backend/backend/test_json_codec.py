@@ -0,0 +1,79 @@
+import datetime
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework import renderers
+from rest_framework.test import APITestCase
+
+from . import json_codec
+from .renderers import JSONRenderer
+
+User = get_user_model()
+
+PAYLOAD = {
+    "task_id": uuid.UUID("0b4a7c0e-93a4-4f4e-9a51-7c1c0b6f2d3e"),
+    "deadline": datetime.datetime(2026, 4, 1, 9, 30, 15, 120000, tzinfo=datetime.UTC),
+    "day": datetime.date(2026, 4, 1),
+    "hours": Decimal("1.50"),
+    "label": gettext_lazy("Task"),
+    "path": "/media/profile_pics/a.png",
+    "content": "締め切り\u2028\u2029<b>&</b>",
+    "tags": ("a", "b"),
+    "count": 2**70,
+    "nested": [{"is_read": False, "related_object_id": None}],
+}
+
+
+class JSONCodecTest(SimpleTestCase):
+    def test_codecs_agree_with_drf(self):
+        """どのコーデックでもDRFのJSONRendererと同じJSONになること"""
+        expected = renderers.JSONRenderer().render(PAYLOAD)
+        for name in json_codec.CODECS:
+            with self.subTest(codec=name), override_settings(JSON_CODEC=name):
+                self.assertEqual(JSONRenderer().render(PAYLOAD), expected)
+                self.assertEqual(
+                    json_codec.loads(json_codec.dumps(PAYLOAD))["task_id"],
+                    str(PAYLOAD["task_id"]),
+                )
+
+    def test_out_of_range_floats_are_rejected(self):
+        """NaNやInfinityはエンコード・デコードともに拒否されること"""
+        for name in json_codec.CODECS:
+            with self.subTest(codec=name), override_settings(JSON_CODEC=name):
+                with self.assertRaises(ValueError):
+                    json_codec.dumps({"value": float("nan")})
+                with self.assertRaises(ValueError):
+                    json_codec.loads('{"value": NaN}')
+                with self.assertRaises(ValueError):
+                    json_codec.loads(b"[-Infinity]")
+                self.assertEqual(
+                    json_codec.loads('{"NaN": "Infinity"}'), {"NaN": "Infinity"}
+                )
+
+    def test_unknown_codec_is_rejected(self):
+        """未知のコーデック名は設定エラーになること"""
+        with override_settings(JSON_CODEC="simplejson"):
+            with self.assertRaises(ImproperlyConfigured):
+                json_codec.dumps({})
+
+
+class JSONParserTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="parser", email="parser@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_malformed_body_is_a_parse_error(self):
+        """不正なJSONやNaNを含む本文は400になること"""
+        for body in ('{"title": ', '{"title": "x", "value": NaN}'):
+            with self.subTest(body=body):
+                response = self.client.post(
+                    "/api/projects/", body, content_type="application/json"
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("JSON parse error", response.data["detail"])
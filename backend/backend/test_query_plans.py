@@ -0,0 +1,103 @@
+import unittest
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from chat.models import ChatRoom, Message
+from files.models import ProjectFile
+from memos.models import ProjectMemo
+from notifications.models import Notification
+from projects.models import Project
+from tasks.models import Task
+
+User = get_user_model()
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "plans are checked on SQLite")
+class HotQueryPlanTest(TestCase):
+    """
+    Hot filter/order_by shapes from the views and consumers must be answered
+    from their composite index: no table scan and no sort step.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.user = User.objects.create_user(username="planner", password="pass")
+        cls.project = Project.objects.create(
+            title="Plans", start_date=now, deadline=now
+        )
+        cls.chatroom = ChatRoom.objects.create(project=cls.project, name="room")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(f"USING INDEX {index_name}", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+        for line in plan.splitlines():
+            self.assertNotRegex(line.strip(), r"^SCAN \w+$", plan)
+
+    def test_notification_list(self):
+        """通知一覧が受信者・作成日時インデックスを使うこと"""
+        self.assertUsesIndex(
+            Notification.objects.filter(recipient=self.user),
+            "notif_recipient_created_idx",
+        )
+
+    def test_unread_notifications(self):
+        """未読通知の抽出が未読の部分インデックスを使うこと"""
+        self.assertUsesIndex(
+            # Same WHERE as the UPDATE in mark_all_read, which has no ordering
+            Notification.objects.filter(recipient=self.user, is_read=False).order_by(),
+            "notif_unread_recipient_idx",
+        )
+
+    def test_recent_notifications_in_consumer(self):
+        """WebSocketの最新通知取得が受信者・作成日時インデックスを使うこと"""
+        self.assertUsesIndex(
+            Notification.objects.filter(recipient=self.user).order_by("-created_at")[
+                :10
+            ],
+            "notif_recipient_created_idx",
+        )
+
+    def test_message_page(self):
+        """メッセージのページ取得がチャットルーム・時刻インデックスを使うこと"""
+        self.assertUsesIndex(
+            Message.objects.filter(chatroom=self.chatroom).order_by(
+                "-timestamp", "-message_id"
+            )[:51],
+            "chat_message_room_ts_idx",
+        )
+
+    def test_task_list(self):
+        """タスク一覧がプロジェクト・期限インデックスを使うこと"""
+        self.assertUsesIndex(
+            Task.objects.filter(project=self.project).order_by("deadline"),
+            "task_project_deadline_idx",
+        )
+
+    def test_event_list_with_range(self):
+        """期間指定のイベント一覧がプロジェクト・開始日時インデックスを使うこと"""
+        now = timezone.now()
+        self.assertUsesIndex(
+            self.project.events.filter(start_date__gte=now, end_date__lte=now).order_by(
+                "start_date"
+            ),
+            "event_project_start_idx",
+        )
+
+    def test_memo_list(self):
+        """メモ一覧がプロジェクト・ピン留め・作成日時インデックスを使うこと"""
+        self.assertUsesIndex(
+            ProjectMemo.objects.filter(project_id=self.project.pk),
+            "memo_project_pinned_idx",
+        )
+
+    def test_file_list(self):
+        """ファイル一覧がプロジェクト・アップロード日時インデックスを使うこと"""
+        self.assertUsesIndex(
+            ProjectFile.objects.filter(project=self.project).order_by("-uploaded_at"),
+            "file_project_uploaded_idx",
+        )
@@ -1,26 +1,36 @@
-import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
 
+from api.summaries import UserSummaries
+from backend import json_codec
 from .models import ChatRoom, ChatRoomUser, Message
+from .pagination import InvalidCursor, encode_cursor, paginate_messages
+from .typing import TypingIndicator
 
 User = get_user_model()
 
+# Messages sent per history frame, on join and per load_history request
+HISTORY_PAGE_SIZE = 50
+
 
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.project_id = self.scope["url_route"]["kwargs"]["project_id"]
         self.chatroom_id = self.scope["url_route"]["kwargs"]["chatroom_id"]
         self.room_group_name = f"chat_{self.chatroom_id}"
+        self.typing = TypingIndicator(self.broadcast_typing)
+        self.typing_user_id = None
 
         await self.accept()
 
     async def disconnect(self, close_code):
+        if hasattr(self, "typing"):
+            await self.typing.close()
         await self.channel_layer.group_discard(self.room_group_name, self.channel_name)
 
     async def receive(self, text_data):
-        text_data_json = json.loads(text_data)
+        text_data_json = json_codec.loads(text_data)
         message_type = text_data_json.get("type", "message")
 
         if message_type == "join_room":
@@ -29,6 +39,8 @@ class ChatConsumer(AsyncWebsocketConsumer):
             await self.handle_message(text_data_json)
         elif message_type == "typing":
             await self.handle_typing(text_data_json)
+        elif message_type == "load_history":
+            await self.handle_load_history(text_data_json)
 
     async def handle_join_room(self):
         await self.channel_layer.group_add(self.room_group_name, self.channel_name)
@@ -36,34 +48,62 @@ class ChatConsumer(AsyncWebsocketConsumer):
         chatroom = await self.get_chatroom()
         if not chatroom:
             await self.send(
-                text_data=json.dumps({"type": "error", "message": "Chatroom not found"})
+                text_data=json_codec.dumps(
+                    {"type": "error", "message": "Chatroom not found"}
+                )
             )
             return
 
-        messages = await self.get_messages(chatroom)
+        await self.send_history(chatroom)
 
-        for message in messages:
+    async def handle_load_history(self, text_data_json):
+        chatroom = await self.get_chatroom()
+        if not chatroom:
             await self.send(
-                text_data=json.dumps(
-                    {
-                        "type": "message",
-                        "message": {
-                            "message_id": str(message.message_id),
-                            "chatroom_id": str(message.chatroom.chatroom_id),
-                            "user_id": message.user.pk,
-                            "name": message.user.username,
-                            "email": message.user.email,
-                            "profile_picture": message.user.profile_picture.url
-                            if message.user.profile_picture
-                            else None,
-                            "content": message.content,
-                            "timestamp": message.timestamp.isoformat(),
-                        },
-                    }
+                text_data=json_codec.dumps(
+                    {"type": "error", "message": "Chatroom not found"}
+                )
+            )
+            return
+
+        before = text_data_json.get("before")
+        if not isinstance(before, str) or not before:
+            await self.send(
+                text_data=json_codec.dumps(
+                    {"type": "error", "message": "before cursor is required"}
+                )
+            )
+            return
+
+        await self.send_history(chatroom, before)
+
+    async def send_history(self, chatroom, before=None):
+        """
+        Send one page of history, newest HISTORY_PAGE_SIZE messages before the
+        cursor, as a single frame. Older pages are requested with load_history.
+        """
+        try:
+            messages, before_cursor, has_more = await self.get_history_page(
+                chatroom, before
+            )
+        except InvalidCursor:
+            await self.send(
+                text_data=json_codec.dumps(
+                    {"type": "error", "message": "Invalid cursor"}
                 )
             )
+            return
 
-        await self.send(text_data=json.dumps({"type": "history_complete"}))
+        await self.send(
+            text_data=json_codec.dumps(
+                {
+                    "type": "history",
+                    "messages": messages,
+                    "before_cursor": before_cursor,
+                    "has_more": has_more,
+                }
+            )
+        )
 
     async def handle_message(self, text_data_json):
         content = text_data_json.get("content")
@@ -72,53 +112,62 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return
 
         message = await self.save_message(content)
+        self.typing.update(False)
 
+        # Encoded once here rather than in every listener's chat_message
         await self.channel_layer.group_send(
             self.room_group_name,
             {
                 "type": "chat_message",
-                "message": {
-                    "message_id": str(message.message_id),
-                    "chatroom_id": str(message.chatroom.chatroom_id),
-                    "user_id": message.user.pk,
-                    "name": message.user.username,
-                    "email": message.user.email,
-                    "profile_picture": message.user.profile_picture.url
-                    if message.user.profile_picture
-                    else None,
-                    "content": message.content,
-                    "timestamp": message.timestamp.isoformat(),
-                },
+                "text": json_codec.dumps(
+                    {"type": "message", "message": self.serialize_message(message)}
+                ),
             },
         )
 
+    @staticmethod
+    def serialize_message(message, summaries=None):
+        if summaries is None:
+            summaries = UserSummaries()
+        user = summaries.get(message.user)
+        return {
+            "message_id": str(message.message_id),
+            "chatroom_id": str(message.chatroom_id),
+            "user_id": user["user_id"],
+            "name": user["name"],
+            "email": user["email"],
+            "profile_picture": user["profile_picture"],
+            "content": message.content,
+            "timestamp": message.timestamp.isoformat(),
+        }
+
     async def handle_typing(self, text_data_json):
-        user_id = text_data_json.get("user_id")
-        is_typing = text_data_json.get("is_typing", False)
+        user = self.scope["user"]
+        self.typing_user_id = (
+            user.pk if user.is_authenticated else text_data_json.get("user_id")
+        )
+        self.typing.update(bool(text_data_json.get("is_typing", False)))
 
+    async def broadcast_typing(self, is_typing):
         await self.channel_layer.group_send(
             self.room_group_name,
             {
                 "type": "user_typing",
-                "user_id": user_id,
-                "is_typing": is_typing,
+                "text": json_codec.dumps(
+                    {
+                        "type": "typing",
+                        "user_id": self.typing_user_id,
+                        "is_typing": is_typing,
+                    }
+                ),
             },
         )
 
     async def chat_message(self, event):
-        message = event["message"]
-        await self.send(text_data=json.dumps({"type": "message", "message": message}))
+        await self.send(text_data=event["text"])
 
     async def user_typing(self, event):
-        await self.send(
-            text_data=json.dumps(
-                {
-                    "type": "typing",
-                    "user_id": event["user_id"],
-                    "is_typing": event["is_typing"],
-                }
-            )
-        )
+        await self.send(text_data=event["text"])
 
     @database_sync_to_async
     def get_chatroom(self):
@@ -130,8 +179,21 @@ class ChatConsumer(AsyncWebsocketConsumer):
             return None
 
     @database_sync_to_async
-    def get_messages(self, chatroom):
-        return list(chatroom.messages.all().select_related("user", "chatroom"))
+    def get_history_page(self, chatroom, before=None):
+        """
+        One serialized page of history with the cursor for the next one
+        """
+        messages, has_more = paginate_messages(
+            chatroom.messages.select_related("user"),
+            HISTORY_PAGE_SIZE,
+            before=before,
+        )
+        summaries = UserSummaries()
+        return (
+            [self.serialize_message(message, summaries) for message in messages],
+            encode_cursor(messages[0]) if messages else None,
+            has_more,
+        )
 
     @database_sync_to_async
     def save_message(self, content):
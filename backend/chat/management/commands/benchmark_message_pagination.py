@@ -0,0 +1,86 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from chat.models import ChatRoom, Message
+from chat.pagination import encode_cursor, paginate_messages
+from projects.models import Project
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare OFFSET pagination with keyset (cursor) pagination for a deep "
+        "page of a long chat room. All data is created inside a transaction "
+        "that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=50000)
+        parser.add_argument("--page", type=int, default=1000)
+        parser.add_argument("--per-page", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options)
+            transaction.set_rollback(True)
+
+    def _run(self, options):
+        per_page = options["per_page"]
+        page = options["page"]
+        total = max(options["messages"], page * per_page)
+
+        user = get_user_model().objects.create_user(
+            username="pagination-benchmark", password="unused"
+        )
+        project = Project.objects.create(
+            title="Pagination benchmark",
+            start_date=timezone.now(),
+            deadline=timezone.now(),
+        )
+        chatroom = ChatRoom.objects.create(project=project, name="benchmark")
+        Message.objects.bulk_create(
+            (
+                Message(chatroom=chatroom, user=user, content=f"message {i}")
+                for i in range(total)
+            ),
+            batch_size=1000,
+        )
+
+        queryset = chatroom.messages.select_related("user")
+        start = (page - 1) * per_page
+
+        def offset_page():
+            return list(
+                queryset.order_by("timestamp", "message_id")[start : start + per_page]
+            )
+
+        # The cursor a client would hold after scrolling to the same page.
+        anchor = offset_page()[-1]
+        after = list(
+            queryset.order_by("timestamp", "message_id")[start + per_page : start + per_page + 1]
+        )
+        before_cursor = encode_cursor(after[0]) if after else None
+
+        def keyset_page():
+            return paginate_messages(queryset, per_page, before=before_cursor)[0]
+
+        assert keyset_page()[-1].pk == anchor.pk
+
+        self.stdout.write(
+            f"{total} messages, page {page} x {per_page} (offset {start})"
+        )
+        for label, func in (("offset", offset_page), ("keyset", keyset_page)):
+            timings = []
+            for _ in range(options["repeat"]):
+                began = time.perf_counter()
+                func()
+                timings.append((time.perf_counter() - began) * 1000)
+            self.stdout.write(
+                f"{label:>7}: median {statistics.median(timings):.2f} ms, "
+                f"max {max(timings):.2f} ms"
+            )
@@ -0,0 +1,70 @@
+import asyncio
+import random
+
+from django.core.management.base import BaseCommand
+
+from chat import typing
+from chat.typing import TypingIndicator
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate users typing in one chat room and report channel layer "
+        "messages/s for typing events: forwarded per keystroke as before, and "
+        "through chat.typing.TypingIndicator."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--listeners", type=int, default=50)
+        parser.add_argument("--seconds", type=float, default=10.0)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        counts = asyncio.run(self._run(options))
+        seconds = options["seconds"]
+        self.stdout.write(
+            f"{options['users']} typing users, {options['listeners']} listeners, "
+            f"{seconds:.0f} s (window {typing.COALESCE_WINDOW} s, refresh "
+            f"{typing.REFRESH_INTERVAL} s, expiry {typing.EXPIRY} s)"
+        )
+        for label, sends in (
+            ("per keystroke", counts["events"]),
+            ("throttled", counts["broadcasts"]),
+        ):
+            self.stdout.write(
+                f"  {label:<13} {sends / seconds:7.1f} group_send/s, "
+                f"{sends * options['listeners'] / seconds:8.0f} frames/s delivered"
+            )
+
+    async def _run(self, options):
+        counts = {"events": 0, "broadcasts": 0}
+        rng = random.Random(options["seed"])
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + options["seconds"]
+
+        async def broadcast(is_typing):
+            counts["broadcasts"] += 1
+
+        def send(indicator, is_typing):
+            # The previous handler called group_send once per received event
+            counts["events"] += 1
+            indicator.update(is_typing)
+
+        async def user():
+            indicator = TypingIndicator(broadcast)
+            await asyncio.sleep(rng.uniform(0, 2))
+            while loop.time() < deadline:
+                for _ in range(rng.randint(5, 40)):
+                    if loop.time() >= deadline:
+                        break
+                    send(indicator, True)
+                    await asyncio.sleep(rng.uniform(0.08, 0.2))
+                # Clients send "stopped" after a pause, unless the tab went away
+                if rng.random() < 0.6:
+                    send(indicator, False)
+                await asyncio.sleep(rng.uniform(0.5, 4))
+            await indicator.close()
+
+        await asyncio.gather(*(user() for _ in range(options["users"])))
+        return counts
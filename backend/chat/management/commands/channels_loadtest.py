@@ -0,0 +1,123 @@
+import asyncio
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.channel_layers import ShardedRedisChannelLayer
+from chat.management.redis_standin import StandInThread
+
+
+def _listener(hosts, groups, expected, ready, results):
+    """Worker process: join every group and count the messages it receives."""
+
+    async def run():
+        layer = ShardedRedisChannelLayer(hosts=hosts)
+        channel = await layer.new_channel()
+        for group in groups:
+            await layer.group_add(group, channel)
+        ready.put(True)
+
+        received = 0
+        started = None
+        try:
+            while received < expected:
+                await asyncio.wait_for(layer.receive(channel), timeout=10)
+                started = started or time.perf_counter()
+                received += 1
+        except asyncio.TimeoutError:
+            pass
+        elapsed = time.perf_counter() - started if started else 0.0
+        await layer.close()
+        return received, elapsed
+
+    results.put(asyncio.run(run()))
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test the sharded channel layer: several listener processes join "
+        "chat_/notifications_ groups and the parent fans messages out to them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=4)
+        parser.add_argument("--groups", type=int, default=8)
+        parser.add_argument("--messages", type=int, default=250)
+        parser.add_argument("--shards", type=int, default=2)
+        parser.add_argument(
+            "--hosts",
+            help="Comma separated redis:// URLs; local stand-in servers are started when omitted.",
+        )
+
+    def handle(self, *args, **options):
+        standins = []
+        if options["hosts"]:
+            hosts = options["hosts"].split(",")
+        else:
+            standins = [StandInThread().start() for _ in range(options["shards"])]
+            hosts = [standin.url for standin in standins]
+
+        groups = [
+            f"{'chat' if i % 2 else 'notifications'}_{i}"
+            for i in range(options["groups"])
+        ]
+        expected = options["groups"] * options["messages"]
+
+        context = multiprocessing.get_context("spawn")
+        ready, results = context.Queue(), context.Queue()
+        workers = [
+            context.Process(
+                target=_listener, args=(hosts, groups, expected, ready, results)
+            )
+            for _ in range(options["processes"])
+        ]
+
+        try:
+            for worker in workers:
+                worker.start()
+            for _ in workers:
+                ready.get(timeout=30)
+
+            elapsed = asyncio.run(self._fan_out(hosts, groups, options["messages"]))
+            outcomes = [results.get(timeout=60) for _ in workers]
+            for worker in workers:
+                worker.join()
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+            for standin in standins:
+                standin.stop()
+
+        delivered = sum(received for received, _ in outcomes)
+        layer = ShardedRedisChannelLayer(hosts=hosts)
+        per_shard = {host: 0 for host in hosts}
+        for group in groups:
+            per_shard[layer.shard_for(group)] += 1
+
+        self.stdout.write(f"hosts: {len(hosts)}  groups per shard: {per_shard}")
+        self.stdout.write(
+            f"group_send: {expected} in {elapsed:.2f}s "
+            f"({expected / elapsed:.0f} msg/s)"
+        )
+        self.stdout.write(
+            f"delivered: {delivered}/{expected * len(workers)} across "
+            f"{len(workers)} processes ({delivered / max(elapsed, 1e-9):.0f} deliveries/s)"
+        )
+        if delivered != expected * len(workers):
+            raise CommandError("Some messages were not delivered.")
+
+    async def _fan_out(self, hosts, groups, messages):
+        layer = ShardedRedisChannelLayer(hosts=hosts)
+        started = time.perf_counter()
+        for index in range(messages):
+            await asyncio.gather(
+                *(
+                    layer.group_send(group, {"type": "chat.message", "index": index})
+                    for group in groups
+                )
+            )
+        elapsed = time.perf_counter() - started
+        await layer.close()
+        return elapsed
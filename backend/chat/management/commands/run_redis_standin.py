@@ -0,0 +1,24 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from chat.management.redis_standin import RedisStandIn
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the in-process Redis stand-in, for trying CHANNEL_LAYER_BACKEND="
+        "redis without a Redis installation. Not for production use."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=6390)
+
+    def handle(self, *args, **options):
+        asyncio.run(self._serve(options["host"], options["port"]))
+
+    async def _serve(self, host, port):
+        server = await RedisStandIn().start(host, port)
+        self.stdout.write(f"Redis stand-in listening on {host}:{server.port}")
+        await server.server.serve_forever()
@@ -0,0 +1,280 @@
+"""
+Minimal in-process server speaking the subset of the Redis protocol (RESP2)
+used by ``backend.channel_layers.ShardedRedisChannelLayer``.
+
+It exists so the sharded channel layer can be exercised by the test suite
+and the ``channels_loadtest`` command without a real Redis installation.
+Run it standalone with ``manage.py run_redis_standin --port 6390``.
+"""
+
+import asyncio
+import fnmatch
+import threading
+import time
+from collections import defaultdict, deque
+
+
+class RedisStandIn:
+    def __init__(self):
+        self.lists = defaultdict(deque)
+        self.zsets = defaultdict(dict)
+        self.expires = {}
+        self.server = None
+        self.port = None
+        self._changed = None
+        self._connections = set()
+
+    async def start(self, host="127.0.0.1", port=0):
+        self._changed = asyncio.Condition()
+        self.server = await asyncio.start_server(self._handle, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self.server.wait_closed()
+
+    # Protocol
+
+    async def _read_command(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:])):
+            header = await reader.readline()
+            length = int(header[1:])
+            data = await reader.readexactly(length + 2)
+            args.append(data[:-2])
+        return args
+
+    def _encode(self, value):
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, _Status):
+            return b"+" + value.text.encode() + b"\r\n"
+        if isinstance(value, _Error):
+            return b"-" + value.text.encode() + b"\r\n"
+        if isinstance(value, bool):
+            value = int(value)
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, _NilArray):
+            return b"*-1\r\n"
+        if isinstance(value, (list, tuple)):
+            return b"*%d\r\n" % len(value) + b"".join(self._encode(v) for v in value)
+        if isinstance(value, str):
+            value = value.encode()
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                args = await self._read_command(reader)
+                if args is None:
+                    break
+                if not args:
+                    continue
+                handler = getattr(self, "cmd_" + args[0].decode().lower(), None)
+                if handler is None:
+                    reply = _Error(f"ERR unknown command '{args[0].decode()}'")
+                else:
+                    try:
+                        reply = await handler(*args[1:])
+                    except (TypeError, ValueError) as exc:
+                        reply = _Error(f"ERR {exc}")
+                writer.write(self._encode(reply))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    # Keyspace helpers
+
+    def _alive(self, key):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.lists.pop(key, None)
+            self.zsets.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.lists or key in self.zsets
+
+    def _drop_if_empty(self, key):
+        if key in self.lists and not self.lists[key]:
+            del self.lists[key]
+            self.expires.pop(key, None)
+        if key in self.zsets and not self.zsets[key]:
+            del self.zsets[key]
+            self.expires.pop(key, None)
+
+    # Commands
+
+    async def cmd_ping(self, *args):
+        return _Status("PONG")
+
+    async def cmd_client(self, *args):
+        return _Status("OK")
+
+    async def cmd_select(self, *args):
+        return _Status("OK")
+
+    async def cmd_rpush(self, key, *values):
+        self._alive(key)
+        self.lists[key].extend(values)
+        length = len(self.lists[key])
+        async with self._changed:
+            self._changed.notify_all()
+        return length
+
+    async def cmd_llen(self, key):
+        return len(self.lists[key]) if self._alive(key) and key in self.lists else 0
+
+    async def cmd_expire(self, key, seconds):
+        if not self._alive(key):
+            return 0
+        self.expires[key] = time.time() + int(seconds)
+        return 1
+
+    async def cmd_blpop(self, *args):
+        keys, timeout = args[:-1], float(args[-1])
+        deadline = None if timeout == 0 else time.monotonic() + timeout
+        async with self._changed:
+            while True:
+                for key in keys:
+                    if self._alive(key) and self.lists.get(key):
+                        value = self.lists[key].popleft()
+                        self._drop_if_empty(key)
+                        return [key, value]
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return _NilArray()
+                try:
+                    await asyncio.wait_for(self._changed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return _NilArray()
+
+    async def cmd_zadd(self, key, *pairs):
+        self._alive(key)
+        added = 0
+        zset = self.zsets[key]
+        for score, member in zip(pairs[::2], pairs[1::2]):
+            added += member not in zset
+            zset[member] = float(score)
+        return added
+
+    async def cmd_zrem(self, key, *members):
+        if not self._alive(key) or key not in self.zsets:
+            return 0
+        removed = sum(self.zsets[key].pop(member, None) is not None for member in members)
+        self._drop_if_empty(key)
+        return removed
+
+    async def cmd_zrange(self, key, start, stop):
+        if not self._alive(key) or key not in self.zsets:
+            return []
+        members = [
+            member
+            for member, _ in sorted(
+                self.zsets[key].items(), key=lambda item: (item[1], item[0])
+            )
+        ]
+        start, stop = int(start), int(stop)
+        stop = len(members) if stop == -1 else stop + 1
+        return members[start:stop]
+
+    async def cmd_zremrangebyscore(self, key, minimum, maximum):
+        if not self._alive(key) or key not in self.zsets:
+            return 0
+        low, high = _score(minimum), _score(maximum)
+        zset = self.zsets[key]
+        doomed = [member for member, score in zset.items() if low <= score <= high]
+        for member in doomed:
+            del zset[member]
+        self._drop_if_empty(key)
+        return len(doomed)
+
+    async def cmd_del(self, *keys):
+        deleted = 0
+        for key in keys:
+            if self._alive(key):
+                deleted += 1
+            self.lists.pop(key, None)
+            self.zsets.pop(key, None)
+            self.expires.pop(key, None)
+        return deleted
+
+    async def cmd_keys(self, pattern):
+        pattern = pattern.decode()
+        return [
+            key
+            for key in list(self.lists) + list(self.zsets)
+            if self._alive(key) and fnmatch.fnmatchcase(key.decode(), pattern)
+        ]
+
+    async def cmd_flushdb(self, *args):
+        self.lists.clear()
+        self.zsets.clear()
+        self.expires.clear()
+        return _Status("OK")
+
+    cmd_flushall = cmd_flushdb
+
+
+class _Status:
+    def __init__(self, text):
+        self.text = text
+
+
+class _Error:
+    def __init__(self, text):
+        self.text = text
+
+
+class _NilArray:
+    pass
+
+
+def _score(value):
+    value = value.decode()
+    if value in ("-inf", "+inf", "inf"):
+        return float(value)
+    if value.startswith("("):
+        raise ValueError("exclusive ranges are not supported")
+    return float(value)
+
+
+class StandInThread:
+    """Runs a RedisStandIn on its own event loop in a daemon thread."""
+
+    def __init__(self, host="127.0.0.1", port=0):
+        self.host = host
+        self._requested_port = port
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self.server = RedisStandIn()
+
+    @property
+    def url(self):
+        return f"redis://{self.host}:{self.server.port}/0"
+
+    def start(self):
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(
+            self.server.start(self.host, self._requested_port), self._loop
+        ).result()
+        return self
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.server.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
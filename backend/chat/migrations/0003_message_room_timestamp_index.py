@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0002_chatroom_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['chatroom', 'timestamp', 'message_id'], name='chat_message_room_ts_idx'),
+        ),
+    ]
@@ -52,6 +52,12 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["timestamp"]
+        indexes = [
+            models.Index(
+                fields=["chatroom", "timestamp", "message_id"],
+                name="chat_message_room_ts_idx",
+            )
+        ]
         constraints = [
             CheckConstraint(
                 condition=Q(content__gt=""),
@@ -0,0 +1,104 @@
+import base64
+import binascii
+import json
+import uuid
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(message) -> str:
+    """
+    Encode the (timestamp, message_id) position of a message, a Message or a
+    .values() row, as an opaque cursor
+    """
+    if isinstance(message, dict):
+        timestamp, message_id = message["timestamp"], message["message_id"]
+    else:
+        timestamp, message_id = message.timestamp, message.message_id
+    raw = json.dumps([timestamp.isoformat(), message_id.hex])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """
+    Decode a cursor produced by encode_cursor back into (timestamp, message_id)
+
+    Raises:
+        InvalidCursor: if the cursor was not produced by encode_cursor
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, message_id = json.loads(base64.urlsafe_b64decode(padded))
+        timestamp = parse_datetime(timestamp)
+        message_id = uuid.UUID(hex=message_id)
+    except (binascii.Error, AttributeError, TypeError, ValueError):
+        raise InvalidCursor(cursor)
+    if timestamp is None:
+        raise InvalidCursor(cursor)
+    return timestamp, message_id
+
+
+def paginate_messages(queryset, limit: int, before: str = None, after: str = None):
+    """
+    Keyset pagination over messages ordered by (timestamp, message_id)
+
+    Instead of OFFSET, the page boundary is expressed as a WHERE clause on the
+    last seen position, so fetching an old page costs the same as fetching the
+    newest one (served by the chatroom/timestamp/message_id index). The
+    redundant timestamp__lte/gte bound gives the planner a range it can seek
+    to; the OR alone is not sargable.
+
+    Args:
+        queryset: Message queryset already scoped to one chat room
+        limit: Maximum number of messages to return
+        before: Cursor; return the messages immediately older than it.
+            When neither cursor is given the newest messages are returned.
+        after: Cursor; return the messages immediately newer than it
+
+    Returns:
+        (messages in chronological order, has_more)
+    """
+    page_queryset, newest_first = _page_queryset(queryset, limit, before, after)
+    return _page_result(list(page_queryset), limit, newest_first)
+
+
+async def apaginate_messages(
+    queryset, limit: int, before: str = None, after: str = None
+):
+    """
+    Async variant of paginate_messages for async views and consumers
+    """
+    page_queryset, newest_first = _page_queryset(queryset, limit, before, after)
+    return _page_result([m async for m in page_queryset], limit, newest_first)
+
+
+def _page_queryset(queryset, limit, before, after):
+    if after is not None:
+        timestamp, message_id = decode_cursor(after)
+        queryset = queryset.filter(
+            Q(timestamp__gt=timestamp) | Q(message_id__gt=message_id),
+            timestamp__gte=timestamp,
+        ).order_by("timestamp", "message_id")
+        return queryset[: limit + 1], False
+
+    if before is not None:
+        timestamp, message_id = decode_cursor(before)
+        queryset = queryset.filter(
+            Q(timestamp__lt=timestamp) | Q(message_id__lt=message_id),
+            timestamp__lte=timestamp,
+        )
+    queryset = queryset.order_by("-timestamp", "-message_id")
+    return queryset[: limit + 1], True
+
+
+def _page_result(messages, limit, newest_first):
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    if newest_first:
+        messages.reverse()
+    return messages, has_more
@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
 
+from api.summaries import UserSummaries, context_summaries
+from backend.representation import datetime_repr
 from projects.models import Project
 from .models import ChatRoom, ChatRoomUser, Message
 
@@ -17,17 +19,8 @@ class ChatRoomResponseSerializer(serializers.ModelSerializer):
         fields = ("chatroom_id", "project_id", "name", "members")
 
     def get_members(self, obj: ChatRoom) -> list[dict]:
-        return [
-            {
-                "user_id": member.pk,
-                "name": member.username,
-                "email": member.email,
-                "profile_picture": member.profile_picture.url
-                if member.profile_picture
-                else None,
-            }
-            for member in obj.members.all()
-        ]
+        summaries = context_summaries(self.context)
+        return [summaries.get(member) for member in obj.members.all()]
 
 
 class ChatRoomCreateSerializer(serializers.Serializer):
@@ -110,7 +103,34 @@ class MessageSerializer(serializers.ModelSerializer):
         )
 
     def get_profile_picture(self, obj):
-        return obj.user.profile_picture.url if obj.user.profile_picture else None
+        return context_summaries(self.context).get(obj.user)["profile_picture"]
+
+
+MESSAGE_VALUES = ("message_id", "chatroom_id", "user_id", "content", "timestamp")
+
+
+def serialize_message_rows(rows):
+    """
+    MessageSerializer(many=True).data for messages given as
+    .values(*MESSAGE_VALUES) rows, without model instances or DRF fields
+    """
+    summaries = UserSummaries().get_many(row["user_id"] for row in rows)
+    data = []
+    for row in rows:
+        user = summaries[row["user_id"]]
+        data.append(
+            {
+                "message_id": str(row["message_id"]),
+                "chatroom_id": str(row["chatroom_id"]),
+                "user_id": user["user_id"],
+                "name": user["name"],
+                "email": user["email"],
+                "profile_picture": user["profile_picture"],
+                "content": row["content"],
+                "timestamp": datetime_repr(row["timestamp"]),
+            }
+        )
+    return data
 
 
 class MessageCreateSerializer(serializers.ModelSerializer):
@@ -1,3 +1,6 @@
+import asyncio
+from unittest.mock import patch
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -10,6 +13,7 @@ from rest_framework_simplejwt.tokens import AccessToken
 
 from projects.models import Project
 from .models import ChatRoom, ChatRoomUser, Message
+from .typing import TypingIndicator
 from backend.asgi import application
 
 User = get_user_model()
@@ -70,6 +74,52 @@ class ChatAPITests(APITestCase):
         self.assertIn("profile_picture", message_data)
         self.assertEqual(message_data["email"], self.user.email)
 
+    def test_cursor_pagination_walks_history_backwards(self):
+        """カーソルで古いメッセージへ重複・欠落なく遡れること"""
+        chatroom = ChatRoom.objects.create(project=self.project, name="Test Room")
+        ChatRoomUser.objects.create(chatroom=chatroom, user=self.user)
+        for i in range(7):
+            Message.objects.create(chatroom=chatroom, user=self.user, content=f"m{i}")
+        # 同一タイムスタンプでもmessage_idで順序が決まること
+        Message.objects.filter(chatroom=chatroom).update(timestamp=timezone.now())
+        expected = [
+            str(pk)
+            for pk in Message.objects.filter(chatroom=chatroom)
+            .order_by("timestamp", "message_id")
+            .values_list("message_id", flat=True)
+        ]
+
+        url = f"/api/projects/{self.project.project_id}/chatrooms/{chatroom.chatroom_id}/messages/"
+        seen = []
+        cursor = ""
+        while True:
+            response = self.client.get(url, {"before": cursor, "per_page": 3})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen = [m["message_id"] for m in response.data["messages"]] + seen
+            if not response.data["has_more"]:
+                break
+            cursor = response.data["before_cursor"]
+
+        self.assertEqual(seen, expected)
+
+        response = self.client.get(
+            url, {"after": response.data["before_cursor"], "per_page": 2}
+        )
+        self.assertEqual(
+            [m["message_id"] for m in response.data["messages"]], expected[1:3]
+        )
+        self.assertTrue(response.data["has_more"])
+
+    def test_invalid_cursor_is_rejected(self):
+        """不正なカーソルは400になること"""
+        chatroom = ChatRoom.objects.create(project=self.project, name="Test Room")
+        ChatRoomUser.objects.create(chatroom=chatroom, user=self.user)
+
+        url = f"/api/projects/{self.project.project_id}/chatrooms/{chatroom.chatroom_id}/messages/"
+        response = self.client.get(url, {"before": "not-a-cursor"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class ChatWebSocketTests(TestCase):
     def setUp(self):
@@ -172,6 +222,39 @@ class ChatWebSocketTests(TestCase):
         await communicator1.disconnect()
         await communicator2.disconnect()
 
+    async def test_broadcast_is_encoded_once(self):
+        """ルーム内の受信者数に関係なくメッセージのJSONエンコードが1回であること"""
+        from backend import json_codec
+
+        communicators = []
+        for user in (self.user, self.user2, self.user):
+            communicator = WebsocketCommunicator(
+                application,
+                f"/ws/chat/{self.project.project_id}/{self.chatroom.chatroom_id}/"
+                f"?token={AccessToken.for_user(user)}",
+            )
+            connected, _ = await communicator.connect()
+            self.assertTrue(connected)
+            await communicator.send_json_to({"type": "join_room"})
+            await communicator.receive_json_from()
+            communicators.append(communicator)
+
+        with patch.object(json_codec, "dumps", wraps=json_codec.dumps) as dumps:
+            await communicators[0].send_json_to(
+                {"type": "message", "content": "Once", "user_id": self.user.id}
+            )
+            responses = [
+                await communicator.receive_json_from() for communicator in communicators
+            ]
+
+        self.assertEqual(dumps.call_count, 1)
+        self.assertEqual(
+            [response["message"]["content"] for response in responses], ["Once"] * 3
+        )
+
+        for communicator in communicators:
+            await communicator.disconnect()
+
     async def test_empty_message_rejected(self):
         """空メッセージの拒否テスト"""
         communicator = WebsocketCommunicator(
@@ -290,6 +373,40 @@ class ChatWebSocketTests(TestCase):
         await communicator1.disconnect()
         await communicator2.disconnect()
 
+    async def test_typing_burst_is_coalesced(self):
+        """連続したタイピング通知が1回にまとめられ、切断時に停止が通知されること"""
+        token1 = AccessToken.for_user(self.user)
+        token2 = AccessToken.for_user(self.user2)
+        communicator1 = WebsocketCommunicator(
+            application,
+            f"/ws/chat/{self.project.project_id}/{self.chatroom.chatroom_id}/?token={str(token1)}",
+        )
+        communicator2 = WebsocketCommunicator(
+            application,
+            f"/ws/chat/{self.project.project_id}/{self.chatroom.chatroom_id}/?token={str(token2)}",
+        )
+        await communicator1.connect()
+        await communicator2.connect()
+        await communicator1.send_json_to({"type": "join_room"})
+        await communicator1.receive_json_from()
+        await communicator2.send_json_to({"type": "join_room"})
+        await communicator2.receive_json_from()
+
+        for is_typing in (True, False, True, True, True, False, True):
+            await communicator1.send_json_to({"type": "typing", "is_typing": is_typing})
+
+        response = await communicator2.receive_json_from()
+        self.assertEqual(
+            response, {"type": "typing", "user_id": self.user.id, "is_typing": True}
+        )
+        self.assertTrue(await communicator2.receive_nothing(timeout=0.5))
+
+        await communicator1.disconnect()
+        response = await communicator2.receive_json_from()
+        self.assertFalse(response["is_typing"])
+
+        await communicator2.disconnect()
+
     async def test_message_creation_in_database(self):
         """WebSocket経由で送信したメッセージがデータベースに保存されるテスト"""
         token = AccessToken.for_user(self.user)
@@ -376,3 +493,96 @@ class ChatWebSocketTests(TestCase):
 
         await communicator.send_json_to({"type": "join_room"})
         await communicator.disconnect()
+
+    async def test_join_sends_bounded_history_in_one_frame(self):
+        """参加時に直近の履歴が1フレームで送られ、古い履歴を追加取得できること"""
+        await Message.objects.abulk_create(
+            Message(chatroom=self.chatroom, user=self.user, content=f"m{i}")
+            for i in range(60)
+        )
+        expected = [
+            str(pk)
+            async for pk in Message.objects.filter(chatroom=self.chatroom)
+            .order_by("timestamp", "message_id")
+            .values_list("message_id", flat=True)
+        ]
+
+        token = AccessToken.for_user(self.user)
+        communicator = WebsocketCommunicator(
+            application,
+            f"/ws/chat/{self.project.project_id}/{self.chatroom.chatroom_id}/?token={str(token)}",
+        )
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        await communicator.send_json_to({"type": "join_room"})
+        response = await communicator.receive_json_from()
+        self.assertEqual(response["type"], "history")
+        self.assertTrue(response["has_more"])
+        self.assertEqual(
+            [m["message_id"] for m in response["messages"]], expected[-50:]
+        )
+        self.assertTrue(await communicator.receive_nothing())
+
+        await communicator.send_json_to(
+            {"type": "load_history", "before": response["before_cursor"]}
+        )
+        response = await communicator.receive_json_from()
+        self.assertEqual(response["type"], "history")
+        self.assertFalse(response["has_more"])
+        self.assertEqual([m["message_id"] for m in response["messages"]], expected[:10])
+
+        await communicator.send_json_to({"type": "load_history", "before": "bogus"})
+        response = await communicator.receive_json_from()
+        self.assertEqual(response["type"], "error")
+
+        await communicator.disconnect()
+
+
+@patch.multiple("chat.typing", COALESCE_WINDOW=0.02, REFRESH_INTERVAL=0.2, EXPIRY=0.1)
+class TypingIndicatorTest(TestCase):
+    def setUp(self):
+        self.sent = []
+
+    async def broadcast(self, is_typing):
+        self.sent.append(is_typing)
+
+    async def test_keystrokes_within_window_become_one_broadcast(self):
+        """ウィンドウ内の連続した更新は1回の送信にまとめられること"""
+        indicator = TypingIndicator(self.broadcast)
+        for _ in range(20):
+            indicator.update(True)
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.sent, [True])
+        await indicator.close()
+        self.assertEqual(self.sent, [True, False])
+
+    async def test_start_and_stop_within_window_send_nothing(self):
+        """ウィンドウ内に開始と停止が続いた場合は何も送信されないこと"""
+        indicator = TypingIndicator(self.broadcast)
+        indicator.update(True)
+        indicator.update(False)
+        await asyncio.sleep(0.05)
+        indicator.update(False)
+        await indicator.close()
+        self.assertEqual(self.sent, [])
+
+    async def test_typing_expires(self):
+        """更新が途絶えると自動的に停止が送信されること"""
+        indicator = TypingIndicator(self.broadcast)
+        indicator.update(True)
+        await asyncio.sleep(0.3)
+        self.assertEqual(self.sent, [True, False])
+        await indicator.close()
+        self.assertEqual(self.sent, [True, False])
+
+    async def test_continued_typing_is_refreshed_at_most_once_per_interval(self):
+        """入力が続く間は更新間隔ごとに1回だけ再送信されること"""
+        indicator = TypingIndicator(self.broadcast)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 0.3
+        while loop.time() < deadline:
+            indicator.update(True)
+            await asyncio.sleep(0.01)
+        await indicator.close()
+        self.assertEqual(self.sent, [True, True, False])
@@ -0,0 +1,83 @@
+"""
+Server-side rate limiting of chat typing indicators.
+
+Clients report typing on every keystroke. A TypingIndicator sits between
+one connection (one user in one room) and the room's group, and only
+broadcasts what listeners need to show:
+
+* updates within COALESCE_WINDOW seconds are merged, and only a change of
+  state is sent, so start/stop flapping and keystroke bursts become at most
+  one broadcast per window;
+* while the user keeps typing, "typing" is repeated at most once every
+  REFRESH_INTERVAL seconds, so clients joining mid-burst still see it;
+* without a new keystroke for EXPIRY seconds, or when the connection
+  closes, "stopped typing" is broadcast on the user's behalf.
+"""
+
+import asyncio
+import time
+
+# Seconds updates are collected after the first one before they are sent
+COALESCE_WINDOW = 0.3
+# Minimum seconds between two "typing" broadcasts while the state is unchanged
+REFRESH_INTERVAL = 3.0
+# Seconds after the last "typing" update before the user counts as stopped
+EXPIRY = 6.0
+
+
+class TypingIndicator:
+    """
+    Typing state of one user in one room
+
+    Args:
+        broadcast: Coroutine function called with is_typing for every state
+            that should be sent to the room
+    """
+
+    def __init__(self, broadcast):
+        self.broadcast = broadcast
+        self.typing = False  # latest state reported by the client
+        self.shown = False  # state last broadcast
+        self.shown_at = 0.0
+        self.flush_task = None
+        self.expiry_handle = None
+
+    def update(self, is_typing):
+        self.typing = is_typing
+        if self.expiry_handle is not None:
+            self.expiry_handle.cancel()
+            self.expiry_handle = None
+        if is_typing:
+            self.expiry_handle = asyncio.get_running_loop().call_later(
+                EXPIRY, self.update, False
+            )
+        # A pending flush reads the latest state; "stopped" needs none unless
+        # listeners were told the user is typing
+        if self.flush_task is None and (is_typing or self.shown):
+            self.flush_task = asyncio.create_task(self.flush_later())
+
+    async def flush_later(self):
+        await asyncio.sleep(COALESCE_WINDOW)
+        self.flush_task = None
+        now = time.monotonic()
+        if self.typing == self.shown and not (
+            self.typing and now - self.shown_at >= REFRESH_INTERVAL
+        ):
+            return
+        self.shown, self.shown_at = self.typing, now
+        await self.broadcast(self.typing)
+
+    async def close(self):
+        """
+        Stop the timers; listeners still showing the user as typing are told
+        the user stopped
+        """
+        if self.expiry_handle is not None:
+            self.expiry_handle.cancel()
+            self.expiry_handle = None
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+        if self.shown:
+            self.shown = False
+            await self.broadcast(False)
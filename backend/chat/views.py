@@ -1,18 +1,24 @@
-from django.shortcuts import get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, get_object_or_404
 from rest_framework import status
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from backend.async_views import AsyncAPIView
+from projects.membership import is_project_member
 from projects.models import Project
 from .models import ChatRoom, Message
+from .pagination import InvalidCursor, apaginate_messages, encode_cursor
 from .serializers import (
     ChatRoomCreateSerializer,
     ChatRoomResponseSerializer,
     MessageCreateSerializer,
     MessageSerializer,
     MessageUpdateSerializer,
+    MESSAGE_VALUES,
+    serialize_message_rows,
 )
 
 
@@ -20,10 +26,8 @@ class ProjectChatRoomListCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     def _get_project(self, project_id: str) -> Project:
-        project = get_object_or_404(
-            Project.objects.prefetch_related("members"), project_id=project_id
-        )
-        if not project.members.filter(pk=self.request.user.pk).exists():
+        project = get_object_or_404(Project, project_id=project_id)
+        if not is_project_member(self.request, project.pk):
             raise PermissionDenied("You are not assigned to this project.")
         return project
 
@@ -44,23 +48,37 @@ class ProjectChatRoomListCreateView(APIView):
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
 
-class ChatRoomMessageListCreateView(APIView):
+class ChatRoomMessageListCreateView(AsyncAPIView):
     permission_classes = [IsAuthenticated]
 
-    def _get_chatroom(self, project_id: str, chatroom_id: str) -> ChatRoom:
-        chatroom = get_object_or_404(
-            ChatRoom.objects.select_related("project").prefetch_related("members"),
-            chatroom_id=chatroom_id,
-            project__project_id=project_id,  # 🔒 enforce project scope
+    def _chatroom_queryset(self, project_id: str):
+        # 🔒 enforce project scope
+        return ChatRoom.objects.select_related("project").filter(
+            project__project_id=project_id
         )
 
-        if not chatroom.members.filter(pk=self.request.user.pk).exists():
+    def _check_member(self, is_member: bool) -> None:
+        if not is_member:
             raise PermissionDenied("You are not a member of this chat room.")
 
+    def _get_chatroom(self, project_id: str, chatroom_id: str) -> ChatRoom:
+        chatroom = get_object_or_404(
+            self._chatroom_queryset(project_id), chatroom_id=chatroom_id
+        )
+        self._check_member(chatroom.members.filter(pk=self.request.user.pk).exists())
         return chatroom
 
-    def get(self, request, project_id: str, chatroom_id: str) -> Response:
-        chatroom = self._get_chatroom(project_id, chatroom_id)
+    async def _aget_chatroom(self, project_id: str, chatroom_id: str) -> ChatRoom:
+        chatroom = await aget_object_or_404(
+            self._chatroom_queryset(project_id), chatroom_id=chatroom_id
+        )
+        self._check_member(
+            await chatroom.members.filter(pk=self.request.user.pk).aexists()
+        )
+        return chatroom
+
+    async def get(self, request, project_id: str, chatroom_id: str) -> Response:
+        chatroom = await self._aget_chatroom(project_id, chatroom_id)
 
         try:
             page = int(request.query_params.get("page", "1"))
@@ -77,22 +95,54 @@ class ChatRoomMessageListCreateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        queryset = chatroom.messages.select_related("user").order_by("timestamp")
+        queryset = chatroom.messages.values(*MESSAGE_VALUES)
+
+        before = request.query_params.get("before")
+        after = request.query_params.get("after")
+        if before is not None or after is not None:
+            # Keyset pagination: ?before=<cursor> scrolls back through
+            # history, ?after=<cursor> fetches newer messages. An empty
+            # ?before= starts from the newest message.
+            try:
+                messages, has_more = await apaginate_messages(
+                    queryset, per_page, before=before or None, after=after
+                )
+            except InvalidCursor:
+                return Response(
+                    {"detail": "Invalid cursor."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            return Response(
+                {
+                    "messages": await sync_to_async(serialize_message_rows)(messages),
+                    "per_page": per_page,
+                    "has_more": has_more,
+                    **self._cursors(messages),
+                }
+            )
+
+        queryset = queryset.order_by("timestamp", "message_id")
 
         start = (page - 1) * per_page
         end = start + per_page
-        messages = list(queryset[start:end])
-
-        serializer = MessageSerializer(messages, many=True)
+        messages = [message async for message in queryset[start:end]]
 
         return Response(
             {
-                "messages": serializer.data,
+                "messages": await sync_to_async(serialize_message_rows)(messages),
                 "page": page,
                 "per_page": per_page,
+                **self._cursors(messages),
             }
         )
 
+    def _cursors(self, messages) -> dict:
+        return {
+            "before_cursor": encode_cursor(messages[0]) if messages else None,
+            "after_cursor": encode_cursor(messages[-1]) if messages else None,
+        }
+
     def post(self, request, project_id: str, chatroom_id: str) -> Response:
         chatroom = self._get_chatroom(project_id, chatroom_id)
 
@@ -113,10 +163,8 @@ class ChatRoomDeleteView(APIView):
     permission_classes = [IsAuthenticated]
 
     def delete(self, request, chatroom_id: str) -> Response:
-        chatroom = get_object_or_404(
-            ChatRoom.objects.select_related("project"), chatroom_id=chatroom_id
-        )
-        if not chatroom.project.members.filter(pk=request.user.pk).exists():
+        chatroom = get_object_or_404(ChatRoom, chatroom_id=chatroom_id)
+        if not is_project_member(request, chatroom.project_id):
             raise PermissionDenied("You are not assigned to this project.")
         chatroom.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
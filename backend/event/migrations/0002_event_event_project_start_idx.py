@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('event', '0001_initial'),
+        ('projects', '0002_project_task_counts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['project', 'start_date', 'end_date'], name='event_project_start_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 import uuid
 from django.db import models
 from django.db.models import Q, CheckConstraint
+from backend.change_tracking import LoadedValuesMixin
 from projects.models import Project
 
 
@@ -11,7 +12,7 @@ class EventColor(models.TextChoices):
     ORANGE = "orange", "Orange"
 
 
-class Event(models.Model):
+class Event(LoadedValuesMixin, models.Model):
     event_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='events')
     
@@ -29,6 +30,13 @@ class Event(models.Model):
         return self.title
 
     class Meta:
+        indexes = [
+            # end_date rides along so the range filter is checked in the index
+            models.Index(
+                fields=['project', 'start_date', 'end_date'],
+                name='event_project_start_idx',
+            ),
+        ]
         constraints = [
             CheckConstraint(
                 condition=Q(color__in=[choice.value for choice in EventColor]),
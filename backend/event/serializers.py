@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from backend.representation import datetime_repr
 from .models import Event, EventColor
 
 
@@ -19,6 +21,35 @@ class EventResponseSerializer(serializers.ModelSerializer):
         read_only_fields = ["event_id", "project_id"]
 
 
+EVENT_VALUES = (
+    "event_id",
+    "project_id",
+    "title",
+    "is_all_day",
+    "start_date",
+    "end_date",
+    "color",
+)
+
+
+def serialize_event_rows(rows):
+    """
+    EventResponseSerializer(many=True).data for .values(*EVENT_VALUES) rows
+    """
+    return [
+        {
+            "event_id": str(row["event_id"]),
+            "project_id": str(row["project_id"]),
+            "title": row["title"],
+            "is_all_day": bool(row["is_all_day"]),
+            "start_date": datetime_repr(row["start_date"]),
+            "end_date": datetime_repr(row["end_date"]),
+            "color": row["color"],
+        }
+        for row in rows
+    ]
+
+
 class EventCreateSerializer(serializers.Serializer):
     title = serializers.CharField(max_length=255)
     is_all_day = serializers.BooleanField(required=False, default=False)
@@ -1,16 +1,23 @@
-from django.shortcuts import get_object_or_404
+from django.shortcuts import aget_object_or_404, get_object_or_404
 from rest_framework import status
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from backend.async_views import AsyncAPIView
+from projects.membership import ais_project_member, is_project_member
 from projects.models import Project
 from .models import Event
-from .serializers import EventCreateSerializer, EventResponseSerializer
+from .serializers import (
+    EVENT_VALUES,
+    EventCreateSerializer,
+    EventResponseSerializer,
+    serialize_event_rows,
+)
 
 
-class ProjectEventListCreateView(APIView):
+class ProjectEventListCreateView(AsyncAPIView):
     """
     GET /api/projects/{project_id}/events - プロジェクトのイベント一覧を取得
     POST /api/projects/{project_id}/events - 新しいeventを作成する
@@ -18,16 +25,22 @@ class ProjectEventListCreateView(APIView):
 
     permission_classes = [IsAuthenticated]
 
-    def _get_project(self, project_id: str) -> Project:
-        project = get_object_or_404(
-            Project.objects.prefetch_related("members"), project_id=project_id
-        )
-        if not project.members.filter(pk=self.request.user.pk).exists():
+    def _check_member(self, is_member: bool) -> None:
+        if not is_member:
             raise PermissionDenied("You are not assigned to this project.")
+
+    def _get_project(self, project_id: str) -> Project:
+        project = get_object_or_404(Project, project_id=project_id)
+        self._check_member(is_project_member(self.request, project.pk))
         return project
 
-    def get(self, request, project_id: str) -> Response:
-        project = self._get_project(project_id)
+    async def _aget_project(self, project_id: str) -> Project:
+        project = await aget_object_or_404(Project, project_id=project_id)
+        self._check_member(await ais_project_member(self.request, project.pk))
+        return project
+
+    async def get(self, request, project_id: str) -> Response:
+        project = await self._aget_project(project_id)
         try:
             page = int(request.query_params.get("p", "1"))
             per_page = int(request.query_params.get("per_page", "20"))
@@ -75,10 +88,15 @@ class ProjectEventListCreateView(APIView):
 
         start = (page - 1) * per_page
         end = start + per_page
-        events = list(events_qs[start:end])
-
-        serializer = EventResponseSerializer(events, many=True)
-        return Response({"events": serializer.data, "page": page, "per_page": per_page})
+        events = [event async for event in events_qs.values(*EVENT_VALUES)[start:end]]
+
+        return Response(
+            {
+                "events": serialize_event_rows(events),
+                "page": page,
+                "per_page": per_page,
+            }
+        )
 
     def post(self, request, project_id: str) -> Response:
         project = self._get_project(project_id)
@@ -103,13 +121,11 @@ class EventDetailView(APIView):
 
     def _get_event(self, project_id: str, event_id: str) -> Event:
         event = get_object_or_404(
-            Event.objects.select_related("project").prefetch_related(
-                "project__members"
-            ),
+            Event.objects.select_related("project"),
             event_id=event_id,
             project__project_id=project_id,
         )
-        if not event.project.members.filter(pk=self.request.user.pk).exists():
+        if not is_project_member(self.request, event.project_id):
             raise PermissionDenied("You are not assigned to this project.")
         return event
 
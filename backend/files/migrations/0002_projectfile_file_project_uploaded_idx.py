@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('files', '0001_initial'),
+        ('projects', '0002_project_task_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectfile',
+            index=models.Index(fields=['project', '-uploaded_at'], name='file_project_uploaded_idx'),
+        ),
+    ]
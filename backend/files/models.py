@@ -14,5 +14,12 @@ class ProjectFile(models.Model):
     name = models.CharField(max_length=255)
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['project', '-uploaded_at'], name='file_project_uploaded_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.name
\ No newline at end of file
@@ -1,14 +1,24 @@
 # files/serializers.py
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+
+from api.serializers import UserSummarySerializer
 from .models import ProjectFile
 
 User = get_user_model()
 
-class PublicUserSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = User
-        fields = ["id", "username", "profile_picture"]
+class PublicUserSerializer(UserSummarySerializer):
+    """id, username and absolute profile_picture URL of the uploader"""
+
+    absolute_urls = True
+
+    def to_representation(self, instance):
+        summary = super().to_representation(instance)
+        return {
+            "id": summary["user_id"],
+            "username": summary["name"],
+            "profile_picture": summary["profile_picture"],
+        }
 
 class ProjectFileSerializer(serializers.ModelSerializer):
     id = serializers.UUIDField(source='file_id', read_only=True)
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-18 02:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memos', '0001_initial'),
+        ('projects', '0002_project_task_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectmemo',
+            index=models.Index(fields=['project', '-is_pinned', '-created_at'], name='memo_project_pinned_idx'),
+        ),
+    ]
@@ -24,6 +24,12 @@ class ProjectMemo(models.Model):
     class Meta:
         
         ordering = ['-is_pinned', '-created_at']
+        indexes = [
+            models.Index(
+                fields=['project', '-is_pinned', '-created_at'],
+                name='memo_project_pinned_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Memo({self.memo_id}) - {self.content[:20]}"
\ No newline at end of file
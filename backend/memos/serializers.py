@@ -1,18 +1,13 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+
+from api.serializers import UserSummarySerializer
 from .models import ProjectMemo
 
 User = get_user_model()
 
-class MemoUserSerializer(serializers.ModelSerializer):
-
-    name = serializers.CharField(source='username', read_only=True)
-    user_id = serializers.PrimaryKeyRelatedField(source='pk', read_only=True)
-    
-    class Meta:
-        model = User
-        
-        fields = ['user_id', 'name', 'email', 'profile_picture']
+class MemoUserSerializer(UserSummarySerializer):
+    absolute_urls = True
 
 
 class ProjectMemoSerializer(serializers.ModelSerializer):
@@ -1,6 +1,7 @@
 from rest_framework import generics, permissions
 from rest_framework.exceptions import PermissionDenied
 from django.shortcuts import get_object_or_404
+from projects.membership import is_project_member
 from projects.models import Project
 from .models import ProjectMemo
 from .serializers import ProjectMemoSerializer
@@ -14,7 +15,7 @@ class ProjectMemoListCreateView(generics.ListCreateAPIView):
         project_id = self.kwargs.get('project_id')
         
         project = get_object_or_404(Project, project_id=project_id)
-        if not project.members.filter(pk=self.request.user.pk).exists():
+        if not is_project_member(self.request, project.pk):
             raise PermissionDenied("You are not a member of this project.")
         
         return ProjectMemo.objects.filter(project_id=project_id)
@@ -24,7 +25,7 @@ class ProjectMemoListCreateView(generics.ListCreateAPIView):
         project = get_object_or_404(Project, project_id=project_id)
         
 
-        if not project.members.filter(pk=self.request.user.pk).exists():
+        if not is_project_member(self.request, project.pk):
             raise PermissionDenied("You are not a member of this project.")
             
         
@@ -45,7 +46,7 @@ class ProjectMemoDetailView(generics.RetrieveUpdateDestroyAPIView):
         obj = super().get_object()
         
 
-        if not obj.project.members.filter(pk=self.request.user.pk).exists():
+        if not is_project_member(self.request, obj.project_id):
             raise PermissionDenied("You are not a member of this project.")
         
 
@@ -1,8 +1,9 @@
-import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
 
+from backend import json_codec
+from . import counters
 from .models import Notification
 from .serializers import NotificationSerializer
 
@@ -37,7 +38,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         if self.scope["user"].is_anonymous:
             return
 
-        text_data_json = json.loads(text_data)
+        text_data_json = json_codec.loads(text_data)
         message_type = text_data_json.get("type", "")
 
         if message_type == "mark_read":
@@ -64,7 +65,7 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         serializer = NotificationSerializer(notifications, many=True)
 
         await self.send(
-            text_data=json.dumps(
+            text_data=json_codec.dumps(
                 {
                     "type": "recent_notifications",
                     "notifications": serializer.data,
@@ -74,22 +75,11 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         )
 
     async def notification_created(self, event):
-        notification_data = event["notification"]
-        unread_count = event["unread_count"]
-
-        await self.send(
-            text_data=json.dumps(
-                {
-                    "type": "notification",
-                    "notification": notification_data,
-                    "unread_count": unread_count,
-                }
-            )
-        )
+        await self.send(text_data=event["text"])
 
     async def send_unread_count(self, unread_count):
         await self.send(
-            text_data=json.dumps(
+            text_data=json_codec.dumps(
                 {
                     "type": "unread_count",
                     "unread_count": unread_count,
@@ -107,21 +97,12 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
     @database_sync_to_async
     def get_unread_count(self):
-        return Notification.objects.filter(recipient=self.user, is_read=False).count()
+        return counters.get_unread_count(self.user.pk)
 
     @database_sync_to_async
     def mark_notification_read(self, notification_id):
-        try:
-            notification = Notification.objects.get(
-                id=notification_id, recipient=self.user
-            )
-            notification.is_read = True
-            notification.save()
-        except Notification.DoesNotExist:
-            pass
+        counters.mark_read(self.user, notification_id)
 
     @database_sync_to_async
     def mark_all_read(self):
-        Notification.objects.filter(recipient=self.user, is_read=False).update(
-            is_read=True
-        )
+        counters.mark_all_read(self.user)
@@ -1,15 +1,26 @@
-import threading
+from contextvars import ContextVar
 
-_request_context = threading.local()
+# A ContextVar follows the request across sync_to_async/async_to_sync hops and
+# is isolated between concurrently running requests, unlike threading.local.
+_current_user = ContextVar("notifications_current_user", default=None)
 
 
 def set_current_user(user):
-    _request_context.user = user
+    """
+    Set the acting user for the current context
+
+    Returns:
+        Token to pass to clear_current_user() to restore the previous value
+    """
+    return _current_user.set(user)
 
 
 def get_current_user():
-    return getattr(_request_context, "user", None)
+    return _current_user.get()
 
 
-def clear_current_user():
-    _request_context.user = None
+def clear_current_user(token=None):
+    if token is not None:
+        _current_user.reset(token)
+    else:
+        _current_user.set(None)
@@ -0,0 +1,142 @@
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Notification, UnreadNotificationCounter
+
+
+def get_unread_count(user_id):
+    """
+    Return the unread notification count for one user from the counter row
+    """
+    return get_unread_counts([user_id])[user_id]
+
+
+def get_unread_counts(user_ids):
+    """
+    Return a {user_id: unread_count} mapping read from the counter rows
+
+    Users without a counter row yet are initialised from the notification
+    table once, so the steady state is a single primary-key lookup.
+    """
+    user_ids = list(user_ids)
+    counts = dict(
+        UnreadNotificationCounter.objects.filter(user_id__in=user_ids).values_list(
+            "user_id", "unread_count"
+        )
+    )
+
+    missing = [user_id for user_id in user_ids if user_id not in counts]
+    if missing:
+        counts.update(reconcile_unread_counts(missing))
+
+    return counts
+
+
+def increment_unread_counts(user_ids, amount=1):
+    """
+    Atomically add ``amount`` to the counters of the given users
+
+    Must be called after the new notifications are written, so that users
+    whose counter row is created here are initialised with them included.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+
+    updated = UnreadNotificationCounter.objects.filter(user_id__in=user_ids).update(
+        unread_count=F("unread_count") + amount
+    )
+    if updated < len(user_ids):
+        existing = set(
+            UnreadNotificationCounter.objects.filter(
+                user_id__in=user_ids
+            ).values_list("user_id", flat=True)
+        )
+        reconcile_unread_counts(
+            [user_id for user_id in user_ids if user_id not in existing]
+        )
+
+
+def decrement_unread_count(user_id, amount=1):
+    """
+    Atomically subtract ``amount`` from a user's counter, never going below zero
+    """
+    UnreadNotificationCounter.objects.filter(user_id=user_id).update(
+        unread_count=Greatest(F("unread_count") - amount, 0)
+    )
+
+
+def mark_read(user, notification_id):
+    """
+    Mark one of ``user``'s notifications as read and update the counter
+
+    The conditional update lets only one of several concurrent calls (REST
+    and WebSocket, two tabs) flip the row, so the counter is decremented once.
+
+    Returns:
+        1 if the notification was unread, else 0
+    """
+    with transaction.atomic():
+        updated_count = Notification.objects.filter(
+            pk=notification_id, recipient=user, is_read=False
+        ).update(is_read=True)
+        if updated_count:
+            decrement_unread_count(user.pk, updated_count)
+    return updated_count
+
+
+def mark_all_read(user):
+    """
+    Mark every unread notification of ``user`` as read and update the counter
+
+    Returns:
+        Number of notifications that were marked as read
+    """
+    with transaction.atomic():
+        updated_count = Notification.objects.filter(
+            recipient=user, is_read=False
+        ).update(is_read=True)
+        if updated_count:
+            decrement_unread_count(user.pk, updated_count)
+    return updated_count
+
+
+def reconcile_unread_counts(user_ids=None):
+    """
+    Recompute counters from the notification table
+
+    Args:
+        user_ids: Optional list of user IDs; every user with notifications
+            or an existing counter row is reconciled when omitted
+
+    Returns:
+        {user_id: unread_count} mapping of the values written
+    """
+    unread = Notification.objects.filter(is_read=False)
+    if user_ids is not None:
+        unread = unread.filter(recipient_id__in=list(user_ids))
+
+    actual = dict(
+        unread.values("recipient_id")
+        .annotate(count=Count("id"))
+        .values_list("recipient_id", "count")
+    )
+
+    if user_ids is None:
+        user_ids = set(actual) | set(
+            UnreadNotificationCounter.objects.values_list("user_id", flat=True)
+        )
+
+    counts = {user_id: actual.get(user_id, 0) for user_id in user_ids}
+    if counts:
+        UnreadNotificationCounter.objects.bulk_create(
+            [
+                UnreadNotificationCounter(user_id=user_id, unread_count=count)
+                for user_id, count in counts.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["user"],
+            update_fields=["unread_count"],
+        )
+    return counts
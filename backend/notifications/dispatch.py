@@ -0,0 +1,130 @@
+import asyncio
+import atexit
+import contextvars
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from asgiref.sync import SyncToAsync
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Event loop of the ASGI server that enqueued the running job
+_server_loop = contextvars.ContextVar("notification_server_loop", default=None)
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "NOTIFICATION_DISPATCH_WORKERS", 4),
+                    thread_name_prefix="notification-dispatch",
+                )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    close_old_connections()
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Notification dispatch job %s failed", func.__name__)
+    finally:
+        close_old_connections()
+
+
+def _submit(context, func, args, kwargs):
+    # Run the job in the context captured at enqueue time, so context
+    # variables such as the current user are visible on the worker thread.
+    future = _get_executor().submit(context.run, _run, func, args, kwargs)
+    with _pending_lock:
+        _pending.add(future)
+    future.add_done_callback(_discard)
+
+
+def _find_server_loop():
+    """
+    The ASGI server's event loop when called on it or from the thread
+    sync_to_async runs sync views and signals in, else None
+    """
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return getattr(SyncToAsync.threadlocal, "main_event_loop", None)
+
+
+def server_loop():
+    """
+    Event loop channel layer sends of the running job belong on
+
+    In-process channel layers such as InMemoryChannelLayer only wake
+    receivers waiting on the loop that owns their queues, so a worker must
+    not send on a loop of its own. None outside background jobs, or when the
+    job was enqueued without a server loop (management commands, WSGI).
+    """
+    loop = _server_loop.get()
+    if loop is None or loop.is_closed():
+        return None
+    return loop
+
+
+def _discard(future):
+    with _pending_lock:
+        _pending.discard(future)
+
+
+def enqueue(func, *args, **kwargs):
+    """
+    Schedule a notification job to run after the current transaction commits
+
+    With NOTIFICATION_DISPATCH_MODE = "background" (the default) the job runs
+    on a worker thread once the surrounding transaction has committed, so the
+    request never waits for the fan-out. "eager" runs the job inline, which is
+    what the test suite uses.
+
+    Args:
+        func: Callable doing the actual notification work
+        *args, **kwargs: Arguments passed to func
+    """
+    if getattr(settings, "NOTIFICATION_DISPATCH_MODE", "background") == "eager":
+        func(*args, **kwargs)
+        return
+
+    context = contextvars.copy_context()
+    context.run(_server_loop.set, _find_server_loop())
+    transaction.on_commit(lambda: _submit(context, func, args, kwargs))
+
+
+def drain(timeout=None):
+    """
+    Block until every queued job has finished
+
+    Returns:
+        True if the queue is empty, False if the timeout expired first
+    """
+    with _pending_lock:
+        pending = list(_pending)
+    if not pending:
+        return True
+    _, not_done = wait(pending, timeout=timeout)
+    return not not_done
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+atexit.register(shutdown)
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from notifications.counters import reconcile_unread_counts
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-user unread notification counters from the notification table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only reconcile the given user ID (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        counts = reconcile_unread_counts(options["user_ids"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled unread counters for {len(counts)} user(s).")
+        )
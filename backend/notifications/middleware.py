@@ -1,29 +1,47 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
 from .context import set_current_user, clear_current_user
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from django.contrib.auth.models import AnonymousUser
+from backend.authentication import authenticate_request
 
 
 class NotificationMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
-        self.jwt_auth = JWTAuthentication()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
 
     def __call__(self, request):
-        user = request.user
+        if self.async_mode:
+            return self.__acall__(request)
 
-        if user.is_anonymous:
-            auth_header = request.META.get("HTTP_AUTHORIZATION")
-            if auth_header:
-                try:
-                    auth_result = self.jwt_auth.authenticate(request)
-                    if auth_result is not None:
-                        user = auth_result[0]
-                except Exception:
-                    pass
-
-        set_current_user(user)
+        token = set_current_user(self.resolve_user(request))
         try:
             response = self.get_response(request)
         finally:
-            clear_current_user()
+            clear_current_user(token)
         return response
+
+    async def __acall__(self, request):
+        user = await sync_to_async(self.resolve_user)(request)
+        token = set_current_user(user)
+        try:
+            response = await self.get_response(request)
+        finally:
+            clear_current_user(token)
+        return response
+
+    def resolve_user(self, request):
+        user = request.user
+
+        if user.is_anonymous:
+            # The result is kept on the request and reused by DRF's
+            # SharedJWTAuthentication, so the token is only validated once.
+            auth_result = authenticate_request(request)
+            if isinstance(auth_result, tuple):
+                user = auth_result[0]
+
+        return user
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+        ('notifications', '0003_notification_is_read'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadNotificationCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_notification_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -23,9 +23,44 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._old_is_read = self.is_read
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Partial rather than (recipient, is_read): is_read=False compiles
+            # to NOT is_read, which a composite index cannot seek on
+            models.Index(
+                fields=["recipient"],
+                condition=models.Q(is_read=False),
+                name="notif_unread_recipient_idx",
+            ),
+            models.Index(
+                fields=["recipient", "-created_at"], name="notif_recipient_created_idx"
+            ),
+        ]
 
     def __str__(self):
         recipient_str = str(self.recipient)
         return f"{self.title} - {recipient_str}"
+
+
+class UnreadNotificationCounter(models.Model):
+    """Denormalized number of unread notifications per user.
+
+    Maintained by notifications.counters; rebuild with
+    ``python manage.py reconcile_unread_counts`` if it ever drifts.
+    """
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="unread_notification_counter",
+    )
+    unread_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user} - {self.unread_count}"
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from backend.representation import datetime_repr
 from .models import Notification
 
 
@@ -15,3 +17,32 @@ class NotificationSerializer(serializers.ModelSerializer):
             "is_read",
         ]
         read_only_fields = ["id", "created_at"]
+
+
+NOTIFICATION_VALUES = (
+    "id",
+    "title",
+    "message",
+    "notification_type",
+    "related_object_id",
+    "created_at",
+    "is_read",
+)
+
+
+def serialize_notification_rows(rows):
+    """
+    NotificationSerializer(many=True).data for .values(*NOTIFICATION_VALUES) rows
+    """
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "message": row["message"],
+            "notification_type": row["notification_type"],
+            "related_object_id": row["related_object_id"],
+            "created_at": datetime_repr(row["created_at"]),
+            "is_read": bool(row["is_read"]),
+        }
+        for row in rows
+    ]
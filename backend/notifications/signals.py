@@ -1,47 +1,102 @@
-from django.db.models.signals import post_save, m2m_changed
+from collections import Counter, defaultdict
+
+from django.db.models.signals import post_save, post_delete, m2m_changed
 from django.dispatch import receiver
 
 from .context import get_current_user
+from .dispatch import enqueue
+from .counters import increment_unread_counts, decrement_unread_count
+from .models import Notification
 from .utils import (
-    create_notification,
-    create_task_notification,
-    create_project_notification,
-    create_chat_notification,
-    create_event_notification,
+    notify_each,
+    notify_users,
+    task_batch_notification_payload,
+    task_notification_payload,
+    project_notification_payload,
+    chat_notification_payload,
+    event_notification_payload,
 )
 
 
+@receiver(post_save, sender=Notification)
+def handle_notification_save(sender, instance, created, **kwargs):
+    old_is_read = None if created else instance._old_is_read
+    instance._old_is_read = instance.is_read
+
+    if created:
+        if not instance.is_read:
+            increment_unread_counts([instance.recipient_id])
+    elif old_is_read and not instance.is_read:
+        increment_unread_counts([instance.recipient_id])
+    elif not old_is_read and instance.is_read:
+        decrement_unread_count(instance.recipient_id)
+
+
+@receiver(post_delete, sender=Notification)
+def handle_notification_delete(sender, instance, **kwargs):
+    if not instance.is_read:
+        decrement_unread_count(instance.recipient_id)
+
+
 @receiver(post_save, sender="tasks.Task")
 def handle_task_save(sender, instance, created, **kwargs):
-    from django.contrib.auth import get_user_model
-
     current_user = get_current_user()
-
-    User = get_user_model()
     if current_user and current_user.is_anonymous:
         return
 
-    project = instance.project
-
     if created:
-        for member in project.members.all():
-            if member != current_user:
-                create_task_notification(member, instance, "created")
+        enqueue(notify_task_saved, instance, "created", current_user)
     else:
         old_status = getattr(instance, "_old_status", None)
         if old_status and old_status != instance.status:
-            for member in project.members.all():
-                if member != current_user:
-                    if instance.status == "done":
-                        create_task_notification(member, instance, "completed")
-                    else:
-                        create_notification(
-                            recipient=member,
-                            title="タスク状態変更",
-                            message=f"タスク『{instance.name}』の状態が変更されました",
-                            notification_type="task",
-                            related_object_id=str(instance.task_id),
-                        )
+            action = "completed" if instance.status == "done" else "status_changed"
+            enqueue(notify_task_saved, instance, action, current_user)
+
+
+def notify_task_saved(task, action, actor):
+    notify_users(
+        task.project.members.all(),
+        exclude=actor,
+        **task_notification_payload(task, action),
+    )
+
+
+def notify_task_batch(project, changes, actor):
+    """
+    Notify about many task changes at once with one notification per recipient
+
+    A recipient affected by a single change gets the usual per-task
+    notification, anyone else a summary with the number of tasks per action.
+
+    Args:
+        project: Project the tasks belong to
+        changes: List of (task, action, user_ids); user_ids None means all
+            project members
+        actor: User who made the changes; not notified
+    """
+    member_ids = None
+    per_recipient = defaultdict(list)
+    for task, action, user_ids in changes:
+        if user_ids is None:
+            if member_ids is None:
+                member_ids = list(project.members.values_list("pk", flat=True))
+            user_ids = member_ids
+        for user_id in user_ids:
+            per_recipient[user_id].append((task, action))
+
+    per_recipient.pop(getattr(actor, "pk", None), None)
+    notify_each(
+        {
+            user_id: (
+                task_notification_payload(*items[0])
+                if len(items) == 1
+                else task_batch_notification_payload(
+                    project, Counter(action for _, action in items)
+                )
+            )
+            for user_id, items in per_recipient.items()
+        }
+    )
 
 
 @receiver(post_save, sender="tasks.TaskComment")
@@ -53,17 +108,15 @@ def handle_task_comment_save(sender, instance, created, **kwargs):
     if not current_user or current_user.is_anonymous:
         return
 
-    task = instance.task
+    enqueue(notify_task_commented, instance.task, current_user)
 
-    for assigned_user in task.assigned_users.all():
-        if assigned_user != current_user:
-            create_notification(
-                recipient=assigned_user,
-                title="新しいコメント",
-                message=f"タスク『{task.name}』に新しいコメントが追加されました",
-                notification_type="task",
-                related_object_id=str(task.task_id),
-            )
+
+def notify_task_commented(task, actor):
+    notify_users(
+        task.assigned_users.all(),
+        exclude=actor,
+        **task_notification_payload(task, "commented"),
+    )
 
 
 @receiver(post_save, sender="projects.Project")
@@ -72,14 +125,23 @@ def handle_project_save(sender, instance, created, **kwargs):
     if not current_user or current_user.is_anonymous:
         return
 
-    if created:
-        for member in instance.members.all():
-            if member != current_user:
-                create_project_notification(member, instance, "created")
-    else:
-        for member in instance.members.all():
-            if member != current_user:
-                create_project_notification(member, instance, "updated")
+    enqueue(
+        notify_project_members,
+        instance,
+        "created" if created else "updated",
+        current_user,
+    )
+
+
+def notify_project_members(project, action, actor, member_ids=None):
+    members = project.members.all()
+    if member_ids is not None:
+        members = members.filter(pk__in=member_ids)
+    notify_users(
+        members,
+        exclude=actor,
+        **project_notification_payload(project, action),
+    )
 
 
 @receiver(post_save, sender="chat.Message")
@@ -91,11 +153,15 @@ def handle_message_save(sender, instance, created, **kwargs):
     if not current_user or current_user.is_anonymous:
         return
 
-    chatroom = instance.chatroom
+    enqueue(notify_message_created, instance, current_user)
+
 
-    for member in chatroom.members.all():
-        if member != current_user:
-            create_chat_notification(member, instance, current_user)
+def notify_message_created(message, actor):
+    notify_users(
+        message.chatroom.members.all(),
+        exclude=actor,
+        **chat_notification_payload(message, actor),
+    )
 
 
 @receiver(post_save, sender="event.Event")
@@ -104,13 +170,17 @@ def handle_event_save(sender, instance, created, **kwargs):
     if not current_user or current_user.is_anonymous:
         return
 
-    project = instance.project
+    enqueue(
+        notify_event_saved, instance, "created" if created else "updated", current_user
+    )
 
-    for member in project.members.all():
-        if member != current_user:
-            create_event_notification(
-                member, instance, "created" if created else "updated"
-            )
+
+def notify_event_saved(event, action, actor):
+    notify_users(
+        event.project.members.all(),
+        exclude=actor,
+        **event_notification_payload(event, action),
+    )
 
 
 def handle_task_assigned_users_changed(
@@ -121,20 +191,18 @@ def handle_task_assigned_users_changed(
         return
 
     if action == "post_add" and not reverse:
-        from django.contrib.auth import get_user_model
-
-        task = instance
-        User = get_user_model()
-        newly_assigned_users = User.objects.filter(pk__in=pk_set)
-        for user in newly_assigned_users:
-            if user != current_user:
-                create_notification(
-                    recipient=user,
-                    title="タスク割り当て",
-                    message=f"タスク『{task.name}』があなたに割り当てられました",
-                    notification_type="task",
-                    related_object_id=str(task.task_id),
-                )
+        enqueue(notify_task_assigned, instance, set(pk_set), current_user)
+
+
+def notify_task_assigned(task, user_ids, actor):
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    notify_users(
+        User.objects.filter(pk__in=user_ids),
+        exclude=actor,
+        **task_notification_payload(task, "assigned"),
+    )
 
 
 def handle_project_members_changed(instance, action, reverse, model, pk_set, **kwargs):
@@ -143,11 +211,10 @@ def handle_project_members_changed(instance, action, reverse, model, pk_set, **k
         return
 
     if action == "post_add" and not reverse:
-        project = instance
-        from django.contrib.auth import get_user_model
-
-        User = get_user_model()
-        new_members = User.objects.filter(pk__in=pk_set)
-        for member in new_members:
-            if member != current_user:
-                create_project_notification(member, project, "member_added")
+        enqueue(
+            notify_project_members,
+            instance,
+            "member_added",
+            current_user,
+            member_ids=set(pk_set),
+        )
@@ -0,0 +1,138 @@
+import asyncio
+import contextvars
+import threading
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save
+from django.test import AsyncClient, SimpleTestCase, TestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from notifications import dispatch
+from notifications.context import (
+    clear_current_user,
+    get_current_user,
+    set_current_user,
+)
+from projects.models import Project
+
+User = get_user_model()
+
+
+class CurrentUserContextTest(SimpleTestCase):
+    def test_value_follows_thread_hops(self):
+        """sync_to_async / async_to_sync をまたいでも実行ユーザーが引き継がれること"""
+        user = object()
+
+        async def outer():
+            token = set_current_user(user)
+            try:
+                return await sync_to_async(inner)()
+            finally:
+                clear_current_user(token)
+
+        def inner():
+            return get_current_user(), async_to_sync(innermost)()
+
+        async def innermost():
+            return get_current_user()
+
+        self.assertEqual(async_to_sync(outer)(), (user, user))
+        self.assertIsNone(get_current_user())
+
+    def test_overlapping_tasks_are_isolated(self):
+        """同時に実行される処理の間で実行ユーザーが混ざらないこと"""
+
+        async def handle(user):
+            set_current_user(user)
+            await asyncio.sleep(0)
+            seen = await sync_to_async(get_current_user, thread_sensitive=False)()
+            await asyncio.sleep(0)
+            return seen, get_current_user()
+
+        async def run():
+            return await asyncio.gather(*(handle(i) for i in range(300)))
+
+        for i, (in_thread, after) in enumerate(async_to_sync(run)()):
+            self.assertEqual(in_thread, i)
+            self.assertEqual(after, i)
+
+    def test_reset_restores_previous_value(self):
+        """トークンで直前の値に戻せること"""
+        outer = set_current_user("outer")
+        inner = set_current_user("inner")
+        clear_current_user(inner)
+        self.assertEqual(get_current_user(), "outer")
+        clear_current_user(outer)
+        self.assertIsNone(get_current_user())
+
+    def test_background_jobs_see_enqueuing_user(self):
+        """バックグラウンドジョブでも登録時の実行ユーザーが見えること"""
+        seen = {}
+        done = threading.Event()
+
+        def job():
+            seen["user"] = get_current_user()
+            seen["thread"] = threading.current_thread().name
+            done.set()
+
+        token = set_current_user("actor")
+        try:
+            dispatch._submit(contextvars.copy_context(), job, (), {})
+        finally:
+            clear_current_user(token)
+
+        self.assertTrue(done.wait(5))
+        self.assertEqual(seen["user"], "actor")
+        self.assertTrue(seen["thread"].startswith("notification-dispatch"))
+
+
+class ConcurrentRequestAttributionTest(TestCase):
+    """多数の同時リクエストで実行ユーザーが取り違えられないことのストレステスト"""
+
+    request_count = 200
+
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                username=f"stress{i}", email=f"stress{i}@example.com", password="pw"
+            )
+            for i in range(10)
+        ]
+        self.tokens = {user.pk: str(AccessToken.for_user(user)) for user in self.users}
+        self.seen = []
+        post_save.connect(self.record_actor, sender=Project)
+
+    def tearDown(self):
+        post_save.disconnect(self.record_actor, sender=Project)
+
+    def record_actor(self, sender, instance, created, **kwargs):
+        if created:
+            actor = get_current_user()
+            self.seen.append((instance.title, getattr(actor, "pk", None)))
+
+    async def test_overlapping_requests_keep_their_own_user(self):
+        client = AsyncClient()
+
+        async def create_project(i):
+            user = self.users[i % len(self.users)]
+            response = await client.post(
+                "/api/projects/",
+                {
+                    "title": f"{user.pk}:{i}",
+                    "start_date": "2024-01-01T00:00:00Z",
+                    "deadline": "2024-01-02T00:00:00Z",
+                },
+                content_type="application/json",
+                headers={"authorization": f"Bearer {self.tokens[user.pk]}"},
+            )
+            return response.status_code
+
+        statuses = await asyncio.gather(
+            *(create_project(i) for i in range(self.request_count))
+        )
+
+        self.assertEqual(set(statuses), {201})
+        self.assertEqual(len(self.seen), self.request_count)
+        for title, actor_pk in self.seen:
+            self.assertEqual(title.split(":")[0], str(actor_pk))
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from chat.models import ChatRoom
+from notifications import dispatch
+from notifications.models import Notification
+from notifications.utils import send_group_messages
+from projects.models import Project
+
+User = get_user_model()
+
+
+class InlineExecutor:
+    """ワーカースレッドの代わりにその場でジョブを実行するExecutor"""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+@override_settings(NOTIFICATION_DISPATCH_MODE="background")
+class BackgroundDispatchIntegrationTest(APITestCase):
+    """通知生成がトランザクションのコミット後に実行されることのテスト"""
+
+    def setUp(self):
+        self.user1 = User.objects.create_user(
+            username="user1", email="user1@example.com", password="testpass123"
+        )
+        self.user2 = User.objects.create_user(
+            username="user2", email="user2@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(
+            title="テストプロジェクト",
+            start_date=timezone.now(),
+            deadline=timezone.now() + timedelta(days=30),
+        )
+        self.project.members.add(self.user1, self.user2)
+        self.chatroom = ChatRoom.objects.create(project=self.project)
+        self.chatroom.members.add(self.user1, self.user2)
+        self.messages_url = f"/api/projects/{self.project.project_id}/chatrooms/{self.chatroom.chatroom_id}/messages/"
+
+    def test_notifications_are_deferred_until_commit(self):
+        """レスポンス時点では通知が作成されず、コミット後に作成されること"""
+        token = AccessToken.for_user(self.user1)
+
+        with patch.object(dispatch, "_get_executor", return_value=InlineExecutor()):
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                response = self.client.post(
+                    self.messages_url,
+                    {"content": "非同期テスト"},
+                    format="json",
+                    HTTP_AUTHORIZATION=f"Bearer {token}",
+                )
+
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(Notification.objects.count(), 0)
+            self.assertEqual(len(callbacks), 1)
+
+            for callback in callbacks:
+                callback()
+
+        notification = Notification.objects.get()
+        self.assertEqual(notification.recipient, self.user2)
+        self.assertEqual(notification.title, "新しいメッセージ")
+
+
+class DispatchQueueTest(TestCase):
+    """dispatchキューの動作テスト"""
+
+    @override_settings(NOTIFICATION_DISPATCH_MODE="eager")
+    def test_eager_mode_runs_inline(self):
+        """eagerモードではジョブが即座に実行されること"""
+        calls = []
+        dispatch.enqueue(calls.append, "job")
+        self.assertEqual(calls, ["job"])
+
+    @override_settings(NOTIFICATION_DISPATCH_MODE="background")
+    def test_background_mode_runs_job_on_worker_after_commit(self):
+        """backgroundモードではコミット後にワーカースレッドで実行されること"""
+        import threading
+
+        threads = []
+
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatch.enqueue(lambda: threads.append(threading.current_thread().name))
+            self.assertEqual(threads, [])
+
+        self.assertTrue(dispatch.drain(timeout=5))
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("notification-dispatch"))
+
+    @override_settings(NOTIFICATION_DISPATCH_MODE="background")
+    def test_failing_job_does_not_break_queue(self):
+        """ジョブの例外がログに記録され、後続ジョブが実行されること"""
+        calls = []
+
+        def failing_job():
+            raise RuntimeError("boom")
+
+        with self.assertLogs("notifications.dispatch", level="ERROR"):
+            with self.captureOnCommitCallbacks(execute=True):
+                dispatch.enqueue(failing_job)
+                dispatch.enqueue(calls.append, "after")
+            self.assertTrue(dispatch.drain(timeout=5))
+
+        self.assertEqual(calls, ["after"])
+
+
+@override_settings(NOTIFICATION_DISPATCH_MODE="background")
+class BackgroundDeliveryTest(TransactionTestCase):
+    """ワーカースレッドからの配信がサーバーのイベントループで行われることのテスト"""
+
+    async def test_worker_sends_wake_receivers_on_server_loop(self):
+        """ワーカースレッドで送信したフレームが待機中の受信側にすぐ届くこと"""
+        channel_layer = get_channel_layer()
+        channel = await channel_layer.new_channel()
+        await channel_layer.group_add("notifications_dispatch", channel)
+        receive = asyncio.ensure_future(channel_layer.receive(channel))
+        await asyncio.sleep(0)
+
+        def job():
+            # Let the server loop go idle, as it is between requests
+            time.sleep(0.2)
+            send_group_messages(
+                [
+                    (
+                        "notifications_dispatch",
+                        {"type": "notification_created", "text": "{}"},
+                    )
+                ]
+            )
+
+        # Enqueued from the thread sync views run in, as in a request
+        await sync_to_async(dispatch.enqueue)(job)
+
+        started = time.monotonic()
+        message = await asyncio.wait_for(receive, 3)
+        self.assertEqual(message["type"], "notification_created")
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertTrue(await sync_to_async(dispatch.drain)(timeout=5))
+        await channel_layer.group_discard("notifications_dispatch", channel)
@@ -117,6 +117,35 @@ class ProjectsNotificationIntegrationTest(APITestCase):
                 notification.message,
             )
 
+    def test_project_members_only_update_sends_notifications(self):
+        """メンバーのみの更新でも、更新者以外の既存メンバーに更新通知が送られること"""
+        from django.utils import timezone
+        from datetime import timedelta
+
+        project = Project.objects.create(
+            title="メンバー変更プロジェクト",
+            start_date=timezone.now(),
+            deadline=timezone.now() + timedelta(days=30),
+        )
+        project.members.add(self.user1, self.user2)
+
+        # user1がメンバーのみを更新
+        headers = get_auth_headers(self.user1)
+        response = self.client.patch(
+            f"/api/projects/{project.project_id}/",
+            {"members": [self.user1.id, self.user2.id, self.user3.id]},
+            format="json",
+            **headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        notifications = Notification.objects.filter(
+            notification_type="project",
+            message__contains="プロジェクト『メンバー変更プロジェクト』が更新されました",
+        )
+        # 追加されたuser3にはメンバー追加通知が送られる
+        self.assertEqual([n.recipient for n in notifications], [self.user2])
+
     def test_project_put_update_sends_notifications(self):
         """PUTリクエストによるプロジェクト更新でも通知が送られること"""
         # プロジェクトを作成
@@ -1,3 +1,5 @@
+import json
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -716,3 +718,221 @@ class NotificationUtilsTest(TestCase):
 
         self.assertIsInstance(notification, Notification)
         self.assertIsNotNone(notification.id)  # データベースに保存されていることを確認
+
+
+class NotifyUsersFanOutTest(TestCase):
+    """notify_usersによる一括通知配信のテスト"""
+
+    def setUp(self):
+        self.actor = User.objects.create_user(
+            username="actor", email="actor@example.com", password="testpass123"
+        )
+        self.recipients = [
+            User.objects.create_user(
+                username=f"member{i}",
+                email=f"member{i}@example.com",
+                password="testpass123",
+            )
+            for i in range(20)
+        ]
+
+    def test_fan_out_creates_one_notification_per_recipient(self):
+        """受信者ごとに1件ずつ通知が作成され、actorは除外されること"""
+        from .utils import notify_users
+
+        notifications = notify_users(
+            self.recipients + [self.actor],
+            title="一括通知",
+            message="一括メッセージ",
+            notification_type="system",
+            exclude=self.actor,
+        )
+
+        self.assertEqual(len(notifications), 20)
+        self.assertEqual(Notification.objects.count(), 20)
+        self.assertFalse(Notification.objects.filter(recipient=self.actor).exists())
+        self.assertTrue(all(n.pk is not None for n in notifications))
+
+    def test_fan_out_query_count_is_constant(self):
+        """受信者数に関わらずクエリ数が一定であること"""
+        from .utils import notify_users
+
+        notify_users(
+            self.recipients,
+            title="初回",
+            message="カウンター初期化",
+            notification_type="system",
+        )
+
+        with self.assertNumQueries(3):
+            notify_users(
+                self.recipients,
+                title="一括通知",
+                message="一括メッセージ",
+                notification_type="system",
+            )
+
+    def test_fan_out_deduplicates_recipients(self):
+        """同じ受信者が重複しても通知は1件のみ作成されること"""
+        from .utils import notify_users
+
+        notify_users(
+            [self.recipients[0], self.recipients[0]],
+            title="重複",
+            message="重複メッセージ",
+            notification_type="system",
+        )
+
+        self.assertEqual(
+            Notification.objects.filter(recipient=self.recipients[0]).count(), 1
+        )
+
+    def test_fan_out_sends_unread_count_to_each_group(self):
+        """各受信者のグループに未読件数付きのメッセージが送信されること"""
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+        from .utils import notify_users
+
+        recipient = self.recipients[0]
+        Notification.objects.create(
+            recipient=recipient,
+            title="既存",
+            message="既存の未読通知",
+            notification_type="system",
+        )
+
+        channel_layer = get_channel_layer()
+        channel_name = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(
+            f"notifications_{recipient.pk}", channel_name
+        )
+
+        notify_users(
+            [recipient],
+            title="新着",
+            message="新着メッセージ",
+            notification_type="system",
+        )
+
+        event = async_to_sync(channel_layer.receive)(channel_name)
+        self.assertEqual(event["type"], "notification_created")
+        frame = json.loads(event["text"])
+        self.assertEqual(frame["type"], "notification")
+        self.assertEqual(frame["notification"]["title"], "新着")
+        self.assertEqual(frame["unread_count"], 2)
+
+
+class UnreadNotificationCounterTest(TestCase):
+    """未読件数カウンターの維持と再計算のテスト"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="test@example.com", password="testpass123"
+        )
+
+    def _create(self, **kwargs):
+        return Notification.objects.create(
+            recipient=self.user,
+            title="通知",
+            message="メッセージ",
+            notification_type="system",
+            **kwargs,
+        )
+
+    def test_counter_follows_create_read_and_delete(self):
+        """作成・既読・未読戻し・削除でカウンターが更新されること"""
+        from .counters import get_unread_count
+
+        first = self._create()
+        second = self._create()
+        self._create(is_read=True)
+        self.assertEqual(get_unread_count(self.user.pk), 2)
+
+        first.is_read = True
+        first.save()
+        first.save()
+        self.assertEqual(get_unread_count(self.user.pk), 1)
+
+        first.is_read = False
+        first.save()
+        self.assertEqual(get_unread_count(self.user.pk), 2)
+
+        second.delete()
+        self.assertEqual(get_unread_count(self.user.pk), 1)
+
+    def test_mark_all_read_resets_counter(self):
+        """mark_all_readでカウンターが0になること"""
+        from .counters import get_unread_count, mark_all_read
+
+        for _ in range(3):
+            self._create()
+
+        self.assertEqual(mark_all_read(self.user), 3)
+        self.assertEqual(get_unread_count(self.user.pk), 0)
+
+    def test_concurrent_mark_read_decrements_once(self):
+        """同じ通知への既読処理が重複してもカウンターは1回だけ減ること"""
+        from rest_framework.test import APIClient
+        from .counters import get_unread_count, mark_read
+
+        notification = self._create()
+        self._create()
+        stale = Notification.objects.get(pk=notification.pk)
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.patch(f"/api/notifications/{notification.pk}/mark_read/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["is_read"])
+
+        # The other tab / the socket still holds the row as unread
+        self.assertFalse(stale.is_read)
+        self.assertEqual(mark_read(self.user, stale.pk), 0)
+        self.assertEqual(get_unread_count(self.user.pk), 1)
+
+    def test_mark_all_read_view_resets_counter(self):
+        """既読一括APIでカウンターが0になること"""
+        from rest_framework.test import APIClient
+        from .counters import get_unread_count
+
+        self._create()
+        self._create()
+
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.post("/api/notifications/mark_all_read/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated_count"], 2)
+        self.assertEqual(get_unread_count(self.user.pk), 0)
+
+    def test_reading_counter_does_not_scan_notifications(self):
+        """カウンター読み出しが通知テーブルを集計しないこと"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .counters import get_unread_count
+
+        self._create()
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(get_unread_count(self.user.pk), 1)
+
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn("notifications_notification", ctx.captured_queries[0]["sql"])
+
+    def test_reconcile_command_repairs_drift(self):
+        """reconcile_unread_countsコマンドでずれたカウンターが修復されること"""
+        from io import StringIO
+        from django.core.management import call_command
+        from .counters import get_unread_count
+        from .models import UnreadNotificationCounter
+
+        self._create()
+        self._create()
+        UnreadNotificationCounter.objects.filter(user=self.user).update(
+            unread_count=42
+        )
+
+        call_command("reconcile_unread_counts", stdout=StringIO())
+
+        self.assertEqual(get_unread_count(self.user.pk), 2)
@@ -1,8 +1,151 @@
+import asyncio
+
+from backend import json_codec
+from . import dispatch
+from .counters import get_unread_counts, increment_unread_counts
 from .models import Notification
 from .serializers import NotificationSerializer
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
+# Seconds a dispatch worker waits for the server loop to finish its sends
+SEND_TIMEOUT = 10
+
+
+def notify_users(
+    recipients,
+    title,
+    message,
+    notification_type,
+    related_object_id=None,
+    exclude=None,
+):
+    """
+    Fan one notification payload out to a set of recipients
+
+    The notifications are inserted with a single bulk_create, the unread
+    counters of every recipient are bumped and read back with one query each,
+    and all channel layer messages are dispatched in one batch.
+
+    Args:
+        recipients: Iterable (list or QuerySet) of User objects
+        title: Notification title
+        message: Notification message
+        notification_type: Type of notification ('task', 'project', 'chat', 'event', 'system')
+        related_object_id: Optional ID of related object
+        exclude: Optional User who should not be notified (usually the actor)
+
+    Returns:
+        List of created Notification objects, in recipient order
+    """
+    exclude_pk = getattr(exclude, "pk", None)
+
+    unique_recipients = {}
+    for recipient in recipients:
+        if recipient.pk is None or recipient.pk == exclude_pk:
+            continue
+        unique_recipients.setdefault(recipient.pk, recipient)
+
+    if not unique_recipients:
+        return []
+
+    notifications = Notification.objects.bulk_create(
+        [
+            Notification(
+                recipient=recipient,
+                title=title,
+                message=message,
+                notification_type=notification_type,
+                related_object_id=related_object_id,
+            )
+            for recipient in unique_recipients.values()
+        ]
+    )
+    _deliver(notifications)
+    return notifications
+
+
+def notify_each(payloads):
+    """
+    Send every recipient one notification with a payload of its own
+
+    Same batching as notify_users: one bulk_create, one counter update and
+    one channel layer batch for all recipients.
+
+    Args:
+        payloads: {recipient_id: payload}, payloads as built by the
+            *_notification_payload helpers
+
+    Returns:
+        List of created Notification objects
+    """
+    if not payloads:
+        return []
+
+    notifications = Notification.objects.bulk_create(
+        [
+            Notification(recipient_id=recipient_id, **payload)
+            for recipient_id, payload in payloads.items()
+        ]
+    )
+    _deliver(notifications)
+    return notifications
+
+
+def _deliver(notifications):
+    recipient_ids = [notification.recipient_id for notification in notifications]
+    increment_unread_counts(recipient_ids)
+    unread_counts = get_unread_counts(recipient_ids)
+    serialized = NotificationSerializer(notifications, many=True).data
+
+    # Frames are encoded here, once per recipient, and written as-is by every
+    # NotificationConsumer of that recipient
+    send_group_messages(
+        [
+            (
+                f"notifications_{notification.recipient_id}",
+                {
+                    "type": "notification_created",
+                    "text": json_codec.dumps(
+                        {
+                            "type": "notification",
+                            "notification": data,
+                            "unread_count": unread_counts.get(
+                                notification.recipient_id, 0
+                            ),
+                        }
+                    ),
+                },
+            )
+            for notification, data in zip(notifications, serialized)
+        ]
+    )
+
+
+def send_group_messages(messages):
+    """
+    Send a batch of (group_name, message) pairs through the channel layer
+
+    All sends run concurrently inside a single event loop hop instead of one
+    blocking async_to_sync call per recipient. On a dispatch worker the hop
+    is onto the server's event loop, where the receiving consumers wait.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not messages:
+        return
+
+    async def _send_all():
+        await asyncio.gather(
+            *(channel_layer.group_send(group, payload) for group, payload in messages)
+        )
+
+    loop = dispatch.server_loop()
+    if loop is not None:
+        # Bounded, so a server shutting down cannot hang the worker
+        asyncio.run_coroutine_threadsafe(_send_all(), loop).result(SEND_TIMEOUT)
+    else:
+        async_to_sync(_send_all)()
+
 
 def create_notification(
     recipient, title, message, notification_type, related_object_id=None
@@ -20,66 +163,97 @@ def create_notification(
     Returns:
         Notification object
     """
-    notification = Notification.objects.create(
-        recipient=recipient,
+    return notify_users(
+        [recipient],
         title=title,
         message=message,
         notification_type=notification_type,
         related_object_id=related_object_id,
-    )
-
-    channel_layer = get_channel_layer()
-    user_id = str(recipient.id)
-    serializer = NotificationSerializer(notification)
-
-    unread_count = Notification.objects.filter(
-        recipient=recipient, is_read=False
-    ).count()
-
-    async_to_sync(channel_layer.group_send)(
-        f"notifications_{user_id}",
-        {
-            "type": "notification_created",
-            "notification": serializer.data,
-            "unread_count": unread_count,
-        },
-    )
+    )[0]
 
-    return notification
 
-
-def create_task_notification(recipient, task, action="created"):
+def task_notification_payload(task, action="created"):
     """
-    Create task-related notifications
+    Build the notification payload for a task action
 
     Args:
-        recipient: User to notify
         task: Task object
-        action: Action performed ('created', 'updated', 'completed')
+        action: Action performed ('created', 'updated', 'completed',
+            'status_changed', 'assigned', 'commented')
     """
+    if action == "status_changed":
+        return {
+            "title": "タスク状態変更",
+            "message": f"タスク『{task.name}』の状態が変更されました",
+            "notification_type": "task",
+            "related_object_id": str(task.task_id),
+        }
+    if action == "assigned":
+        return {
+            "title": "タスク割り当て",
+            "message": f"タスク『{task.name}』があなたに割り当てられました",
+            "notification_type": "task",
+            "related_object_id": str(task.task_id),
+        }
+    if action == "commented":
+        return {
+            "title": "新しいコメント",
+            "message": f"タスク『{task.name}』に新しいコメントが追加されました",
+            "notification_type": "task",
+            "related_object_id": str(task.task_id),
+        }
+
     action_messages = {
         "created": f"新しいタスク『{task.name}』が追加されました",
         "updated": f"タスク『{task.name}』が更新されました",
         "completed": f"タスク『{task.name}』が完了しました",
     }
 
-    return create_notification(
-        recipient=recipient,
-        title="タスク通知",
-        message=action_messages.get(action, f"タスク『{task.name}』が変更されました"),
-        notification_type="task",
-        related_object_id=str(task.task_id),
+    return {
+        "title": "タスク通知",
+        "message": action_messages.get(action, f"タスク『{task.name}』が変更されました"),
+        "notification_type": "task",
+        "related_object_id": str(task.task_id),
+    }
+
+
+def task_batch_notification_payload(project, counts):
+    """
+    Build the notification payload summarising several task actions
+
+    Args:
+        project: Project object the tasks belong to
+        counts: {action: number of tasks}, actions as for
+            task_notification_payload
+    """
+    labels = {
+        "created": "追加",
+        "updated": "更新",
+        "completed": "完了",
+        "status_changed": "状態変更",
+        "assigned": "割り当て",
+    }
+    summary = "、".join(
+        f"{labels.get(action, action)} {count}件"
+        for action, count in counts.items()
+        if count
     )
 
+    return {
+        "title": "タスク通知",
+        "message": f"プロジェクト『{project.title}』のタスクが変更されました（{summary}）",
+        "notification_type": "task",
+        "related_object_id": str(project.project_id),
+    }
+
 
-def create_project_notification(recipient, project, action="updated"):
+def project_notification_payload(project, action="updated"):
     """
-    Create project-related notifications
+    Build the notification payload for a project action
 
     Args:
-        recipient: User to notify
         project: Project object
-        action: Action performed
+        action: Action performed ('created', 'updated', 'member_added')
     """
     action_messages = {
         "created": f"新しいプロジェクト『{project.title}』が作成されました",
@@ -87,14 +261,82 @@ def create_project_notification(recipient, project, action="updated"):
         "member_added": f"プロジェクト『{project.title}』に新しいメンバーが追加されました",
     }
 
-    return create_notification(
-        recipient=recipient,
-        title="プロジェクト通知",
-        message=action_messages.get(
+    return {
+        "title": "プロジェクト通知",
+        "message": action_messages.get(
             action, f"プロジェクト『{project.title}』が変更されました"
         ),
-        notification_type="project",
-        related_object_id=str(project.project_id),
+        "notification_type": "project",
+        "related_object_id": str(project.project_id),
+    }
+
+
+def chat_notification_payload(message, sender):
+    """
+    Build the notification payload for a chat message
+
+    Args:
+        message: Message object or content
+        sender: User who sent the message
+    """
+    return {
+        "title": "新しいメッセージ",
+        "message": f"{sender.username}さんから新しいメッセージが届いています",
+        "notification_type": "chat",
+        "related_object_id": str(message.message_id)
+        if hasattr(message, "message_id")
+        else None,
+    }
+
+
+def event_notification_payload(event, action="created"):
+    """
+    Build the notification payload for an event action
+
+    Args:
+        event: Event object
+        action: Action performed ('created', 'updated')
+    """
+    action_messages = {
+        "created": f"新しいイベント『{event.title}』が作成されました",
+        "updated": f"イベント『{event.title}』が更新されました",
+    }
+
+    return {
+        "title": "イベント通知",
+        "message": action_messages.get(
+            action, f"イベント『{event.title}』が変更されました"
+        ),
+        "notification_type": "event",
+        "related_object_id": str(event.event_id),
+    }
+
+
+def create_task_notification(recipient, task, action="created"):
+    """
+    Create task-related notifications
+
+    Args:
+        recipient: User to notify
+        task: Task object
+        action: Action performed ('created', 'updated', 'completed')
+    """
+    return create_notification(
+        recipient=recipient, **task_notification_payload(task, action)
+    )
+
+
+def create_project_notification(recipient, project, action="updated"):
+    """
+    Create project-related notifications
+
+    Args:
+        recipient: User to notify
+        project: Project object
+        action: Action performed
+    """
+    return create_notification(
+        recipient=recipient, **project_notification_payload(project, action)
     )
 
 
@@ -107,16 +349,8 @@ def create_chat_notification(recipient, message, sender):
         message: Message object or content
         sender: User who sent the message
     """
-    message_content = message.content if hasattr(message, "content") else str(message)
-
     return create_notification(
-        recipient=recipient,
-        title="新しいメッセージ",
-        message=f"{sender.username}さんから新しいメッセージが届いています",
-        notification_type="chat",
-        related_object_id=str(message.message_id)
-        if hasattr(message, "message_id")
-        else None,
+        recipient=recipient, **chat_notification_payload(message, sender)
     )
 
 
@@ -129,19 +363,8 @@ def create_event_notification(recipient, event, action="created"):
         event: Event object
         action: Action performed ('created', 'updated')
     """
-    action_messages = {
-        "created": f"新しいイベント『{event.title}』が作成されました",
-        "updated": f"イベント『{event.title}』が更新されました",
-    }
-
     return create_notification(
-        recipient=recipient,
-        title="イベント通知",
-        message=action_messages.get(
-            action, f"イベント『{event.title}』が変更されました"
-        ),
-        notification_type="event",
-        related_object_id=str(event.event_id),
+        recipient=recipient, **event_notification_payload(event, action)
     )
 
 
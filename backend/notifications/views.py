@@ -1,8 +1,13 @@
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from .counters import mark_all_read, mark_read
 from .models import Notification
-from .serializers import NotificationSerializer
+from .serializers import (
+    NOTIFICATION_VALUES,
+    NotificationSerializer,
+    serialize_notification_rows,
+)
 
 
 class NotificationListView(generics.ListAPIView):
@@ -12,15 +17,23 @@ class NotificationListView(generics.ListAPIView):
     def get_queryset(self):
         return Notification.objects.filter(recipient=self.request.user)
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).values(
+            *NOTIFICATION_VALUES
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serialize_notification_rows(page))
+        return Response(serialize_notification_rows(queryset))
+
 
 class NotificationMarkReadView(generics.UpdateAPIView):
     permission_classes = [IsAuthenticated]
 
     def patch(self, request, id):
+        mark_read(request.user, id)
         try:
             notification = Notification.objects.get(id=id, recipient=request.user)
-            notification.is_read = True
-            notification.save()
             serializer = NotificationSerializer(notification)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Notification.DoesNotExist:
@@ -33,7 +46,5 @@ class NotificationMarkAllReadView(generics.UpdateAPIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        updated_count = Notification.objects.filter(
-            recipient=request.user, is_read=False
-        ).update(is_read=True)
+        updated_count = mark_all_read(request.user)
         return Response({"updated_count": updated_count}, status=status.HTTP_200_OK)
@@ -0,0 +1,114 @@
+"""
+Task and event changes pushed to ProjectBoardConsumer.
+
+Every change is a compact diff:
+
+    {"entity": "task" | "event", "op": "created" | "updated" | "deleted",
+     "id": "<uuid>", "fields": {...}}
+
+"created" carries all board fields, "updated" only the ones that changed and
+"deleted" none. Changes are sent to the project's group after the
+surrounding transaction commits, in the order they happened.
+"""
+
+import datetime
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import transaction
+
+from backend.representation import datetime_repr
+
+TASK_FIELDS = ("name", "description", "start_date", "deadline", "priority", "status")
+EVENT_FIELDS = ("title", "is_all_day", "start_date", "end_date", "color")
+
+
+def board_group_name(project_id):
+    return f"project_board_{project_id}"
+
+
+def _value(value):
+    if isinstance(value, datetime.datetime):
+        return datetime_repr(value)
+    return value
+
+
+def build_change(entity, op, object_id, instance=None, fields=()):
+    """
+    Diff for one object; field values are read from ``instance``
+    """
+    return {
+        "entity": entity,
+        "op": op,
+        "id": str(object_id),
+        "fields": {name: _value(getattr(instance, name)) for name in fields},
+    }
+
+
+def publish(project_id, change):
+    """
+    Send a change to the project's board once the current transaction commits
+    """
+
+    def send():
+        async_to_sync(get_channel_layer().group_send)(
+            board_group_name(project_id), {"type": "board_change", "change": change}
+        )
+
+    transaction.on_commit(send)
+
+
+def publish_many(project_id, changes):
+    """
+    Send several changes as one channel layer message once the current
+    transaction commits; used for batched writes that bypass the signals
+    """
+    if not changes:
+        return
+
+    def send():
+        async_to_sync(get_channel_layer().group_send)(
+            board_group_name(project_id), {"type": "board_changes", "changes": changes}
+        )
+
+    transaction.on_commit(send)
+
+
+def publish_save(entity, fields, instance, created):
+    if created:
+        change = build_change(entity, "created", instance.pk, instance, fields)
+    else:
+        changed = instance.changed_fields(fields)
+        if not changed:
+            return
+        change = build_change(entity, "updated", instance.pk, instance, changed)
+    publish(instance.project_id, change)
+
+
+def publish_delete(entity, instance):
+    publish(instance.project_id, build_change(entity, "deleted", instance.pk))
+
+
+def merge_change(pending, change):
+    """
+    Fold ``change`` into ``pending``, a dict of (entity, id) -> change kept in
+    arrival order, so that each object is reported at most once per frame
+    """
+    key = (change["entity"], change["id"])
+    previous = pending.get(key)
+    if previous is None:
+        pending[key] = change
+    elif change["op"] == "deleted":
+        if previous["op"] == "created":
+            # Created and deleted within one window: the client never saw it
+            del pending[key]
+        else:
+            pending[key] = change
+    elif previous["op"] == "deleted":
+        pending[key] = change
+    else:
+        # created/updated followed by an update keeps the first op
+        pending[key] = {
+            **previous,
+            "fields": {**previous["fields"], **change["fields"]},
+        }
@@ -0,0 +1,76 @@
+import asyncio
+import uuid
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from backend import json_codec
+from .board import board_group_name, merge_change
+from .models import Project
+
+# Seconds changes are collected after the first one before they are sent
+COALESCE_WINDOW = 0.2
+
+
+class ProjectBoardConsumer(AsyncWebsocketConsumer):
+    """
+    Pushes task and event changes of one project to the clients viewing it.
+
+    Changes arriving within COALESCE_WINDOW seconds are merged per object and
+    sent as one {"type": "board_changes", "changes": [...]} frame, so a burst
+    of saves while dragging on the Gantt chart does not become a frame per
+    field change.
+    """
+
+    async def connect(self):
+        user = self.scope["user"]
+        try:
+            self.project_id = uuid.UUID(self.scope["url_route"]["kwargs"]["project_id"])
+        except ValueError:
+            await self.close()
+            return
+        if user.is_anonymous or not await self.is_member(user):
+            await self.close()
+            return
+
+        self.group_name = board_group_name(self.project_id)
+        self.pending = {}
+        self.flush_task = None
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        if getattr(self, "flush_task", None) is not None:
+            self.flush_task.cancel()
+
+    async def board_change(self, event):
+        merge_change(self.pending, event["change"])
+        self.schedule_flush()
+
+    async def board_changes(self, event):
+        for change in event["changes"]:
+            merge_change(self.pending, change)
+        self.schedule_flush()
+
+    def schedule_flush(self):
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self.flush_later())
+
+    async def flush_later(self):
+        await asyncio.sleep(COALESCE_WINDOW)
+        changes, self.pending = list(self.pending.values()), {}
+        self.flush_task = None
+        if changes:
+            await self.send(
+                text_data=json_codec.dumps(
+                    {"type": "board_changes", "changes": changes}
+                )
+            )
+
+    @database_sync_to_async
+    def is_member(self, user):
+        return Project.members.through.objects.filter(
+            project_id=self.project_id, user_id=user.pk
+        ).exists()
@@ -0,0 +1,117 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from projects.models import Project, TASK_STATUS_DONE
+from projects.progress import rebuild_project_progress
+from projects.serializers import ProjectListSerializer
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Time one page of the project list reading the stored progress column, "
+        "against computing it from annotated task counts and against the "
+        "original prefetch + two COUNTs per project. Data is rolled back "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--projects", type=int, default=100)
+        parser.add_argument("--tasks-per-project", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self._populate(options["projects"], options["tasks_per_project"])
+            self.stdout.write(
+                f"{options['projects']} projects x {options['tasks_per_project']} tasks"
+            )
+            for label, func in (
+                ("per-project counts", lambda: self._legacy_page(user, options)),
+                ("annotated", lambda: self._annotated_page(user, options)),
+                ("stored column", lambda: self._stored_page(user, options)),
+            ):
+                self._measure(label, func, options["repeat"])
+            transaction.set_rollback(True)
+
+    def _populate(self, project_count, tasks_per_project):
+        user = get_user_model().objects.create_user(
+            username="project-benchmark", password="unused"
+        )
+        now = timezone.now()
+        projects = Project.objects.bulk_create(
+            Project(title=f"Project {i}", start_date=now, deadline=now)
+            for i in range(project_count)
+        )
+        Project.members.through.objects.bulk_create(
+            Project.members.through(project_id=project.pk, user_id=user.pk)
+            for project in projects
+        )
+        for project in projects:
+            Task.objects.bulk_create(
+                (
+                    Task(
+                        project=project,
+                        name=f"Task {i}",
+                        deadline=now,
+                        status=TASK_STATUS_DONE if i % 4 == 0 else "todo",
+                    )
+                    for i in range(tasks_per_project)
+                ),
+                batch_size=1000,
+            )
+        # bulk_create bypasses the task signals that maintain the counters
+        rebuild_project_progress([project.pk for project in projects])
+        return user
+
+    def _legacy_page(self, user, options):
+        projects = list(
+            Project.objects.prefetch_related("tasks", "members")
+            .filter(members=user)
+            .order_by("-start_date")[: options["projects"]]
+        )
+        progress = []
+        for project in projects:
+            total = project.tasks.count()
+            done = project.tasks.filter(status=TASK_STATUS_DONE).count()
+            progress.append(int((done / total) * 100) if total else 0)
+        return progress
+
+    def _annotated_page(self, user, options):
+        projects = (
+            Project.objects.filter(members=user)
+            .with_progress()
+            .prefetch_related("members")
+            .order_by("-start_date")[: options["projects"]]
+        )
+        return [
+            project.tasks_done * 100 // project.tasks_total if project.tasks_total else 0
+            for project in projects
+        ]
+
+    def _stored_page(self, user, options):
+        projects = (
+            Project.objects.filter(members=user)
+            .prefetch_related("members")
+            .order_by("-start_date")[: options["projects"]]
+        )
+        return [row["progress"] for row in ProjectListSerializer(projects, many=True).data]
+
+    def _measure(self, label, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                began = time.perf_counter()
+                result = func()
+                timings.append((time.perf_counter() - began) * 1000)
+        assert all(value == 25 for value in result)
+        self.stdout.write(
+            f"{label:>20}: median {statistics.median(timings):8.1f} ms, "
+            f"{len(queries)} queries"
+        )
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from projects.progress import rebuild_project_progress
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored task counts and progress of projects from the task table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project",
+            action="append",
+            dest="project_ids",
+            help="Only rebuild the given project ID (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_project_progress(options["project_ids"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt progress for {rebuilt} project(s).")
+        )
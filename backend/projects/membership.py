@@ -0,0 +1,119 @@
+"""
+Project membership lookups for project-scoped endpoints.
+
+The IDs of all projects a user belongs to are loaded with one query and then
+answered from memory: for the rest of the request from an attribute on the
+request, and across requests from the default cache for
+MEMBERSHIP_CACHE_TTL seconds. projects.signals drops a user's cached set
+when a change to their memberships commits. The cross-request cache is off
+unless the cache is shared between worker processes (CACHE_REDIS_URL), as
+invalidations would otherwise only reach the local process.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Project
+
+_REQUEST_ATTR = "_project_membership"
+
+
+def _cache_key(user_id):
+    return f"project-membership:{user_id}"
+
+
+def _membership_queryset(user_id):
+    return Project.members.through.objects.filter(user_id=user_id).values_list(
+        "project_id", flat=True
+    )
+
+
+def _as_uuid(project_id):
+    if isinstance(project_id, uuid.UUID):
+        return project_id
+    try:
+        return uuid.UUID(str(project_id))
+    except ValueError:
+        return None
+
+
+def get_member_project_ids(request):
+    """
+    IDs of the projects request.user is a member of, as a frozenset of UUIDs
+    """
+    django_request = getattr(request, "_request", request)
+    try:
+        return getattr(django_request, _REQUEST_ATTR)
+    except AttributeError:
+        pass
+
+    user = request.user
+    project_ids = frozenset()
+    if user.is_authenticated:
+        ttl = getattr(settings, "MEMBERSHIP_CACHE_TTL", 0)
+        project_ids = cache.get(_cache_key(user.pk)) if ttl > 0 else None
+        if project_ids is None:
+            project_ids = frozenset(_membership_queryset(user.pk))
+            if ttl > 0:
+                cache.set(_cache_key(user.pk), project_ids, ttl)
+
+    setattr(django_request, _REQUEST_ATTR, project_ids)
+    return project_ids
+
+
+async def aget_member_project_ids(request):
+    """
+    Async variant of get_member_project_ids; request.user must already be
+    resolved (AsyncAPIView authenticates before calling the handler)
+    """
+    django_request = getattr(request, "_request", request)
+    try:
+        return getattr(django_request, _REQUEST_ATTR)
+    except AttributeError:
+        pass
+
+    user = request.user
+    project_ids = frozenset()
+    if user.is_authenticated:
+        ttl = getattr(settings, "MEMBERSHIP_CACHE_TTL", 0)
+        project_ids = await cache.aget(_cache_key(user.pk)) if ttl > 0 else None
+        if project_ids is None:
+            project_ids = frozenset(
+                [pk async for pk in _membership_queryset(user.pk)]
+            )
+            if ttl > 0:
+                await cache.aset(_cache_key(user.pk), project_ids, ttl)
+
+    setattr(django_request, _REQUEST_ATTR, project_ids)
+    return project_ids
+
+
+def is_project_member(request, project_id):
+    """
+    Whether request.user is a member of the project with the given ID
+    """
+    project_id = _as_uuid(project_id)
+    return project_id is not None and project_id in get_member_project_ids(request)
+
+
+async def ais_project_member(request, project_id):
+    """
+    Async variant of is_project_member
+    """
+    project_id = _as_uuid(project_id)
+    return project_id is not None and project_id in await aget_member_project_ids(
+        request
+    )
+
+
+def invalidate_membership(user_ids):
+    """
+    Drop the cached membership sets of the given users once the current
+    transaction commits; dropping them earlier would let a concurrent
+    request cache the memberships as they were before the change
+    """
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
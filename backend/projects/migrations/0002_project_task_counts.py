@@ -0,0 +1,45 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:58
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_task_counts(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    projects = Project.objects.annotate(
+        tasks_total=Count("tasks"),
+        tasks_done=Count("tasks", filter=Q(tasks__status="done")),
+    ).only("pk")
+    updated = []
+    for project in projects:
+        project.task_count = project.tasks_total
+        project.done_task_count = project.tasks_done
+        project.progress = (
+            project.tasks_done * 100 // project.tasks_total if project.tasks_total else 0
+        )
+        updated.append(project)
+    Project.objects.bulk_update(
+        updated, ["task_count", "done_task_count", "progress"], batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='done_task_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='task_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(populate_task_counts, migrations.RunPython.noop),
+    ]
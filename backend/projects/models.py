@@ -2,7 +2,26 @@
 import uuid
 from django.db import models
 from django.conf import settings
-from django.db.models import Q, CheckConstraint, F
+from django.db.models import Q, CheckConstraint, Count, F
+
+TASK_STATUS_DONE = "done"
+
+
+class ProjectQuerySet(models.QuerySet):
+    def with_progress(self):
+        """
+        Annotate tasks_total and tasks_done counted from the tasks table, as
+        used by rebuild_project_progress.
+
+        The counts are not DISTINCT, so do not combine this with another
+        multi-valued join (filtering on a single member is fine).
+        """
+        return self.annotate(
+            tasks_total=Count("tasks"),
+            tasks_done=Count(
+                "tasks", filter=Q(tasks__status=TASK_STATUS_DONE)
+            ),
+        )
 
 
 class Project(models.Model):
@@ -11,7 +30,11 @@ class Project(models.Model):
     description = models.TextField(blank=True)
     start_date = models.DateTimeField()
     deadline = models.DateTimeField()
+    # Maintained by projects.signals whenever a task is added, removed or
+    # changes status; rebuild with `manage.py rebuild_project_progress`.
     progress = models.PositiveIntegerField(default=0)
+    task_count = models.PositiveIntegerField(default=0)
+    done_task_count = models.PositiveIntegerField(default=0)
 
     status_choices = [
         ("planning", "Planning"),
@@ -22,6 +45,8 @@ class Project(models.Model):
 
     members = models.ManyToManyField(settings.AUTH_USER_MODEL, blank=True)
 
+    objects = ProjectQuerySet.as_manager()
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
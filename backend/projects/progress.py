@@ -0,0 +1,62 @@
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Project
+
+
+def calculate_progress(total, done):
+    """
+    Integer percentage of done tasks, 0 for a project without tasks
+    """
+    if total <= 0:
+        return 0
+    return done * 100 // total
+
+
+def adjust_task_counts(project_id, total_delta=0, done_delta=0):
+    """
+    Atomically apply task count deltas to a project and recompute progress
+
+    Everything happens in one UPDATE based on the current column values, so
+    concurrent task changes on the same project cannot lose increments.
+    """
+    if not total_delta and not done_delta:
+        return
+
+    total = F("task_count") + total_delta
+    done = F("done_task_count") + done_delta
+    Project.objects.filter(pk=project_id).update(
+        task_count=total,
+        done_task_count=done,
+        progress=Case(
+            When(task_count__lte=-total_delta, then=Value(0)),
+            default=done * 100 / total,
+            output_field=IntegerField(),
+        ),
+    )
+
+
+def rebuild_project_progress(project_ids=None):
+    """
+    Recompute the stored task counts and progress from the tasks table
+
+    Args:
+        project_ids: Optional list of project IDs; all projects when omitted
+
+    Returns:
+        Number of projects rewritten
+    """
+    projects = Project.objects.with_progress().only("pk")
+    if project_ids is not None:
+        projects = projects.filter(pk__in=list(project_ids))
+
+    rebuilt = []
+    for project in projects:
+        project.task_count = project.tasks_total
+        project.done_task_count = project.tasks_done
+        project.progress = calculate_progress(project.tasks_total, project.tasks_done)
+        rebuilt.append(project)
+
+    Project.objects.bulk_update(
+        rebuilt, ["task_count", "done_task_count", "progress"], batch_size=500
+    )
+    return len(rebuilt)
@@ -0,0 +1,9 @@
+from django.urls import re_path
+from . import consumers
+
+websocket_urlpatterns = [
+    re_path(
+        r"^ws/projects/(?P<project_id>[0-9a-f-]+)/board/$",
+        consumers.ProjectBoardConsumer.as_asgi(),
+    ),
+]
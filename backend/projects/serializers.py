@@ -1,31 +1,18 @@
 # projects/serializers.py
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+
+from api.serializers import UserSummarySerializer
 from .models import Project
 
-TASK_STATUS_DONE = "done"
 User = get_user_model()
 
-
-class MemberSerializer(serializers.ModelSerializer):
-    user_id = serializers.IntegerField(source="pk")
-    name = serializers.CharField(source="username")
-    email = serializers.EmailField()
-    profile_picture = serializers.SerializerMethodField()
-
-    class Meta:
-        model = User
-        fields = ["user_id", "name", "email", "profile_picture"]
-
-    def get_profile_picture(self, obj):
-        return obj.profile_picture.url if obj.profile_picture else None
+MemberSerializer = UserSummarySerializer
 
 
 class ProjectListSerializer(serializers.ModelSerializer):
     members = MemberSerializer(many=True, read_only=True)
 
-    progress = serializers.SerializerMethodField()
-
     class Meta:
         model = Project
         fields = [
@@ -39,21 +26,9 @@ class ProjectListSerializer(serializers.ModelSerializer):
             "members",
         ]
 
-    def get_progress(self, obj):
-        tasks = obj.tasks.all()
-        total_tasks = tasks.count()
-
-        if total_tasks == 0:
-            return 0
-
-        completed_tasks = tasks.filter(status=TASK_STATUS_DONE).count()
-
-        return int((completed_tasks / total_tasks) * 100)
-
 
 class ProjectResponseSerializer(serializers.ModelSerializer):
     members = MemberSerializer(many=True, read_only=True)
-    progress = serializers.SerializerMethodField()
 
     class Meta:
         model = Project
@@ -69,16 +44,6 @@ class ProjectResponseSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["project_id"]
 
-    def get_progress(self, obj):
-        tasks = obj.tasks.all()
-        total_tasks = tasks.count()
-
-        if total_tasks == 0:
-            return 0
-
-        completed_tasks = tasks.filter(status=TASK_STATUS_DONE).count()
-        return int((completed_tasks / total_tasks) * 100)
-
 
 class ProjectCreateSerializer(serializers.Serializer):
     title = serializers.CharField(max_length=255)
@@ -139,7 +104,11 @@ class ProjectCreateSerializer(serializers.Serializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
-        instance.save()
+        # Only write the edited columns so the task counters maintained by
+        # projects.signals are never overwritten with stale values. A members-only
+        # edit still saves (rewriting the title, as there is no updated_at
+        # column) so post_save sends the "project updated" notification.
+        instance.save(update_fields=list(validated_data) or ["title"])
 
         if members is not None:
             instance.members.set(members)
@@ -0,0 +1,107 @@
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from tasks.bulk import deleted_in_batch
+from . import board
+from .membership import invalidate_membership
+from .models import Project, TASK_STATUS_DONE
+from .progress import adjust_task_counts
+
+
+def _deleted_with_project(origin):
+    return isinstance(origin, Project) or getattr(origin, "model", None) is Project
+
+
+@receiver(post_save, sender="tasks.Task")
+def handle_task_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    is_done = instance.status == TASK_STATUS_DONE
+    if created:
+        adjust_task_counts(instance.project_id, total_delta=1, done_delta=int(is_done))
+        return
+
+    was_done = instance._old_status == TASK_STATUS_DONE
+    if was_done != is_done:
+        adjust_task_counts(instance.project_id, done_delta=1 if is_done else -1)
+
+
+@receiver(post_delete, sender="tasks.Task")
+def handle_task_delete(sender, instance, origin=None, **kwargs):
+    # Tasks removed by deleting their project need no bookkeeping, and a
+    # TaskBatch adjusts the counts once for all of its deletes
+    if _deleted_with_project(origin) or deleted_in_batch(origin):
+        return
+
+    adjust_task_counts(
+        instance.project_id,
+        total_delta=-1,
+        done_delta=-int(instance._old_status == TASK_STATUS_DONE),
+    )
+
+
+@receiver(m2m_changed, sender=Project.members.through)
+def handle_members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # user.project_set.add(...) and friends
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_membership([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        invalidate_membership(pk_set)
+    elif action == "pre_clear":
+        invalidate_membership(instance.members.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Project)
+def handle_project_delete(sender, instance, **kwargs):
+    invalidate_membership(instance.members.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def handle_user_delete(sender, instance, **kwargs):
+    invalidate_membership([instance.pk])
+
+
+@receiver(post_save, sender="tasks.Task")
+def publish_task_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        board.publish_save("task", board.TASK_FIELDS, instance, created)
+
+
+@receiver(post_delete, sender="tasks.Task")
+def publish_task_delete(sender, instance, origin=None, **kwargs):
+    if not (_deleted_with_project(origin) or deleted_in_batch(origin)):
+        board.publish_delete("task", instance)
+
+
+@receiver(m2m_changed, sender="tasks.TaskAssignedUser")
+def publish_task_assignees(sender, instance, action, reverse, **kwargs):
+    if reverse or action not in ("post_add", "post_remove", "post_clear"):
+        return
+    board.publish(
+        instance.project_id,
+        {
+            "entity": "task",
+            "op": "updated",
+            "id": str(instance.pk),
+            "fields": {
+                "assigned_user_ids": sorted(
+                    instance.assigned_users.values_list("pk", flat=True)
+                )
+            },
+        },
+    )
+
+
+@receiver(post_save, sender="event.Event")
+def publish_event_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        board.publish_save("event", board.EVENT_FIELDS, instance, created)
+
+
+@receiver(post_delete, sender="event.Event")
+def publish_event_delete(sender, instance, origin=None, **kwargs):
+    if not _deleted_with_project(origin):
+        board.publish_delete("event", instance)
@@ -0,0 +1,153 @@
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.asgi import application
+from event.models import Event
+from tasks.models import Task, TaskStatus
+
+from .board import merge_change
+from .models import Project
+
+User = get_user_model()
+
+
+def change(op, object_id="1", entity="task", **fields):
+    return {"entity": entity, "op": op, "id": object_id, "fields": fields}
+
+
+class MergeChangeTest(SimpleTestCase):
+    def merged(self, *changes):
+        pending = {}
+        for item in changes:
+            merge_change(pending, item)
+        return list(pending.values())
+
+    def test_updates_are_merged_per_object(self):
+        """同じオブジェクトへの連続した更新が1件にまとまること"""
+        self.assertEqual(
+            self.merged(
+                change("updated", start_date="a"),
+                change("updated", "2", deadline="x"),
+                change("updated", start_date="b", deadline="c"),
+            ),
+            [
+                change("updated", start_date="b", deadline="c"),
+                change("updated", "2", deadline="x"),
+            ],
+        )
+
+    def test_created_absorbs_updates(self):
+        """作成直後の更新が作成の差分に取り込まれること"""
+        self.assertEqual(
+            self.merged(
+                change("created", name="a", status="todo"),
+                change("updated", status="done"),
+            ),
+            [change("created", name="a", status="done")],
+        )
+
+    def test_created_then_deleted_is_dropped(self):
+        """同じ区間で作成・削除されたものは送信されないこと"""
+        self.assertEqual(self.merged(change("created", name="a"), change("deleted")), [])
+
+    def test_delete_replaces_update(self):
+        """更新後の削除は削除のみが送られること"""
+        self.assertEqual(
+            self.merged(change("updated", name="a"), change("deleted")),
+            [change("deleted")],
+        )
+
+
+class ProjectBoardConsumerTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="viewer", email="viewer@example.com", password="testpass123"
+        )
+        self.stranger = User.objects.create_user(
+            username="stranger", email="stranger@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(
+            title="Board",
+            start_date=timezone.now(),
+            deadline=timezone.now() + timezone.timedelta(days=30),
+        )
+        self.project.members.add(self.user)
+        self.task = Task.objects.create(
+            project=self.project, name="Existing", deadline=timezone.now()
+        )
+
+    def communicator(self, user):
+        return WebsocketCommunicator(
+            application,
+            f"/ws/projects/{self.project.project_id}/board/?token={AccessToken.for_user(user)}",
+        )
+
+    @database_sync_to_async
+    def committed(self, func):
+        with self.captureOnCommitCallbacks(execute=True):
+            func()
+
+    async def test_non_member_is_rejected(self):
+        """プロジェクトメンバー以外は接続できないこと"""
+        connected, _ = await self.communicator(self.stranger).connect()
+        self.assertFalse(connected)
+
+    async def test_rapid_changes_arrive_as_one_frame(self):
+        """短時間の連続変更が1フレームの差分にまとめられること"""
+        communicator = self.communicator(self.user)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        def drag():
+            for day in range(1, 21):
+                self.task.deadline = timezone.now() + timezone.timedelta(days=day)
+                self.task.save()
+            self.task.status = TaskStatus.IN_PROGRESS
+            self.task.save()
+            new_task = Task.objects.create(
+                project=self.project, name="New", deadline=timezone.now()
+            )
+            new_task.assigned_users.add(self.user)
+            event = Event.objects.create(
+                project=self.project,
+                title="Short lived",
+                start_date=timezone.now(),
+                end_date=timezone.now(),
+            )
+            event.delete()
+
+        await self.committed(drag)
+
+        frame = await communicator.receive_json_from(timeout=2)
+        self.assertEqual(frame["type"], "board_changes")
+        changes = {item["id"]: item for item in frame["changes"]}
+        self.assertEqual(len(changes), 2)
+
+        updated = changes[str(self.task.task_id)]
+        self.assertEqual(updated["op"], "updated")
+        self.assertEqual(set(updated["fields"]), {"deadline", "status"})
+        self.assertEqual(updated["fields"]["status"], TaskStatus.IN_PROGRESS)
+
+        created = next(item for item in frame["changes"] if item["op"] == "created")
+        self.assertEqual(created["fields"]["name"], "New")
+        self.assertEqual(created["fields"]["assigned_user_ids"], [self.user.pk])
+
+        self.assertTrue(await communicator.receive_nothing(timeout=0.3))
+        await communicator.disconnect()
+
+    async def test_unchanged_save_sends_nothing(self):
+        """値が変わらない保存では何も送信されないこと"""
+        communicator = self.communicator(self.user)
+        await communicator.connect()
+
+        def touch():
+            Task.objects.get(pk=self.task.pk).save()
+
+        await self.committed(touch)
+
+        self.assertTrue(await communicator.receive_nothing(timeout=0.4))
+        await communicator.disconnect()
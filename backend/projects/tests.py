@@ -3,6 +3,7 @@ from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from django.db import utils as django_db
+from django.test import override_settings
 from tasks.models import Task, TaskStatus
 from .models import Project
 
@@ -102,6 +103,35 @@ class ProjectAPITest(APITestCase):
         self.assertIn("per_page", response.data)
         self.assertGreaterEqual(len(response.data["projects"]), 1)
 
+    def test_list_projects_progress_uses_fixed_number_of_queries(self):
+        """一覧の進捗率がプロジェクト数に関係なく一定のクエリ数で計算されること"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        def add_projects(count):
+            for i in range(count):
+                project = self.create_project_helper(title=f"P{i}")
+                for n, task_status in enumerate(["done", "todo", "todo"]):
+                    Task.objects.create(
+                        project=project,
+                        name=f"Task {n}",
+                        deadline="2024-01-02T00:00:00Z",
+                        status=task_status,
+                    )
+
+        add_projects(1)
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get(self.url_list)
+        add_projects(5)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(self.url_list)
+
+        self.assertEqual(len(response.data["projects"]), 6)
+        self.assertEqual(len(few), len(many))
+        for project in response.data["projects"]:
+            self.assertEqual(project["progress"], 33)
+            self.assertEqual(len(project["members"]), 2)
+
     def test_get_project_detail(self):
         project = self.create_project_helper()
         url_detail = reverse("project-detail", args=[project.project_id])
@@ -286,3 +316,209 @@ class ProjectAPITest(APITestCase):
         }
         response = self.client.patch(url_detail, invalid_date_data, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProjectProgressMaterializationTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="progressuser", email="progress@example.com", password="password"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.project = Project.objects.create(
+            title="Progress Project",
+            start_date="2024-01-01T00:00:00Z",
+            deadline="2024-01-02T00:00:00Z",
+        )
+        self.project.members.add(self.user)
+
+    def create_task(self, task_status=TaskStatus.TODO):
+        return Task.objects.create(
+            project=self.project,
+            name="Task",
+            deadline="2024-01-02T00:00:00Z",
+            status=task_status,
+        )
+
+    def assertStored(self, task_count, done_task_count, progress):
+        self.project.refresh_from_db()
+        self.assertEqual(
+            (
+                self.project.task_count,
+                self.project.done_task_count,
+                self.project.progress,
+            ),
+            (task_count, done_task_count, progress),
+        )
+
+    def test_counts_follow_task_create_status_change_and_delete(self):
+        """タスクの作成・状態変更・削除で保存済みの進捗率が更新されること"""
+        task1 = self.create_task()
+        self.create_task(TaskStatus.DONE)
+        task3 = self.create_task()
+        self.assertStored(3, 1, 33)
+
+        task1.status = TaskStatus.DONE
+        task1.save()
+        task1.save()
+        self.assertStored(3, 2, 66)
+
+        task1.status = TaskStatus.IN_REVIEW
+        task1.save()
+        self.assertStored(3, 1, 33)
+
+        task3.delete()
+        self.assertStored(2, 1, 50)
+
+        Task.objects.filter(project=self.project).delete()
+        self.assertStored(0, 0, 0)
+
+    def test_reads_do_not_query_tasks(self):
+        """プロジェクトの一覧・詳細取得でタスクテーブルを参照しないこと"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.create_task(TaskStatus.DONE)
+        self.create_task()
+
+        with CaptureQueriesContext(connection) as queries:
+            list_response = self.client.get(reverse("project-list"))
+            detail_response = self.client.get(
+                reverse("project-detail", args=[self.project.project_id])
+            )
+
+        self.assertEqual(list_response.data["projects"][0]["progress"], 50)
+        self.assertEqual(detail_response.data["progress"], 50)
+        self.assertFalse(
+            any(Task._meta.db_table in query["sql"] for query in queries)
+        )
+
+    def test_project_update_keeps_counts(self):
+        """プロジェクト更新で保存済みのタスク数が上書きされないこと"""
+        stale = Project.objects.get(pk=self.project.pk)
+        self.create_task(TaskStatus.DONE)
+
+        from .serializers import ProjectCreateSerializer
+
+        serializer = ProjectCreateSerializer(
+            stale, data={"title": "Renamed"}, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.assertStored(1, 1, 100)
+
+    def test_rebuild_command_repairs_drift(self):
+        """rebuild_project_progressコマンドでタスクから再計算されること"""
+        from django.core.management import call_command
+        from io import StringIO
+
+        self.create_task(TaskStatus.DONE)
+        self.create_task()
+        Project.objects.filter(pk=self.project.pk).update(
+            task_count=7, done_task_count=7, progress=100
+        )
+
+        call_command("rebuild_project_progress", stdout=StringIO())
+
+        self.assertStored(2, 1, 50)
+
+
+@override_settings(MEMBERSHIP_CACHE_TTL=300)
+class ProjectMembershipCacheTest(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="member", email="member@example.com", password="password"
+        )
+        self.other = User.objects.create_user(
+            username="other", email="other@example.com", password="password"
+        )
+        self.project = Project.objects.create(
+            title="Cached",
+            start_date="2024-01-01T00:00:00Z",
+            deadline="2024-01-02T00:00:00Z",
+        )
+        self.project.members.set([self.user])
+        self.client.force_authenticate(user=self.user)
+        self.tasks_url = f"/api/projects/{self.project.project_id}/tasks/"
+
+    def membership_queries(self, queries):
+        table = Project.members.through._meta.db_table
+        return [query for query in queries if table in query["sql"]]
+
+    def test_repeat_requests_skip_membership_query(self):
+        """同じユーザーの2回目以降のリクエストでメンバー判定のクエリが走らないこと"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as first:
+            self.assertEqual(self.client.get(self.tasks_url).status_code, 200)
+        with CaptureQueriesContext(connection) as second:
+            self.assertEqual(self.client.get(self.tasks_url).status_code, 200)
+            self.assertEqual(
+                self.client.get(
+                    f"/api/projects/{self.project.project_id}/events/"
+                ).status_code,
+                200,
+            )
+
+        self.assertEqual(len(self.membership_queries(first)), 1)
+        self.assertEqual(self.membership_queries(second), [])
+
+    def test_member_changes_invalidate_cache(self):
+        """メンバーの追加・削除がキャッシュ済みの判定に即座に反映されること"""
+        self.assertEqual(self.client.get(self.tasks_url).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.members.remove(self.user)
+        self.assertEqual(self.client.get(self.tasks_url).status_code, 403)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.project_set.add(self.project)
+        self.assertEqual(self.client.get(self.tasks_url).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.members.clear()
+        self.assertEqual(self.client.get(self.tasks_url).status_code, 403)
+
+    def test_removed_member_loses_access_once_committed(self):
+        """メンバーから外されたユーザーのキャッシュがコミット時に破棄され、アクセスできなくなること"""
+        from django.core.cache import cache
+
+        self.project.members.add(self.other)
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.client.get(self.tasks_url).status_code, 200)
+
+        self.client.force_authenticate(user=self.user)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.patch(
+                f"/api/projects/{self.project.project_id}/",
+                {"members": [self.user.id]},
+                format="json",
+            )
+            self.assertEqual(response.status_code, 200)
+            # Not dropped before the removal is committed
+            self.assertIsNotNone(cache.get(f"project-membership:{self.other.pk}"))
+
+        for callback in callbacks:
+            callback()
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.client.get(self.tasks_url).status_code, 403)
+
+    def test_one_membership_lookup_per_request(self):
+        """1リクエスト内の複数のメンバー判定が1回のクエリで済むこと"""
+        from django.core.cache import cache
+        from django.test import RequestFactory
+
+        from .membership import is_project_member
+
+        request = RequestFactory().get("/")
+        request.user = self.user
+        with self.settings(MEMBERSHIP_CACHE_TTL=0):
+            with self.assertNumQueries(1):
+                self.assertTrue(is_project_member(request, self.project.pk))
+                self.assertTrue(is_project_member(request, str(self.project.pk)))
+                self.assertFalse(is_project_member(request, "not-a-uuid"))
+        self.assertIsNone(cache.get(f"project-membership:{self.user.pk}"))
@@ -6,6 +6,8 @@ from rest_framework.response import Response
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.views import APIView
 
+from backend.async_views import AsyncAPIView
+from .membership import is_project_member
 from .models import Project
 from .serializers import (
     ProjectResponseSerializer,
@@ -17,7 +19,7 @@ from .serializers import (
 User = get_user_model()
 
 
-class ProjectListCreateView(APIView):
+class ProjectListCreateView(AsyncAPIView):
     """GET /api/projects/ - プロジェクト一覧を取得
     POST /api/projects/ - 新しいプロジェクトを作成する
     """
@@ -27,16 +29,14 @@ class ProjectListCreateView(APIView):
     def _get_queryset_for_user(self):
         user = self.request.user
         if user.is_staff:
-            return (
-                Project.objects.prefetch_related("tasks").all().order_by("-start_date")
-            )
+            return Project.objects.prefetch_related("members").order_by("-start_date")
         return (
-            Project.objects.prefetch_related("tasks")
-            .filter(members=user)
+            Project.objects.filter(members=user)
+            .prefetch_related("members")
             .order_by("-start_date")
         )
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         try:
             page = int(
                 request.query_params.get("p", request.query_params.get("page", "1"))
@@ -57,7 +57,7 @@ class ProjectListCreateView(APIView):
         queryset = self._get_queryset_for_user().order_by("-start_date")
         start = (page - 1) * per_page
         end = start + per_page
-        projects = list(queryset[start:end])
+        projects = [project async for project in queryset[start:end]]
 
         serializer = ProjectListSerializer(projects, many=True)
         return Response(
@@ -85,13 +85,13 @@ class ProjectDetailView(APIView):
 
     def _get_project(self, project_id: str) -> Project:
         project = get_object_or_404(
-            Project.objects.prefetch_related("members", "tasks"), project_id=project_id
+            Project.objects.prefetch_related("members"), project_id=project_id
         )
         return project
 
     def _assert_assigned_or_staff(self, project: Project):
         user = self.request.user
-        if not (project.members.filter(pk=user.pk).exists() or user.is_staff):
+        if not (user.is_staff or is_project_member(self.request, project.pk)):
             raise PermissionDenied("You are not assigned to this project.")
             raise PermissionDenied("You are not assigned to this project.")
 
@@ -0,0 +1,266 @@
+"""
+Batched task creates, updates and deletes for the bulk endpoint.
+
+bulk_create/bulk_update send no model signals, so what the receivers in
+tasks.signals, projects.signals and notifications.signals do per task is done
+here once per batch: project task counts, tombstones, the schedule cache,
+board changes, and one notification per recipient instead of one per task.
+Deletes run through Django's collector with the TaskBatch as origin; the
+post_delete receivers skip objects deleted that way.
+"""
+
+from django.db import router, transaction
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from notifications.dispatch import enqueue
+from notifications.signals import notify_task_batch
+from projects import board
+from projects.progress import adjust_task_counts
+from .models import Task, TaskAssignedUser, TaskRelation, TaskStatus, TaskTombstone
+from .schedule import invalidate_schedule
+
+
+def deleted_in_batch(origin):
+    return isinstance(origin, TaskBatch)
+
+
+class TaskBatch:
+    """
+    Changes to the tasks of one project, written in a single transaction
+
+    Args:
+        project: Project all tasks belong to
+        actor: User making the changes; excluded from the notifications
+    """
+
+    def __init__(self, project, actor):
+        self.project = project
+        self.actor = actor
+        self.now = timezone.now()
+        self.total_delta = 0
+        self.done_delta = 0
+        self.board_changes = {}
+        self.notifications = []
+
+    def apply(self, creates=(), updates=(), deletes=()):
+        """
+        Write the batch; the arguments are validated TaskBulkSerializer data
+
+        Args:
+            creates: Dicts of task fields plus assigned_user_ids and
+                parent_relations ({parent_id: relation_type})
+            updates: (task, data) pairs of the tasks, locked with
+                select_for_update by the caller's transaction, and the fields
+                to change, optionally with assigned_user_ids/parent_relations
+            deletes: Loaded tasks to delete
+
+        Returns:
+            (created, updated): lists of Task objects
+        """
+        with transaction.atomic():
+            self._delete(deletes)
+            created = self._create(creates)
+            updated = self._update(updates)
+
+            adjust_task_counts(
+                self.project.pk,
+                total_delta=self.total_delta,
+                done_delta=self.done_delta,
+            )
+            invalidate_schedule(self.project.pk)
+            board.publish_many(self.project.pk, list(self.board_changes.values()))
+            if self.notifications:
+                enqueue(notify_task_batch, self.project, self.notifications, self.actor)
+        return created, updated
+
+    def _board_change(self, task, op, fields=()):
+        change = board.build_change("task", op, task.pk, task, fields)
+        self.board_changes[task.pk] = change
+        return change
+
+    def _delete(self, tasks):
+        if not tasks:
+            return
+        TaskTombstone.objects.bulk_create(
+            TaskTombstone(
+                project_id=self.project.pk,
+                kind=TaskTombstone.Kind.TASK,
+                object_id=str(task.pk),
+            )
+            for task in tasks
+        )
+        for task in tasks:
+            self.total_delta -= 1
+            self.done_delta -= task.status == TaskStatus.DONE
+            self._board_change(task, "deleted")
+        self._collect_delete(tasks)
+
+    def _collect_delete(self, objs):
+        collector = Collector(using=router.db_for_write(type(objs[0])), origin=self)
+        collector.collect(objs)
+        collector.delete()
+
+    def _create(self, items):
+        if not items:
+            return []
+        tasks = []
+        assignments = []
+        relations = []
+        for data in items:
+            data = dict(data)
+            user_ids = data.pop("assigned_user_ids", [])
+            parent_relations = data.pop("parent_relations", {})
+            task = Task(project=self.project, **data)
+            tasks.append(task)
+            assignments.extend(
+                TaskAssignedUser(task=task, user_id=user_id) for user_id in user_ids
+            )
+            relations.extend(
+                TaskRelation(
+                    parent_task_id=parent_id,
+                    child_task=task,
+                    relation_type=relation_type,
+                )
+                for parent_id, relation_type in parent_relations.items()
+            )
+
+            self.total_delta += 1
+            self.done_delta += task.status == TaskStatus.DONE
+            change = self._board_change(task, "created", board.TASK_FIELDS)
+            self.notifications.append((task, "created", None))
+            if user_ids:
+                change["fields"]["assigned_user_ids"] = sorted(user_ids)
+                self.notifications.append((task, "assigned", set(user_ids)))
+
+        Task.objects.bulk_create(tasks)
+        TaskAssignedUser.objects.bulk_create(assignments)
+        TaskRelation.objects.bulk_create(relations)
+        return tasks
+
+    def _update(self, items):
+        if not items:
+            return []
+        # Each task only writes the columns its item changes, so a field
+        # edited in one item never overwrites it in another with the loaded
+        # value; one bulk_update per distinct set of fields
+        by_fields = {}
+        for task, data in items:
+            fields = {"updated_at"}
+            for name, value in data.items():
+                if name not in ("assigned_user_ids", "parent_relations"):
+                    setattr(task, name, value)
+                    fields.add(name)
+            task.updated_at = self.now
+            by_fields.setdefault(tuple(sorted(fields)), []).append(task)
+
+            changed = task.changed_fields(board.TASK_FIELDS)
+            if changed:
+                self._board_change(task, "updated", changed)
+
+            if task._old_status != task.status:
+                if task.status == TaskStatus.DONE:
+                    self.done_delta += 1
+                    action = "completed"
+                else:
+                    self.done_delta -= task._old_status == TaskStatus.DONE
+                    action = "status_changed"
+                self.notifications.append((task, action, None))
+                task._old_status = task.status
+
+        for fields, tasks in by_fields.items():
+            Task.objects.bulk_update(tasks, fields)
+        self._replace_assignees(
+            [
+                (task, data["assigned_user_ids"])
+                for task, data in items
+                if "assigned_user_ids" in data
+            ]
+        )
+        self._replace_parents(
+            [
+                (task, data["parent_relations"])
+                for task, data in items
+                if "parent_relations" in data
+            ]
+        )
+        return [task for task, _ in items]
+
+    def _replace_assignees(self, items):
+        if not items:
+            return
+        current = {}
+        for pk, task_id, user_id in TaskAssignedUser.objects.filter(
+            task__in=[task for task, _ in items]
+        ).values_list("pk", "task_id", "user_id"):
+            current.setdefault(task_id, {})[user_id] = pk
+
+        removed = []
+        added = []
+        for task, user_ids in items:
+            assigned = current.get(task.pk, {})
+            user_ids = set(user_ids)
+            removed.extend(
+                pk for user_id, pk in assigned.items() if user_id not in user_ids
+            )
+            new_ids = user_ids - assigned.keys()
+            added.extend(
+                TaskAssignedUser(task=task, user_id=user_id) for user_id in new_ids
+            )
+            if new_ids:
+                self.notifications.append((task, "assigned", new_ids))
+            if user_ids != assigned.keys():
+                change = self.board_changes.get(task.pk) or self._board_change(
+                    task, "updated"
+                )
+                change["fields"]["assigned_user_ids"] = sorted(user_ids)
+
+        if removed:
+            TaskAssignedUser.objects.filter(pk__in=removed).delete()
+        TaskAssignedUser.objects.bulk_create(added)
+
+    def _replace_parents(self, items):
+        if not items:
+            return
+        current = {}
+        for relation in TaskRelation.objects.filter(
+            child_task__in=[task for task, _ in items]
+        ):
+            parents = current.setdefault(relation.child_task_id, {})
+            parents[relation.parent_task_id] = relation
+
+        removed = []
+        changed = []
+        added = []
+        for task, parent_relations in items:
+            existing = current.get(task.pk, {})
+            for parent_id, relation in existing.items():
+                relation_type = parent_relations.get(parent_id)
+                if relation_type is None:
+                    removed.append(relation)
+                elif relation_type != relation.relation_type:
+                    relation.relation_type = relation_type
+                    relation.updated_at = self.now
+                    changed.append(relation)
+            added.extend(
+                TaskRelation(
+                    parent_task_id=parent_id,
+                    child_task=task,
+                    relation_type=relation_type,
+                )
+                for parent_id, relation_type in parent_relations.items()
+                if parent_id not in existing
+            )
+
+        if removed:
+            TaskTombstone.objects.bulk_create(
+                TaskTombstone(
+                    project_id=self.project.pk,
+                    kind=TaskTombstone.Kind.RELATION,
+                    object_id=str(relation.pk),
+                )
+                for relation in removed
+            )
+            self._collect_delete(removed)
+        TaskRelation.objects.bulk_update(changed, ["relation_type", "updated_at"])
+        TaskRelation.objects.bulk_create(added)
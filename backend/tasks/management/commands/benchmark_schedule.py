@@ -0,0 +1,92 @@
+import random
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from projects.models import Project
+from tasks.models import Task, TaskRelation, TaskRelationType
+from tasks.schedule import (
+    compute_schedule,
+    get_project_schedule,
+    load_graph,
+    serialize_schedule,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time loading a project's dependency graph and computing its critical "
+        "path schedule for several task counts, cold and cached. Every task "
+        "gets up to --max-parents random earlier tasks as parents. Data is "
+        "rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+        parser.add_argument("--max-parents", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        for size in options["sizes"]:
+            with transaction.atomic():
+                project = self._populate(size, options["max_parents"], rng)
+                self._measure(project, size)
+                transaction.set_rollback(True)
+            cache.clear()
+
+    def _populate(self, size, max_parents, rng):
+        now = timezone.now()
+        project = Project.objects.create(
+            title="Schedule benchmark", start_date=now, deadline=now
+        )
+        tasks = Task.objects.bulk_create(
+            Task(
+                project=project,
+                name=f"Task {i}",
+                start_date=now,
+                deadline=now + timezone.timedelta(hours=rng.randint(1, 72)),
+            )
+            for i in range(size)
+        )
+        relation_types = list(TaskRelationType)
+        relations = []
+        for i, child in enumerate(tasks[1:], start=1):
+            for parent in rng.sample(tasks[:i], min(i, rng.randint(1, max_parents))):
+                relations.append(
+                    TaskRelation(
+                        parent_task=parent,
+                        child_task=child,
+                        relation_type=rng.choice(relation_types),
+                    )
+                )
+        TaskRelation.objects.bulk_create(relations, batch_size=5000)
+        return project
+
+    def _measure(self, project, size):
+        with CaptureQueriesContext(connection) as queries:
+            began = time.perf_counter()
+            graph = load_graph(project)
+            loaded = time.perf_counter()
+        schedule = compute_schedule(*graph)
+        computed = time.perf_counter()
+        serialize_schedule(schedule)
+        serialized = time.perf_counter()
+
+        get_project_schedule(project)
+        began_cached = time.perf_counter()
+        get_project_schedule(project)
+        cached = time.perf_counter()
+
+        self.stdout.write(
+            f"{size:>6} tasks, {len(graph[1]):>6} relations: "
+            f"load {(loaded - began) * 1000:7.1f} ms ({len(queries)} query), "
+            f"compute {(computed - loaded) * 1000:7.1f} ms, "
+            f"serialize {(serialized - computed) * 1000:7.1f} ms, "
+            f"cached {(cached - began_cached) * 1000:6.2f} ms, "
+            f"critical path {len(schedule['critical_path'])} tasks"
+        )
@@ -0,0 +1,75 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from projects.models import Project
+from tasks.models import Task, TaskAssignedUser, TaskComment, TaskRelation
+from tasks.serializers import TaskResponseSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Time serializing a project's full task list (as TaskListCreateView "
+        "does) for several task counts. Data is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes", type=int, nargs="+", default=[1000, 10000]
+        )
+        parser.add_argument("--comments-per-task", type=int, default=2)
+
+    def handle(self, *args, **options):
+        for size in options["sizes"]:
+            with transaction.atomic():
+                project = self._populate(size, options["comments_per_task"])
+                self._measure(project, size)
+                transaction.set_rollback(True)
+
+    def _populate(self, size, comments_per_task):
+        user = get_user_model().objects.create_user(
+            username=f"task-benchmark-{size}", password="unused"
+        )
+        project = Project.objects.create(
+            title="Task list benchmark",
+            start_date=timezone.now(),
+            deadline=timezone.now(),
+        )
+        project.members.add(user)
+
+        deadline = timezone.now() + timezone.timedelta(days=30)
+        tasks = Task.objects.bulk_create(
+            Task(project=project, name=f"Task {i}", deadline=deadline)
+            for i in range(size)
+        )
+        TaskAssignedUser.objects.bulk_create(
+            TaskAssignedUser(task=task, user=user) for task in tasks
+        )
+        TaskRelation.objects.bulk_create(
+            TaskRelation(parent_task=parent, child_task=child, relation_type="FtS")
+            for parent, child in zip(tasks, tasks[1:])
+        )
+        TaskComment.objects.bulk_create(
+            TaskComment(task=task, user=user, content=f"comment {n}")
+            for task in tasks
+            for n in range(comments_per_task)
+        )
+        return project
+
+    def _measure(self, project, size):
+        queryset = TaskResponseSerializer.setup_eager_loading(
+            Task.objects.filter(project=project).order_by("deadline")
+        )
+        with CaptureQueriesContext(connection) as queries:
+            began = time.perf_counter()
+            data = TaskResponseSerializer(queryset, many=True).data
+            elapsed = time.perf_counter() - began
+
+        assert len(data) == size
+        self.stdout.write(
+            f"{size:>6} tasks: {elapsed * 1000:8.1f} ms, {len(queries)} queries"
+        )
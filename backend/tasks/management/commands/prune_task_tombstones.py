@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tasks.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete task sync tombstones older than the sync retention period."
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} tombstone(s)."))
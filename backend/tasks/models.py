@@ -4,6 +4,8 @@ from django.conf import settings
 from django.db.models import Q, CheckConstraint
 from django.utils import timezone
 
+from backend.change_tracking import LoadedValuesMixin
+
 
 class TaskStatus(models.TextChoices):
     TODO = "todo", "Todo"
@@ -20,7 +22,7 @@ class TaskPriority(models.TextChoices):
     HIGH = "high", "High"
 
 
-class Task(models.Model):
+class Task(LoadedValuesMixin, models.Model):
     task_id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     project = models.ForeignKey(
         "projects.Project", on_delete=models.CASCADE, related_name="tasks"
@@ -42,14 +44,27 @@ class Task(models.Model):
         settings.AUTH_USER_MODEL, through="TaskAssignedUser", related_name="tasks"
     )
 
+    # Change tracking for the sync endpoint. QuerySet.update() does not touch
+    # auto_now fields, so bulk updates must set updated_at themselves.
+    updated_at = models.DateTimeField(auto_now=True)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._old_status = self.status
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # post_save receivers have seen the previous status by now
+        self._old_status = self.status
+
     def __str__(self):
         return self.name
 
     class Meta:
+        indexes = [
+            models.Index(fields=["project", "deadline"], name="task_project_deadline_idx"),
+            models.Index(fields=["project", "updated_at"], name="task_project_updated_idx"),
+        ]
         constraints = [
             CheckConstraint(
                 condition=Q(
@@ -92,6 +107,7 @@ class TaskRelation(models.Model):
         Task, on_delete=models.CASCADE, related_name="parents", null=True, blank=True
     )
     relation_type = models.CharField(max_length=20, choices=TaskRelationType.choices)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         unique_together = ("parent_task", "child_task")
@@ -124,6 +140,36 @@ class TaskComment(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"Comment by {self.user.username} on {self.task.name}"
+
+
+class TaskTombstone(models.Model):
+    """Record of a deleted task, relation or comment for the sync endpoint.
+
+    project_id is a plain UUID so the row outlives the objects it describes.
+    Relations and comments removed together with their task get no tombstone
+    of their own; the task's tombstone implies them.
+    """
+
+    class Kind(models.TextChoices):
+        TASK = "task", "Task"
+        RELATION = "relation", "Relation"
+        COMMENT = "comment", "Comment"
+
+    project_id = models.UUIDField()
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    object_id = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["project_id", "deleted_at"], name="task_tombstone_project_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} deleted at {self.deleted_at}"
@@ -1,22 +1,19 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Prefetch
 from rest_framework import serializers
-from .models import Task, TaskRelation, TaskRelationType, TaskComment
+from .models import Task, TaskAssignedUser, TaskRelation, TaskRelationType, TaskComment
+from .schedule import creates_cycle, invalidate_schedule, load_parent_map
 from django.contrib.auth import get_user_model
 
-User = get_user_model()
-
-
-class AssignedUserSerializer(serializers.ModelSerializer):
-    user_id = serializers.IntegerField(source="pk")
-    name = serializers.CharField(source="username")
-    email = serializers.EmailField()
-    profile_picture = serializers.SerializerMethodField()
+from api.serializers import UserSummarySerializer
+from api.summaries import UserSummaries, context_summaries
+from backend.representation import datetime_repr
 
-    class Meta:
-        model = User
-        fields = ["user_id", "name", "email", "profile_picture"]
+User = get_user_model()
 
-    def get_profile_picture(self, obj):
-        return obj.profile_picture.url if obj.profile_picture else None
+AssignedUserSerializer = UserSummarySerializer
 
 
 class TaskRelationInputSerializer(serializers.Serializer):
@@ -27,6 +24,53 @@ class TaskRelationInputSerializer(serializers.Serializer):
     )
 
 
+def _parent_relation_map(parent_tasks):
+    relations = {}
+    for rel in parent_tasks:
+        if rel["task_id"] in relations:
+            raise serializers.ValidationError(
+                {"parent_tasks": "Duplicate parent tasks are not allowed."}
+            )
+        relations[rel["task_id"]] = rel["relation_type"]
+    return relations
+
+
+def validate_parent_tasks(project, parent_tasks, task_id=None):
+    """
+    Check parent relations of a task in a fixed number of queries
+
+    All parents are resolved with one query. For an existing task
+    (``task_id``) the new parents are also checked for dependency cycles
+    against the project's dependency graph, loaded with load_parent_map, so
+    validate in the transaction that saves the task; a task being created
+    has no children yet and cannot close a cycle.
+
+    Returns:
+        {parent_task_id: relation_type}
+    """
+    relations = _parent_relation_map(parent_tasks)
+    if not relations:
+        return relations
+
+    found = set(
+        Task.objects.filter(project=project, task_id__in=relations).values_list(
+            "task_id", flat=True
+        )
+    )
+    if len(found) != len(relations):
+        raise serializers.ValidationError(
+            "Parent task does not exist or is not in the same project."
+        )
+
+    if task_id is not None and creates_cycle(
+        load_parent_map(project), task_id, relations
+    ):
+        raise serializers.ValidationError(
+            {"parent_tasks": "Parent tasks would create a dependency cycle."}
+        )
+    return relations
+
+
 class TaskCreateSerializer(serializers.ModelSerializer):
     assigned_user_ids = serializers.ListField(
         child=serializers.IntegerField(), write_only=True, required=False, default=list
@@ -89,17 +133,11 @@ class TaskCreateSerializer(serializers.ModelSerializer):
                 self.fail("not_in_project")
 
         # Validate parent tasks: exist and belong to the same project
-        for rel in parent_tasks:
-            try:
-                parent_task = Task.objects.get(task_id=rel["task_id"])
-            except Task.DoesNotExist:
-                self.fail("parent_task_not_found")
-            if parent_task.project_id != project.project_id:
-                self.fail("parent_task_not_found")
+        parent_relations = validate_parent_tasks(project, parent_tasks)
 
         # Attach resolved objects to attrs so create() can use them
         attrs["member_objects"] = users
-        attrs["parent_relations"] = parent_tasks
+        attrs["parent_relations"] = parent_relations
         return attrs
 
     def create(self, validated_data):
@@ -109,23 +147,27 @@ class TaskCreateSerializer(serializers.ModelSerializer):
         validated_data.pop("parent_tasks", None)
         project = self.context["project"]
 
-        # Create the task
-        task = Task.objects.create(project=project, **validated_data)
-
-        # Attach assigned users
-        if users:
-            task.assigned_users.set(users)
-
-        # Create TaskRelation entries
-        for relation in parent_tasks:
-            parent_task = Task.objects.get(task_id=relation["task_id"])
-            TaskRelation.objects.create(
-                parent_task=parent_task,
-                child_task=task,
-                relation_type=relation["relation_type"],
-            )
+        with transaction.atomic():
+            # Create the task
+            task = Task.objects.create(project=project, **validated_data)
+
+            # Attach assigned users
+            if users:
+                task.assigned_users.set(users)
+
+            # Create TaskRelation entries
+            if parent_tasks:
+                TaskRelation.objects.bulk_create(
+                    TaskRelation(
+                        parent_task_id=parent_id,
+                        child_task=task,
+                        relation_type=relation_type,
+                    )
+                    for parent_id, relation_type in parent_tasks.items()
+                )
+                # bulk_create sends no post_save
+                invalidate_schedule(project.pk)
 
-        task.refresh_from_db()
         return task
 
 
@@ -144,7 +186,7 @@ class TaskCommentCreateSerializer(serializers.ModelSerializer):
 
 
 class TaskCommentResponseSerializer(serializers.ModelSerializer):
-    task_id = serializers.UUIDField(source="task.task_id", read_only=True)
+    task_id = serializers.UUIDField(read_only=True)
     user_id = serializers.IntegerField(source="user.pk", read_only=True)
     name = serializers.CharField(source="user.username", read_only=True)
     email = serializers.EmailField(source="user.email", read_only=True)
@@ -164,7 +206,7 @@ class TaskCommentResponseSerializer(serializers.ModelSerializer):
         ]
 
     def get_profile_picture(self, obj):
-        return obj.user.profile_picture.url if obj.user.profile_picture else None
+        return context_summaries(self.context).get(obj.user)["profile_picture"]
 
 
 class TaskCommentListSerializer(serializers.ModelSerializer):
@@ -175,20 +217,17 @@ class TaskCommentListSerializer(serializers.ModelSerializer):
         fields = ["comment_id", "user_id", "content", "created_at", "user"]
 
     def get_user(self, obj):
-        return {
-            "user_id": obj.user.pk,
-            "name": obj.user.username,
-            "email": obj.user.email,
-            "profile_picture": obj.user.profile_picture.url
-            if obj.user.profile_picture
-            else None,
-        }
+        return context_summaries(self.context).get(obj.user)
 
 
 class TaskUpdateSerializer(serializers.ModelSerializer):
     assigned_user_ids = serializers.ListField(
         child=serializers.IntegerField(), write_only=True, required=False
     )
+    # Replaces all parent relations of the task when given
+    parent_tasks = TaskRelationInputSerializer(
+        many=True, write_only=True, required=False
+    )
 
     class Meta:
         model = Task
@@ -200,6 +239,7 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
             "priority",
             "status",
             "assigned_user_ids",
+            "parent_tasks",
         ]
         extra_kwargs = {
             "name": {"required": False},
@@ -215,6 +255,11 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
     def validate(self, attrs):
         project = self.context["project"]
 
+        if "parent_tasks" in attrs:
+            attrs["parent_relations"] = validate_parent_tasks(
+                project, attrs.pop("parent_tasks"), task_id=self.instance.pk
+            )
+
         # Only process assigned_user_ids if present in attrs
         if "assigned_user_ids" not in attrs:
             # Do not touch member_objects
@@ -254,19 +299,240 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         member_objects = validated_data.pop("member_objects", None)
-        if member_objects is not None:
-            instance.assigned_users.set(member_objects)
-        for field, value in validated_data.items():
-            setattr(instance, field, value)
-        instance.save()
+        parent_relations = validated_data.pop("parent_relations", None)
+        validated_data.pop("assigned_user_ids", None)
+        with transaction.atomic():
+            if member_objects is not None:
+                instance.assigned_users.set(member_objects)
+            if parent_relations is not None:
+                self._replace_parents(instance, parent_relations)
+            for field, value in validated_data.items():
+                setattr(instance, field, value)
+            instance.save()
         return instance
 
+    def _replace_parents(self, instance, parent_relations):
+        existing = {
+            relation.parent_task_id: relation for relation in instance.parents.all()
+        }
+        removed = [pk for pk in existing if pk not in parent_relations]
+        if removed:
+            instance.parents.filter(parent_task_id__in=removed).delete()
+        for parent_id, relation_type in parent_relations.items():
+            relation = existing.get(parent_id)
+            if relation is not None and relation.relation_type != relation_type:
+                relation.relation_type = relation_type
+                relation.save(update_fields=["relation_type", "updated_at"])
+        added = [pk for pk in parent_relations if pk not in existing]
+        if added:
+            TaskRelation.objects.bulk_create(
+                TaskRelation(
+                    parent_task_id=parent_id,
+                    child_task=instance,
+                    relation_type=parent_relations[parent_id],
+                )
+                for parent_id in added
+            )
+            # bulk_create sends no post_save
+            invalidate_schedule(instance.project_id)
+
+
+BULK_MAX_ITEMS = 500
+
+
+class TaskBulkCreateSerializer(serializers.ModelSerializer):
+    """One task to create in a bulk request.
+
+    Only the item itself is validated here; users and parent tasks are
+    checked for all items at once by TaskBulkSerializer.
+    """
+
+    assigned_user_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, default=list
+    )
+    parent_tasks = TaskRelationInputSerializer(many=True, required=False, default=list)
+
+    class Meta:
+        model = Task
+        fields = [
+            "name",
+            "description",
+            "start_date",
+            "deadline",
+            "priority",
+            "status",
+            "assigned_user_ids",
+            "parent_tasks",
+        ]
+
+    def validate(self, attrs):
+        user_ids = attrs.get("assigned_user_ids")
+        if user_ids is not None and len(set(user_ids)) != len(user_ids):
+            raise serializers.ValidationError(
+                {"assigned_user_ids": "Duplicate IDs are not allowed."}
+            )
+        if "parent_tasks" in attrs:
+            attrs["parent_relations"] = _parent_relation_map(attrs.pop("parent_tasks"))
+        return attrs
+
+
+class TaskBulkUpdateSerializer(TaskBulkCreateSerializer):
+    """Changes to one task in a bulk request; omitted fields are left alone"""
+
+    task_id = serializers.UUIDField()
+    assigned_user_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False
+    )
+    parent_tasks = TaskRelationInputSerializer(many=True, required=False)
+
+    class Meta(TaskBulkCreateSerializer.Meta):
+        fields = ["task_id", *TaskBulkCreateSerializer.Meta.fields]
+        extra_kwargs = {
+            "name": {"required": False},
+            "deadline": {"required": False},
+        }
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    """Creates, updates and deletes for TaskBulkView.
+
+    All references are resolved with a fixed number of queries whatever the
+    size of the batch: one for the tasks to update or delete, one for the
+    assigned users, one for the remaining parent tasks, plus the dependency
+    graph (load_parent_map) when parents of existing tasks change. Validate
+    in the transaction that applies the batch. Errors are reported per item,
+    by list index, like a nested list serializer does.
+
+    validated_data: "create" is a list of task dicts, "update" a list of
+    (task, changes) pairs and "delete" a list of tasks.
+    """
+
+    create = TaskBulkCreateSerializer(
+        many=True, required=False, default=list, max_length=BULK_MAX_ITEMS
+    )
+    update = TaskBulkUpdateSerializer(
+        many=True, required=False, default=list, max_length=BULK_MAX_ITEMS
+    )
+    delete = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        default=list,
+        max_length=BULK_MAX_ITEMS,
+    )
+
+    default_error_messages = {
+        "task_not_found": "Task does not exist or is not in the same project.",
+        "not_in_project": "All assigned users must be assigned to the project.",
+        "parent_task_not_found": "Parent task does not exist or is not in the same project.",
+        "cycle": "Parent tasks would create a dependency cycle.",
+    }
+
+    def validate(self, attrs):
+        project = self.context["project"]
+        creates, updates, deletes = attrs["create"], attrs["update"], attrs["delete"]
+
+        update_ids = [item["task_id"] for item in updates]
+        if len(set(update_ids)) != len(update_ids):
+            raise serializers.ValidationError(
+                {"update": "Each task can only be updated once per request."}
+            )
+        delete_ids = set(deletes)
+        if len(delete_ids) != len(deletes):
+            raise serializers.ValidationError(
+                {"delete": "Duplicate IDs are not allowed."}
+            )
+        if delete_ids.intersection(update_ids):
+            raise serializers.ValidationError(
+                {"update": "A task cannot be updated and deleted in one request."}
+            )
+
+        # Locked until the batch is written, so the values updates start from
+        # (and the status change counted for the project) stay current
+        tasks = (
+            Task.objects.select_for_update()
+            .filter(project=project)
+            .in_bulk([*update_ids, *deletes])
+        )
+        missing = {
+            i: [self.error_messages["task_not_found"]]
+            for i, task_id in enumerate(deletes)
+            if task_id not in tasks
+        }
+        if missing:
+            raise serializers.ValidationError({"delete": missing})
+
+        user_ids = set()
+        parent_ids = set()
+        for item in (*creates, *updates):
+            user_ids.update(item.get("assigned_user_ids", ()))
+            parent_ids.update(item.get("parent_relations", ()))
+        if user_ids:
+            user_ids = set(
+                project.members.filter(pk__in=user_ids).values_list("pk", flat=True)
+            )
+        unknown_parents = parent_ids - tasks.keys()
+        if unknown_parents:
+            parent_ids = (parent_ids & tasks.keys()) | set(
+                Task.objects.filter(
+                    project=project, task_id__in=unknown_parents
+                ).values_list("task_id", flat=True)
+            )
+        parent_ids -= delete_ids
+
+        graph = None
+        if any("parent_relations" in item for item in updates):
+            # Dependency graph as it will be after the deletes, updated item
+            # by item so cycles across several updated tasks are caught too
+            graph = {
+                task_id: [parent for parent in parents if parent not in delete_ids]
+                for task_id, parents in load_parent_map(project).items()
+                if task_id not in delete_ids
+            }
+
+        def check(item, task_id=None):
+            errors = {}
+            if not user_ids.issuperset(item.get("assigned_user_ids", ())):
+                errors["assigned_user_ids"] = self.error_messages["not_in_project"]
+            relations = item.get("parent_relations")
+            if relations is not None:
+                if not parent_ids.issuperset(relations):
+                    errors["parent_tasks"] = self.error_messages[
+                        "parent_task_not_found"
+                    ]
+                elif task_id is not None:
+                    if creates_cycle(graph, task_id, relations):
+                        errors["parent_tasks"] = self.error_messages["cycle"]
+                    else:
+                        graph[task_id] = list(relations)
+            return errors
+
+        create_errors = [check(item) for item in creates]
+        update_errors = [
+            check(item, item["task_id"])
+            if item["task_id"] in tasks
+            else {"task_id": self.error_messages["task_not_found"]}
+            for item in updates
+        ]
+        errors = {}
+        if any(create_errors):
+            errors["create"] = create_errors
+        if any(update_errors):
+            errors["update"] = update_errors
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        attrs["update"] = [(tasks[item.pop("task_id")], item) for item in updates]
+        attrs["delete"] = [tasks[task_id] for task_id in deletes]
+        return attrs
+
 
 class TaskResponseSerializer(serializers.ModelSerializer):
-    project_id = serializers.UUIDField(source="project.project_id", read_only=True)
+    project_id = serializers.UUIDField(read_only=True)
     users = AssignedUserSerializer(many=True, source="assigned_users", read_only=True)
     parent_tasks = serializers.SerializerMethodField()
-    comments = serializers.SerializerMethodField()
+    # A declared nested field is bound once per list; constructing a new
+    # serializer in a method field rebuilt its fields for every task.
+    comments = TaskCommentResponseSerializer(many=True, read_only=True)
 
     class Meta:
         model = Task
@@ -284,17 +550,154 @@ class TaskResponseSerializer(serializers.ModelSerializer):
             "comments",
         ]
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """
+        Prefetch everything the serializer reads, so serializing any number of
+        tasks costs a fixed number of queries. The nested fields below only use
+        .all() on the related managers and therefore reuse these prefetches.
+        """
+        return queryset.prefetch_related(
+            Prefetch("assigned_users", queryset=User.objects.order_by("pk")),
+            Prefetch("parents", queryset=TaskRelation.objects.order_by("pk")),
+            Prefetch(
+                "comments",
+                queryset=TaskComment.objects.select_related("user").order_by(
+                    "created_at", "pk"
+                ),
+            ),
+        )
+
     def get_parent_tasks(self, obj: Task) -> list[dict]:
         # related_name='parents' is on the child_task side, so we can iterate over obj.parents.all()
-        relations = obj.parents.select_related("parent_task").all()
         return [
             {
-                "task_id": str(rel.parent_task.task_id),
+                "task_id": str(rel.parent_task_id),
                 "relation_type": rel.relation_type,
             }
-            for rel in relations
+            for rel in obj.parents.all()
         ]
 
-    def get_comments(self, obj: Task) -> list[dict]:
-        comments = obj.comments.select_related("user").all()
-        return TaskCommentResponseSerializer(comments, many=True).data
+
+TASK_VALUES = (
+    "task_id",
+    "project_id",
+    "name",
+    "description",
+    "start_date",
+    "deadline",
+    "priority",
+    "status",
+)
+
+
+def serialize_task_rows(rows):
+    """
+    TaskResponseSerializer(many=True).data for tasks given as
+    .values(*TASK_VALUES) rows, without model instances or DRF fields
+
+    Users, parents and comments are loaded with one query each, in the
+    order setup_eager_loading prefetches them.
+    """
+    task_ids = [row["task_id"] for row in rows]
+    users = defaultdict(list)
+    parents = defaultdict(list)
+    comments = defaultdict(list)
+    if task_ids:
+        assignments = list(
+            TaskAssignedUser.objects.filter(task_id__in=task_ids)
+            .order_by("user_id")
+            .values_list("task_id", "user_id")
+        )
+        comment_rows = list(
+            TaskComment.objects.filter(task_id__in=task_ids)
+            .order_by("created_at", "pk")
+            .values_list("comment_id", "task_id", "user_id", "content", "created_at")
+        )
+        summaries = UserSummaries().get_many(
+            [user_id for _, user_id in assignments]
+            + [row[2] for row in comment_rows]
+        )
+
+        for task_id, user_id in assignments:
+            users[task_id].append(dict(summaries[user_id]))
+        for child_id, parent_id, relation_type in (
+            TaskRelation.objects.filter(child_task_id__in=task_ids)
+            .order_by("pk")
+            .values_list("child_task_id", "parent_task_id", "relation_type")
+        ):
+            parents[child_id].append(
+                {"task_id": str(parent_id), "relation_type": relation_type}
+            )
+        for comment_id, task_id, user_id, content, created_at in comment_rows:
+            user = summaries[user_id]
+            comments[task_id].append(
+                {
+                    "comment_id": str(comment_id),
+                    "task_id": str(task_id),
+                    "user_id": user["user_id"],
+                    "name": user["name"],
+                    "email": user["email"],
+                    "profile_picture": user["profile_picture"],
+                    "content": content,
+                    "created_at": datetime_repr(created_at),
+                }
+            )
+
+    return [
+        {
+            "task_id": str(row["task_id"]),
+            "project_id": str(row["project_id"]),
+            "name": row["name"],
+            "description": row["description"],
+            "start_date": datetime_repr(row["start_date"]),
+            "deadline": datetime_repr(row["deadline"]),
+            "priority": row["priority"],
+            "status": row["status"],
+            "users": users[row["task_id"]],
+            "parent_tasks": parents[row["task_id"]],
+            "comments": comments[row["task_id"]],
+        }
+        for row in rows
+    ]
+
+
+class TaskSyncSerializer(serializers.ModelSerializer):
+    project_id = serializers.UUIDField(read_only=True)
+    users = AssignedUserSerializer(many=True, source="assigned_users", read_only=True)
+
+    class Meta:
+        model = Task
+        fields = [
+            "task_id",
+            "project_id",
+            "name",
+            "description",
+            "start_date",
+            "deadline",
+            "priority",
+            "status",
+            "users",
+            "updated_at",
+        ]
+
+
+class TaskRelationSyncSerializer(serializers.ModelSerializer):
+    relation_id = serializers.IntegerField(source="pk", read_only=True)
+    parent_task_id = serializers.UUIDField(read_only=True)
+    child_task_id = serializers.UUIDField(read_only=True)
+
+    class Meta:
+        model = TaskRelation
+        fields = [
+            "relation_id",
+            "parent_task_id",
+            "child_task_id",
+            "relation_type",
+            "updated_at",
+        ]
+
+
+class TaskCommentSyncSerializer(TaskCommentResponseSerializer):
+    class Meta(TaskCommentResponseSerializer.Meta):
+        fields = TaskCommentResponseSerializer.Meta.fields + ["updated_at"]
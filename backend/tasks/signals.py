@@ -0,0 +1,87 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from projects.models import Project
+from .bulk import deleted_in_batch
+from .models import Task, TaskComment, TaskRelation, TaskTombstone
+from .schedule import invalidate_schedule
+
+
+def _deleted_with(origin, model):
+    return isinstance(origin, model) or getattr(origin, "model", None) is model
+
+
+def _skip_delete(origin, *models):
+    # The project/task being deleted or the TaskBatch takes care of it
+    return deleted_in_batch(origin) or any(_deleted_with(origin, m) for m in models)
+
+
+def _project_id_of_task(task_id):
+    return (
+        Task.objects.filter(pk=task_id).values_list("project_id", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Task)
+def handle_task_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_schedule(instance.project_id)
+
+
+@receiver(post_delete, sender=Task)
+def record_task_delete(sender, instance, origin=None, **kwargs):
+    if _skip_delete(origin, Project):
+        return
+    invalidate_schedule(instance.project_id)
+    TaskTombstone.objects.create(
+        project_id=instance.project_id,
+        kind=TaskTombstone.Kind.TASK,
+        object_id=str(instance.pk),
+    )
+
+
+@receiver(post_save, sender=TaskRelation)
+def handle_relation_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if TaskRelation.child_task.is_cached(instance):
+        project_id = instance.child_task.project_id
+    else:
+        project_id = _project_id_of_task(instance.child_task_id)
+    if project_id is not None:
+        invalidate_schedule(project_id)
+
+
+@receiver(post_delete, sender=TaskRelation)
+def record_relation_delete(sender, instance, origin=None, **kwargs):
+    if _skip_delete(origin, Project, Task):
+        return
+    project_id = _project_id_of_task(instance.child_task_id)
+    if project_id is None:
+        return
+    invalidate_schedule(project_id)
+    TaskTombstone.objects.create(
+        project_id=project_id,
+        kind=TaskTombstone.Kind.RELATION,
+        object_id=str(instance.pk),
+    )
+
+
+@receiver(post_delete, sender=TaskComment)
+def record_comment_delete(sender, instance, origin=None, **kwargs):
+    if _skip_delete(origin, Project, Task):
+        return
+    project_id = _project_id_of_task(instance.task_id)
+    if project_id is None:
+        return
+    TaskTombstone.objects.create(
+        project_id=project_id,
+        kind=TaskTombstone.Kind.COMMENT,
+        object_id=str(instance.pk),
+    )
+
+
+@receiver(post_delete, sender=Project)
+def drop_project_task_data(sender, instance, **kwargs):
+    invalidate_schedule(instance.pk)
+    TaskTombstone.objects.filter(project_id=instance.pk).delete()
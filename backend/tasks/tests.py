@@ -5,6 +5,7 @@ from rest_framework.test import APITestCase
 from rest_framework import status
 from uuid import uuid4
 
+from api.summaries import invalidate_user_summaries
 from projects.models import Project
 from .models import (
     Task,
@@ -377,3 +378,629 @@ class TaskAPITests(APITestCase):
         self.assertIn("email", comment)
         self.assertIn("profile_picture", comment)
         self.assertEqual(comment["email"], self.user.email)
+
+    def _create_tasks_with_relations(self, count):
+        from .models import TaskComment
+
+        previous = None
+        for i in range(count):
+            task = Task.objects.create(
+                project=self.project,
+                name=f"Bulk Task {i}",
+                deadline=timezone.now() + timezone.timedelta(days=7),
+            )
+            task.assigned_users.add(self.user)
+            TaskComment.objects.create(task=task, user=self.user, content=f"c{i}")
+            if previous is not None:
+                TaskRelation.objects.create(
+                    parent_task=previous,
+                    child_task=task,
+                    relation_type=TaskRelationType.FINISH_TO_START,
+                )
+            previous = task
+
+    def test_list_tasks_query_count_is_constant(self):
+        """タスク一覧のクエリ数がタスク数に依存しないこと"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        url = f"/api/projects/{self.project.project_id}/tasks/"
+
+        # Resolve the (cached) project membership before measuring
+        self.client.get(url, format="json")
+
+        # Start both measurements with cold user summaries; a warm cache skips
+        # the user query altogether
+        user_ids = list(User.objects.values_list("pk", flat=True))
+        self._create_tasks_with_relations(2)
+        invalidate_user_summaries(user_ids)
+        with CaptureQueriesContext(connection) as few:
+            response = self.client.get(url, format="json")
+        self.assertEqual(len(response.data["tasks"]), 2)
+
+        self._create_tasks_with_relations(10)
+        invalidate_user_summaries(user_ids)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url, format="json")
+        self.assertEqual(len(response.data["tasks"]), 12)
+
+        self.assertEqual(len(few), len(many))
+        task_data = next(
+            task for task in response.data["tasks"] if task["name"] == "Bulk Task 1"
+        )
+        self.assertEqual(len(task_data["parent_tasks"]), 1)
+        self.assertEqual(task_data["comments"][0]["content"], "c1")
+        self.assertEqual(task_data["comments"][0]["task_id"], task_data["task_id"])
+
+    def _create_parents(self, count):
+        return [
+            Task.objects.create(
+                project=self.project,
+                name=f"Parent {i}",
+                deadline=timezone.now() + timezone.timedelta(days=7),
+            )
+            for i in range(count)
+        ]
+
+    def test_create_task_parent_query_count_is_constant(self):
+        """親タスク数に関係なくタスク作成のクエリ数が一定であること"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        url = f"/api/projects/{self.project.project_id}/tasks/"
+        self.client.get(url, format="json")
+
+        def create(name, parents):
+            data = {
+                "name": name,
+                "deadline": (timezone.now() + timezone.timedelta(days=14)).isoformat(),
+                "parent_tasks": [
+                    {"task_id": str(parent.task_id), "relation_type": "FtS"}
+                    for parent in parents
+                ],
+            }
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(url, data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return queries
+
+        few = create("Few", self._create_parents(1))
+        many = create("Many", self._create_parents(50))
+
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(
+            TaskRelation.objects.filter(child_task__name="Many").count(), 50
+        )
+
+    def test_create_task_duplicate_parent(self):
+        """同じ親タスクを重複して指定できないこと"""
+        (parent,) = self._create_parents(1)
+        url = f"/api/projects/{self.project.project_id}/tasks/"
+        relation = {"task_id": str(parent.task_id), "relation_type": "FtS"}
+        data = {
+            "name": "Child",
+            "deadline": (timezone.now() + timezone.timedelta(days=14)).isoformat(),
+            "parent_tasks": [relation, relation],
+        }
+        response = self.client.post(url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_task_replaces_parents(self):
+        """更新時に親タスクが置き換えられること"""
+        a, b, c = self._create_parents(3)
+        child = Task.objects.create(
+            project=self.project,
+            name="Child",
+            deadline=timezone.now() + timezone.timedelta(days=14),
+        )
+        TaskRelation.objects.create(
+            parent_task=a, child_task=child, relation_type=TaskRelationType.FINISH_TO_START
+        )
+        TaskRelation.objects.create(
+            parent_task=b, child_task=child, relation_type=TaskRelationType.FINISH_TO_START
+        )
+
+        url = f"/api/projects/{self.project.project_id}/tasks/{child.task_id}/"
+        data = {
+            "parent_tasks": [
+                {"task_id": str(b.task_id), "relation_type": "StS"},
+                {"task_id": str(c.task_id), "relation_type": "FtS"},
+            ]
+        }
+        response = self.client.patch(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            dict(child.parents.values_list("parent_task_id", "relation_type")),
+            {
+                b.task_id: TaskRelationType.START_TO_START,
+                c.task_id: TaskRelationType.FINISH_TO_START,
+            },
+        )
+
+    def test_update_task_rejects_cycle(self):
+        """依存関係の循環を作る親タスクの更新が拒否されること"""
+        a, b, c = self._create_parents(3)
+        TaskRelation.objects.create(
+            parent_task=a, child_task=b, relation_type=TaskRelationType.FINISH_TO_START
+        )
+        TaskRelation.objects.create(
+            parent_task=b, child_task=c, relation_type=TaskRelationType.FINISH_TO_START
+        )
+
+        url = f"/api/projects/{self.project.project_id}/tasks/{a.task_id}/"
+        response = self.client.patch(
+            url,
+            {"parent_tasks": [{"task_id": str(c.task_id), "relation_type": "FtS"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("parent_tasks", response.data)
+
+        response = self.client.patch(
+            url,
+            {"parent_tasks": [{"task_id": str(a.task_id), "relation_type": "FtS"}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(a.parents.exists())
+
+    def test_cycle_check_sees_uncommitted_relations(self):
+        """キャッシュの無効化前に追加された依存関係も循環チェックに使われること"""
+        a, b, c = self._create_parents(3)
+        base = f"/api/projects/{self.project.project_id}/tasks"
+
+        def set_parent(task, parent):
+            relation = {"task_id": str(parent.task_id), "relation_type": "FtS"}
+            return self.client.patch(
+                f"{base}/{task.task_id}/", {"parent_tasks": [relation]}, format="json"
+            )
+
+        self.assertEqual(set_parent(b, a).status_code, status.HTTP_200_OK)
+        # TestCase never commits, so no cache invalidation runs from here on
+        self.assertEqual(set_parent(c, b).status_code, status.HTTP_200_OK)
+
+        response = set_parent(a, c)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("parent_tasks", response.data)
+        self.assertFalse(a.parents.exists())
+
+
+class TaskSyncAPITests(APITestCase):
+    def setUp(self):
+        from .models import TaskComment
+
+        self.user = User.objects.create_user(
+            username="syncuser", email="sync@example.com", password="testpass123"
+        )
+        self.project = Project.objects.create(
+            title="Sync Project",
+            start_date=timezone.now(),
+            deadline=timezone.now() + timezone.timedelta(days=30),
+        )
+        self.project.members.add(self.user)
+        self.client.force_authenticate(user=self.user)
+        self.url = f"/api/projects/{self.project.project_id}/tasks/sync/"
+
+        deadline = timezone.now() + timezone.timedelta(days=7)
+        self.task_a = Task.objects.create(project=self.project, name="A", deadline=deadline)
+        self.task_b = Task.objects.create(project=self.project, name="B", deadline=deadline)
+        self.relation = TaskRelation.objects.create(
+            parent_task=self.task_a,
+            child_task=self.task_b,
+            relation_type=TaskRelationType.FINISH_TO_START,
+        )
+        self.comment = TaskComment.objects.create(
+            task=self.task_a, user=self.user, content="first"
+        )
+
+        # Pretend everything above was synced an hour ago
+        an_hour_ago = timezone.now() - timezone.timedelta(hours=1)
+        Task.objects.update(updated_at=an_hour_ago)
+        TaskRelation.objects.update(updated_at=an_hour_ago)
+        TaskComment.objects.update(updated_at=an_hour_ago)
+        self.since = (an_hour_ago + timezone.timedelta(minutes=1)).isoformat()
+
+    def test_full_snapshot_without_version(self):
+        """versionを指定しない場合に全件とversionが返ること"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["full"])
+        self.assertEqual(
+            {task["name"] for task in response.data["tasks"]}, {"A", "B"}
+        )
+        self.assertEqual(
+            response.data["relations"][0]["relation_id"], self.relation.pk
+        )
+        self.assertEqual(response.data["comments"][0]["content"], "first")
+        self.assertIsNotNone(response.data["version"])
+
+    def test_unchanged_project_returns_nothing(self):
+        """変更がない場合に空の差分が返ること"""
+        response = self.client.get(self.url, {"since": self.since})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data["full"])
+        self.assertEqual(response.data["tasks"], [])
+        self.assertEqual(response.data["relations"], [])
+        self.assertEqual(response.data["comments"], [])
+        self.assertEqual(
+            response.data["deleted"], {"tasks": [], "relations": [], "comments": []}
+        )
+
+    def test_returns_only_changes_and_tombstones(self):
+        """変更・追加されたものと削除のトゥームストーンだけが返ること"""
+        from .models import TaskComment
+
+        self.task_a.name = "A renamed"
+        self.task_a.save()
+        new_comment = TaskComment.objects.create(
+            task=self.task_a, user=self.user, content="second"
+        )
+        relation_id = str(self.relation.pk)
+        comment_id = str(self.comment.comment_id)
+        self.comment.delete()
+        self.relation.delete()
+
+        response = self.client.get(self.url, {"since": self.since})
+
+        self.assertEqual(
+            [task["name"] for task in response.data["tasks"]], ["A renamed"]
+        )
+        self.assertEqual(
+            [c["comment_id"] for c in response.data["comments"]],
+            [str(new_comment.comment_id)],
+        )
+        self.assertEqual(
+            response.data["deleted"],
+            {
+                "tasks": [],
+                "relations": [relation_id],
+                "comments": [comment_id],
+            },
+        )
+
+    def test_task_delete_implies_its_relations_and_comments(self):
+        """タスク削除時はタスクのトゥームストーンのみが記録されること"""
+        task_a_id = str(self.task_a.task_id)
+        self.task_a.delete()
+
+        response = self.client.get(self.url, {"since": self.since})
+
+        self.assertEqual(
+            response.data["deleted"],
+            {"tasks": [task_a_id], "relations": [], "comments": []},
+        )
+
+    def test_version_round_trip(self):
+        """返されたversionで次回の差分を取得できること"""
+        version = self.client.get(self.url).data["version"]
+        self.task_b.status = TaskStatus.DONE
+        self.task_b.save()
+
+        response = self.client.get(self.url, {"since": version})
+
+        self.assertFalse(response.data["full"])
+        self.assertIn("B", [task["name"] for task in response.data["tasks"]])
+
+    def test_invalid_version(self):
+        """不正なversionで400が返ること"""
+        response = self.client.get(self.url, {"since": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_member_forbidden(self):
+        """プロジェクトメンバー以外は403となること"""
+        stranger = User.objects.create_user(
+            username="stranger", email="stranger@example.com", password="testpass123"
+        )
+        self.client.force_authenticate(user=stranger)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TaskScheduleTests(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="planner", email="planner@example.com", password="testpass123"
+        )
+        self.day0 = timezone.now().replace(microsecond=0)
+        self.project = Project.objects.create(
+            title="Schedule",
+            start_date=self.day0,
+            deadline=self.day0 + timezone.timedelta(days=30),
+        )
+        self.project.members.add(self.user)
+        self.client.force_authenticate(user=self.user)
+        self.url = f"/api/projects/{self.project.project_id}/tasks/schedule/"
+
+        # A(2d) -FtS-> B(3d) -FtF-> D(1d); A -StS-> C(1d)
+        self.a = self._task("A", 2)
+        self.b = self._task("B", 3)
+        self.c = self._task("C", 1)
+        self.d = self._task("D", 1)
+        self._relate(self.a, self.b, TaskRelationType.FINISH_TO_START)
+        self._relate(self.a, self.c, TaskRelationType.START_TO_START)
+        self._relate(self.b, self.d, TaskRelationType.FINISH_TO_FINISH)
+
+    def _task(self, name, days):
+        return Task.objects.create(
+            project=self.project,
+            name=name,
+            start_date=self.day0,
+            deadline=self.day0 + timezone.timedelta(days=days),
+        )
+
+    def _relate(self, parent, child, relation_type):
+        return TaskRelation.objects.create(
+            parent_task=parent, child_task=child, relation_type=relation_type
+        )
+
+    def test_compute_schedule(self):
+        """最早・最遅日時、余裕時間、クリティカルパスが計算されること"""
+        from .schedule import compute_schedule, load_graph
+
+        with self.assertNumQueries(1):
+            graph = load_graph(self.project)
+        schedule = compute_schedule(*graph)
+
+        day = timezone.timedelta(days=1)
+        tasks = schedule["tasks"]
+        self.assertEqual(tasks[self.b.pk]["earliest_start"], self.day0 + 2 * day)
+        self.assertEqual(tasks[self.d.pk]["earliest_start"], self.day0 + 4 * day)
+        self.assertEqual(tasks[self.c.pk]["latest_finish"], self.day0 + 5 * day)
+        self.assertEqual(tasks[self.c.pk]["slack"], 4 * day)
+        self.assertEqual(schedule["project_finish"], self.day0 + 5 * day)
+        self.assertEqual(
+            schedule["critical_path"], [self.a.pk, self.b.pk, self.d.pk]
+        )
+
+    def test_cycle_is_reported(self):
+        """循環する依存関係が検出されること"""
+        from .schedule import ScheduleCycleError, compute_schedule, load_graph
+
+        self._relate(self.d, self.a, TaskRelationType.FINISH_TO_START)
+        with self.assertRaises(ScheduleCycleError) as raised:
+            compute_schedule(*load_graph(self.project))
+        self.assertEqual(
+            set(raised.exception.task_ids), {self.a.pk, self.b.pk, self.c.pk, self.d.pk}
+        )
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_schedule_endpoint_is_cached_and_invalidated(self):
+        """スケジュールがキャッシュされ、タスク・依存関係の変更で再計算されること"""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["critical_path"],
+            [str(self.a.pk), str(self.b.pk), str(self.d.pk)],
+        )
+        slack = {t["task_id"]: t["slack_seconds"] for t in response.data["tasks"]}
+        self.assertEqual(slack[str(self.c.pk)], 4 * 86400)
+
+        with self.assertNumQueries(2):  # project and memberships; schedule cached
+            self.client.get(self.url)
+
+        # C now blocks D as well and becomes critical; the cache is dropped
+        # once the change commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.c.deadline = self.day0 + timezone.timedelta(days=5)
+            self.c.save()
+            self._relate(self.c, self.d, TaskRelationType.FINISH_TO_START)
+
+        response = self.client.get(self.url)
+        self.assertIn(str(self.c.pk), response.data["critical_path"])
+        self.assertNotIn(str(self.b.pk), response.data["critical_path"])
+
+
+class TaskBulkAPITests(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="importer", email="importer@example.com", password="testpass123"
+        )
+        self.members = [
+            User.objects.create_user(
+                username=f"member{i}", email=f"member{i}@example.com", password="x"
+            )
+            for i in range(2)
+        ]
+        self.project = Project.objects.create(
+            title="Bulk",
+            start_date=timezone.now(),
+            deadline=timezone.now() + timezone.timedelta(days=30),
+        )
+        self.project.members.add(self.user, *self.members)
+        self.client.force_authenticate(user=self.user)
+        self.url = f"/api/projects/{self.project.project_id}/tasks/bulk/"
+
+    def _task(self, name, **fields):
+        return Task.objects.create(
+            project=self.project,
+            name=name,
+            deadline=timezone.now() + timezone.timedelta(days=7),
+            **fields,
+        )
+
+    def _create_items(self, count, **fields):
+        deadline = (timezone.now() + timezone.timedelta(days=7)).isoformat()
+        return [
+            {"name": f"Imported {i}", "deadline": deadline, **fields}
+            for i in range(count)
+        ]
+
+    def test_bulk_create_update_delete(self):
+        """作成・更新・削除が一括で反映され、進捗と削除記録が更新されること"""
+        from .models import TaskTombstone
+
+        parent = self._task("Parent")
+        moved = self._task("Moved")
+        removed = self._task("Removed", status=TaskStatus.DONE)
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.task_count, 3)
+
+        response = self.client.post(
+            self.url,
+            {
+                "create": self._create_items(
+                    2,
+                    assigned_user_ids=[self.members[0].pk],
+                    parent_tasks=[{"task_id": str(parent.pk), "relation_type": "FtS"}],
+                ),
+                "update": [
+                    {
+                        "task_id": str(moved.pk),
+                        "status": "done",
+                        "assigned_user_ids": [self.members[1].pk],
+                        "parent_tasks": [
+                            {"task_id": str(parent.pk), "relation_type": "StS"}
+                        ],
+                    }
+                ],
+                "delete": [str(removed.pk)],
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["created"]), 2)
+        self.assertEqual(response.data["updated"][0]["status"], "done")
+        self.assertEqual(response.data["deleted"], [str(removed.pk)])
+
+        created = Task.objects.filter(name__startswith="Imported")
+        self.assertEqual(created.count(), 2)
+        self.assertEqual(
+            TaskRelation.objects.filter(parent_task=parent).count(), 3
+        )
+        self.assertEqual(
+            list(moved.assigned_users.values_list("pk", flat=True)), [self.members[1].pk]
+        )
+        self.assertFalse(Task.objects.filter(pk=removed.pk).exists())
+        self.assertTrue(
+            TaskTombstone.objects.filter(object_id=str(removed.pk)).exists()
+        )
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.task_count, 4)
+        self.assertEqual(self.project.done_task_count, 1)
+        self.assertEqual(self.project.progress, 25)
+
+    def test_update_writes_only_the_fields_of_each_item(self):
+        """一括更新で各タスクが自分の項目で指定したフィールドだけを書き込むこと"""
+        from .bulk import TaskBatch
+        from .models import TaskPriority
+
+        first = self._task("First")
+        second = self._task("Second")
+        tasks = Task.objects.in_bulk([first.pk, second.pk])
+        # Changed after the batch loaded the tasks
+        Task.objects.filter(pk=first.pk).update(priority=TaskPriority.HIGH)
+
+        TaskBatch(self.project, self.user).apply(
+            updates=[
+                (tasks[first.pk], {"name": "Renamed"}),
+                (tasks[second.pk], {"priority": TaskPriority.LOW}),
+            ]
+        )
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.name, "Renamed")
+        self.assertEqual(first.priority, TaskPriority.HIGH)
+        self.assertEqual(second.name, "Second")
+        self.assertEqual(second.priority, TaskPriority.LOW)
+
+    def test_bulk_query_count_is_constant(self):
+        """一括処理のクエリ数が件数に依存しないこと"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.post(self.url, {}, format="json")
+
+        def run(count):
+            tasks = [self._task(f"Existing {i}") for i in range(count)]
+            data = {
+                "create": self._create_items(
+                    count, assigned_user_ids=[self.members[0].pk]
+                ),
+                "update": [
+                    {"task_id": str(task.pk), "status": "done"} for task in tasks[1:]
+                ],
+                "delete": [str(tasks[0].pk)],
+            }
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(self.url, data, format="json")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return queries
+
+        self.assertEqual(len(run(3)), len(run(30)))
+
+    def test_one_notification_per_recipient(self):
+        """一括処理では受信者ごとに通知が1件にまとめられること"""
+        from notifications.models import Notification
+
+        response = self.client.post(
+            self.url,
+            {"create": self._create_items(5, assigned_user_ids=[self.members[0].pk])},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertFalse(Notification.objects.filter(recipient=self.user).exists())
+        for member in self.members:
+            notifications = Notification.objects.filter(recipient=member)
+            self.assertEqual(notifications.count(), 1)
+            self.assertEqual(
+                notifications[0].related_object_id, str(self.project.project_id)
+            )
+        self.assertIn(
+            "割り当て 5件",
+            Notification.objects.get(recipient=self.members[0]).message,
+        )
+
+    def test_invalid_batch_writes_nothing(self):
+        """不正な項目があれば何も書き込まれず、項目ごとにエラーが返ること"""
+        outsider = User.objects.create_user(
+            username="outsider", email="outsider@example.com", password="x"
+        )
+        a = self._task("A")
+        b = self._task("B")
+        TaskRelation.objects.create(
+            parent_task=a, child_task=b, relation_type=TaskRelationType.FINISH_TO_START
+        )
+
+        response = self.client.post(
+            self.url,
+            {
+                "create": self._create_items(1, assigned_user_ids=[outsider.pk]),
+                "update": [
+                    {"task_id": str(b.pk), "name": "B2"},
+                    {
+                        "task_id": str(a.pk),
+                        "parent_tasks": [{"task_id": str(b.pk), "relation_type": "FtS"}],
+                    },
+                ],
+                "delete": [],
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("assigned_user_ids", response.data["create"][0])
+        self.assertEqual(response.data["update"][0], {})
+        self.assertIn("parent_tasks", response.data["update"][1])
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertEqual(Task.objects.get(pk=b.pk).name, "B")
+
+    def test_unknown_task(self):
+        """他プロジェクトや存在しないタスクは更新・削除できないこと"""
+        response = self.client.post(
+            self.url, {"delete": [str(uuid4())]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(0, response.data["delete"])
@@ -1,9 +1,12 @@
 from django.urls import path
 from .views import (
     TaskListCreateView,
+    TaskBulkView,
     TaskDetailView,
     TaskCommentCreateView,
     TaskCommentListView,
+    TaskScheduleView,
+    TaskSyncView,
 )
 
 urlpatterns = [
@@ -12,6 +15,21 @@ urlpatterns = [
         TaskListCreateView.as_view(),
         name="task-list-create",
     ),
+    path(
+        "projects/<uuid:project_id>/tasks/bulk/",
+        TaskBulkView.as_view(),
+        name="task-bulk",
+    ),
+    path(
+        "projects/<uuid:project_id>/tasks/sync/",
+        TaskSyncView.as_view(),
+        name="task-sync",
+    ),
+    path(
+        "projects/<uuid:project_id>/tasks/schedule/",
+        TaskScheduleView.as_view(),
+        name="task-schedule",
+    ),
     path(
         "projects/<uuid:project_id>/tasks/<uuid:task_id>/",
         TaskDetailView.as_view(),
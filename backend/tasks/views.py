@@ -1,23 +1,36 @@
-from django.shortcuts import get_object_or_404
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.shortcuts import aget_object_or_404, get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import PermissionDenied
 
+from backend.async_views import AsyncAPIView
+from projects.membership import ais_project_member, is_project_member
 from projects.models import Project
 from .serializers import (
+    TaskBulkSerializer,
     TaskCreateSerializer,
     TaskUpdateSerializer,
     TaskResponseSerializer,
     TaskCommentCreateSerializer,
     TaskCommentResponseSerializer,
     TaskCommentListSerializer,
+    TaskCommentSyncSerializer,
+    TaskRelationSyncSerializer,
+    TaskSyncSerializer,
+    TASK_VALUES,
+    serialize_task_rows,
 )
+from .bulk import TaskBatch
 from .models import Task, TaskComment
+from .schedule import ScheduleCycleError, get_project_schedule
+from .sync import InvalidVersion, collect_changes, parse_version
 
 
-class TaskListCreateView(APIView):
+class TaskListCreateView(AsyncAPIView):
     """GET/POST /api/projects/{project_id}/tasks - List and create tasks for the project.
 
     Permissions: authenticated user assigned to the project.
@@ -25,26 +38,26 @@ class TaskListCreateView(APIView):
 
     permission_classes = [IsAuthenticated]
 
-    def _get_project(self, project_id):
-        project = get_object_or_404(
-            Project.objects.prefetch_related("members"), project_id=project_id
-        )
-        if not project.members.filter(pk=self.request.user.pk).exists():
+    def _check_member(self, is_member):
+        if not is_member:
             raise PermissionDenied("You are not assigned to this project.")
+
+    def _get_project(self, project_id):
+        project = get_object_or_404(Project, project_id=project_id)
+        self._check_member(is_project_member(self.request, project.pk))
         return project
 
-    def get(self, request, project_id):
-        project = self._get_project(project_id)
-        tasks = (
-            Task.objects.filter(project=project)
-            .select_related("project")
-            .prefetch_related(
-                "assigned_users", "parents__parent_task", "comments__user"
-            )
-            .order_by("deadline")
-        )
-        serializer = TaskResponseSerializer(tasks, many=True)
-        return Response({"tasks": serializer.data}, status=status.HTTP_200_OK)
+    async def _aget_project(self, project_id):
+        project = await aget_object_or_404(Project, project_id=project_id)
+        self._check_member(await ais_project_member(self.request, project.pk))
+        return project
+
+    async def get(self, request, project_id):
+        project = await self._aget_project(project_id)
+        queryset = Task.objects.filter(project=project).order_by("deadline")
+        rows = [row async for row in queryset.values(*TASK_VALUES)]
+        tasks = await sync_to_async(serialize_task_rows)(rows)
+        return Response({"tasks": tasks}, status=status.HTTP_200_OK)
 
     def post(self, request, project_id):
         project = self._get_project(project_id)
@@ -54,10 +67,61 @@ class TaskListCreateView(APIView):
         serializer.is_valid(raise_exception=True)
         task = serializer.save()
 
+        task = TaskResponseSerializer.setup_eager_loading(Task.objects).get(pk=task.pk)
         response_serializer = TaskResponseSerializer(task)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
 
+class TaskBulkView(APIView):
+    """POST /api/projects/{project_id}/tasks/bulk/ - Create, update and delete many tasks at once.
+
+    Body: {"create": [...], "update": [{"task_id": ..., ...}], "delete": [task_id, ...]}
+    Creates take the fields of the create endpoint, updates any subset of
+    them; parent_tasks of an update replaces all parents of the task. The
+    whole batch is validated first and written in one transaction, and each
+    affected user receives one notification for the whole batch.
+
+    Permissions: authenticated user assigned to the project.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def _get_project(self, project_id):
+        project = get_object_or_404(Project, project_id=project_id)
+        if not is_project_member(self.request, project.pk):
+            raise PermissionDenied("You are not assigned to this project.")
+        return project
+
+    def post(self, request, project_id):
+        project = self._get_project(project_id)
+        serializer = TaskBulkSerializer(
+            data=request.data, context={"project": project, "request": request}
+        )
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            data = serializer.validated_data
+            deleted_ids = [task.pk for task in data["delete"]]
+            created, updated = TaskBatch(project, request.user).apply(
+                creates=data["create"], updates=data["update"], deletes=data["delete"]
+            )
+
+        tasks = TaskResponseSerializer.setup_eager_loading(Task.objects).in_bulk(
+            [task.pk for task in (*created, *updated)]
+        )
+        return Response(
+            {
+                "created": TaskResponseSerializer(
+                    [tasks[task.pk] for task in created], many=True
+                ).data,
+                "updated": TaskResponseSerializer(
+                    [tasks[task.pk] for task in updated], many=True
+                ).data,
+                "deleted": [str(task_id) for task_id in deleted_ids],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class TaskCommentCreateView(APIView):
     """POST /api/projects/{project_id}/tasks/{task_id}/comments - Create a comment for a task.
 
@@ -67,10 +131,8 @@ class TaskCommentCreateView(APIView):
     permission_classes = [IsAuthenticated]
 
     def _get_project(self, project_id):
-        project = get_object_or_404(
-            Project.objects.prefetch_related("members"), project_id=project_id
-        )
-        if not project.members.filter(pk=self.request.user.pk).exists():
+        project = get_object_or_404(Project, project_id=project_id)
+        if not is_project_member(self.request, project.pk):
             raise PermissionDenied("You are not assigned to this project.")
         return project
 
@@ -100,11 +162,8 @@ class TaskCommentListView(APIView):
     permission_classes = [IsAuthenticated]
 
     def _get_task(self, task_id):
-        task = get_object_or_404(
-            Task.objects.select_related("project").prefetch_related("project__members"),
-            task_id=task_id,
-        )
-        if not task.project.members.filter(pk=self.request.user.pk).exists():
+        task = get_object_or_404(Task, task_id=task_id)
+        if not is_project_member(self.request, task.project_id):
             raise PermissionDenied("You are not assigned to this project.")
         return task
 
@@ -125,20 +184,25 @@ class TaskDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
     def _get_project(self, project_id):
-        project = get_object_or_404(
-            Project.objects.prefetch_related("members"), project_id=project_id
-        )
-        if not project.members.filter(pk=self.request.user.pk).exists():
+        project = get_object_or_404(Project, project_id=project_id)
+        if not is_project_member(self.request, project.pk):
             raise PermissionDenied("You are not assigned to this project.")
         return project
 
-    def _get_task(self, project, task_id):
-        task = get_object_or_404(Task, task_id=task_id, project=project)
+    def _get_task(self, project, task_id, queryset=Task.objects):
+        task = get_object_or_404(queryset, task_id=task_id, project=project)
         return task
 
+    def _get_task_for_response(self, project, task_id):
+        return self._get_task(
+            project,
+            task_id,
+            queryset=TaskResponseSerializer.setup_eager_loading(Task.objects),
+        )
+
     def get(self, request, project_id, task_id):
         project = self._get_project(project_id)
-        task = self._get_task(project, task_id)
+        task = self._get_task_for_response(project, task_id)
         serializer = TaskResponseSerializer(task)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -151,10 +215,12 @@ class TaskDetailView(APIView):
             data=request.data,
             context={"project": project, "request": request},
         )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
+        # The cycle check locks the project's dependency graph until saved
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
 
-        task.refresh_from_db()
+        task = self._get_task_for_response(project, task_id)
         response_serializer = TaskResponseSerializer(task)
         return Response(response_serializer.data, status=status.HTTP_200_OK)
 
@@ -167,9 +233,86 @@ class TaskDetailView(APIView):
             data=request.data,
             context={"project": project, "request": request},
         )
-        serializer.is_valid(raise_exception=True)
-        serializer.save()
+        # The cycle check locks the project's dependency graph until saved
+        with transaction.atomic():
+            serializer.is_valid(raise_exception=True)
+            serializer.save()
 
-        task.refresh_from_db()
+        task = self._get_task_for_response(project, task_id)
         response_serializer = TaskResponseSerializer(task)
         return Response(response_serializer.data, status=status.HTTP_200_OK)
+
+
+class TaskSyncView(APIView):
+    """GET /api/projects/{project_id}/tasks/sync/?since={version} - Changes since a previous sync.
+
+    Returns the tasks, relations and comments created or modified since the
+    given version plus the IDs of deleted ones, and the version to send next
+    time. Without since (or with a version too old to sync incrementally)
+    the full state is returned with "full": true. Clients upsert the changed
+    entries, then drop the deleted IDs; a deleted task also removes its
+    relations and comments.
+
+    Permissions: authenticated user assigned to the project.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, project_id):
+        project = get_object_or_404(Project, project_id=project_id)
+        if not is_project_member(request, project.pk):
+            raise PermissionDenied("You are not assigned to this project.")
+
+        since = request.query_params.get("since")
+        if since is not None:
+            try:
+                since = parse_version(since)
+            except InvalidVersion:
+                return Response(
+                    {"since": "Invalid version."}, status=status.HTTP_400_BAD_REQUEST
+                )
+
+        changes = collect_changes(project, since)
+        return Response(
+            {
+                "version": changes["version"].isoformat(),
+                "full": changes["full"],
+                "tasks": TaskSyncSerializer(changes["tasks"], many=True).data,
+                "relations": TaskRelationSyncSerializer(
+                    changes["relations"], many=True
+                ).data,
+                "comments": TaskCommentSyncSerializer(
+                    changes["comments"], many=True
+                ).data,
+                "deleted": changes["deleted"],
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
+class TaskScheduleView(APIView):
+    """GET /api/projects/{project_id}/tasks/schedule/ - Critical path schedule of the project.
+
+    Returns earliest/latest start and finish and the slack of every task plus
+    the critical path (task IDs in dependency order). Responds 409 with the
+    affected task IDs when the dependencies contain a cycle.
+
+    Permissions: authenticated user assigned to the project.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, project_id):
+        project = get_object_or_404(Project, project_id=project_id)
+        if not is_project_member(request, project.pk):
+            raise PermissionDenied("You are not assigned to this project.")
+
+        try:
+            schedule = get_project_schedule(project)
+        except ScheduleCycleError as exc:
+            return Response(
+                {"error": str(exc), "task_ids": [str(pk) for pk in exc.task_ids]},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return Response(schedule, status=status.HTTP_200_OK)